@@ -3,11 +3,11 @@ from datetime import datetime, timedelta
 from fastapi import Depends
 from sqladmin.authentication import AuthenticationBackend
 from sqlalchemy import select
-from sqlalchemy.orm import noload
+from sqlalchemy.orm import noload, selectinload
 from starlette.requests import Request
 
-from auth.access_checker import get_session_data
-from auth.key_tools import check_password, get_jwt_token, check_jwt_token, get_refresh_token
+from auth.access_checker import get_session_data, session_cache, revoke_sessions
+from auth.key_tools import verify_password, get_jwt_token, check_jwt_token, get_refresh_token
 from config import REFRESH_EXPIRATION
 from db_connect.connect import async_session
 from models.models import SimpleEntry, Session
@@ -19,15 +19,18 @@ class AdminAuth(AuthenticationBackend):
         form = await request.form()
         username, password = form["username"], form["password"]
         async with async_session() as session:
-            query = select(SimpleEntry).filter_by(login=username)
+            query = select(SimpleEntry).filter_by(login=username).options(selectinload(SimpleEntry.user))
             exist_user_login = await session.execute(query)
             existing_entry = exist_user_login.scalar()
 
             if not existing_entry:
                 return False
 
-            if not check_password(password, existing_entry.hashed_password):
+            verified, new_hash = await verify_password(password, existing_entry.hashed_password)
+            if not verified:
                 return False
+            if new_hash:
+                existing_entry.hashed_password = new_hash
 
             user = existing_entry.user
             if not user.is_superuser:
@@ -38,7 +41,7 @@ class AdminAuth(AuthenticationBackend):
             session.add(new_session)
             await session.commit()
 
-        new_jwt = get_jwt_token({'session': new_session.id.hex})
+        new_jwt = get_jwt_token({'session': new_session.id.hex, 'user': user.id})
         new_refresh = str(new_session.refresh)
 
         request.session.update({'jwt': new_jwt, 'refresh': new_refresh})
@@ -58,6 +61,7 @@ class AdminAuth(AuthenticationBackend):
                 find_session = await session.execute(query)
                 exist_session = find_session.scalar()
                 exist_session.expired_at = datetime.utcnow()
+                await revoke_sessions(session, [session_data['session']])
                 await session.commit()
                 request.session.clear()
                 return True
@@ -75,10 +79,11 @@ class AdminAuth(AuthenticationBackend):
             if exist_session.expired_at < now_utc():
                 return
 
-            new_jwt = get_jwt_token({'session': exist_session.id.hex})
+            new_jwt = get_jwt_token({'session': exist_session.id.hex, 'user': exist_session.user_id})
             exist_session.refresh = get_refresh_token()
             exist_session.expired_at = datetime.utcnow() + timedelta(seconds=REFRESH_EXPIRATION)
             await session.commit()
+            session_cache.invalidate(exist_session.id.hex)
 
             response = {'jwt': new_jwt, 'refresh': exist_session.refresh}
             return response
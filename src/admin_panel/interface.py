@@ -1,7 +1,11 @@
 from datetime import timedelta
 
 from sqladmin import ModelView
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
+from auth.access_checker import revoke_user_sessions
+from db_connect.connect import async_session
 from models.models import User, DemoUser, Session, Project, Document, Template, Node
 
 
@@ -15,6 +19,7 @@ class Users(ModelView, model=User):
     column_sortable_list = [User.id, User.is_active, User.is_verified, User.is_superuser, User.name, User.created_at,
                             User.updated_at]
     column_default_sort = [(User.created_at, True)]
+    list_query = select(User).options(selectinload(User.simple_entry))
     form_columns = [User.name, User.email, User.is_active, User.is_verified]
     column_formatters = {
         User.created_at: lambda m, a: m.created_at.replace(microsecond=0, tzinfo=None),
@@ -23,6 +28,12 @@ class Users(ModelView, model=User):
 
     page_size = 50
 
+    async def on_model_delete(self, model: User) -> None:
+        """Sessions are deleted by the database cascade, so they are revoked before the user is deleted"""
+        async with async_session() as session:
+            await revoke_user_sessions(session, [model.id])
+            await session.commit()
+
 
 class DemoUsers(ModelView, model=DemoUser):
     can_create = False
@@ -50,6 +61,7 @@ class UserSessions(ModelView, model=Session):
     column_searchable_list = [Session.created_at]
     column_sortable_list = [Session.id, Session.user_id, Session.created_at, Session.updated_at]
     column_default_sort = [(Session.created_at, True)]
+    list_query = select(Session).options(selectinload(Session.user))
     column_formatters = {
         Session.created_at: lambda m, a: m.created_at.replace(microsecond=0, tzinfo=None),
         Session.updated_at: lambda m, a: m.created_at.replace(microsecond=0, tzinfo=None),
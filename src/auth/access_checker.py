@@ -1,15 +1,28 @@
+import asyncio
+import traceback
+from datetime import timedelta
+
 from fastapi import HTTPException, Depends
-from sqlalchemy import select
+from sqlalchemy import select, func, and_, event
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import noload
 from starlette.requests import Request
 
 from auth.key_tools import check_jwt_token
+from auth.revocation import RevocationSet
+from auth.session_cache import SessionCache
+from config import SESSION_CACHE_TTL, SESSION_CACHE_SIZE, AUTH_MODE, JWT_EXPIRATION, REVOCATION_REFRESH_INTERVAL
 from models.models import Session
-from db_connect.connect import get_session
+from db_connect.connect import get_session, async_session, engine
 from shared.time_utils import now_utc
 
 
+REVOCATION_CHANNEL = 'revoked_sessions'
+
+session_cache = SessionCache(SESSION_CACHE_TTL, SESSION_CACHE_SIZE)
+revoked_sessions = RevocationSet(JWT_EXPIRATION)
+
+
 async def get_session_data(request: Request, session: AsyncSession = Depends(get_session)) -> dict:
     """Аутентификация пользователя"""
     jwt = request.headers.get('jwt')
@@ -20,6 +33,17 @@ async def get_session_data(request: Request, session: AsyncSession = Depends(get
     if not session_data:
         raise HTTPException(status_code=401, detail='Unauthorized request')
 
+    # stateless mode: an unexpired JWT is enough while the revocation set is kept up to date
+    if AUTH_MODE == 'stateless' and 'user' in session_data \
+            and revoked_sessions.is_fresh(REVOCATION_REFRESH_INTERVAL * 3):
+        if session_data['session'] in revoked_sessions:
+            raise HTTPException(status_code=401, detail='Unauthorized request')
+        return {'user_id': session_data['user'], 'session_id': session_data['session'], 'async_session': session}
+
+    user_id = session_cache.get(session_data['session'])
+    if user_id is not None:
+        return {'user_id': user_id, 'session_id': session_data['session'], 'async_session': session}
+
     query = select(Session).filter_by(id=session_data['session'])
     query = query.options(noload('*'))
     find_session = await session.execute(query)
@@ -31,4 +55,68 @@ async def get_session_data(request: Request, session: AsyncSession = Depends(get
     if current_session.expired_at < now_utc():
         raise HTTPException(status_code=401, detail='Unauthorized request')
 
+    session_cache.put(session_data['session'], current_session.user_id, current_session.expired_at)
     return {'user_id': current_session.user_id, 'session_id': session_data['session'], 'async_session': session}
+
+
+async def revoke_sessions(session: AsyncSession, session_ids: list[str]) -> None:
+    """
+    Drops sessions from the cache. In the stateless mode they are also added to the revocation set
+    and other processes are notified when the transaction is committed.
+    The cache is dropped again after the commit, since a concurrent request could cache
+    the session while the transaction was not committed yet.
+    """
+    session_cache.invalidate(*session_ids)
+    if not session_ids:
+        return
+
+    @event.listens_for(session.sync_session, 'after_commit', once=True)
+    def intercept_committed(sync_session):
+        session_cache.invalidate(*session_ids)
+
+    if AUTH_MODE != 'stateless':
+        return
+    revoked_sessions.add(*session_ids)
+    # the NOTIFY payload is limited to 8000 bytes
+    for start in range(0, len(session_ids), 200):
+        payload = ','.join(session_ids[start:start + 200])
+        await session.execute(select(func.pg_notify(REVOCATION_CHANNEL, payload)))
+
+
+async def revoke_user_sessions(session: AsyncSession, user_ids: list[int]) -> None:
+    """Revokes all sessions of the users, must be called before the users are deleted"""
+    find_sessions = await session.execute(select(Session.id).filter(Session.user_id.in_(user_ids)))
+    await revoke_sessions(session, [session_id.hex for session_id in find_sessions.scalars()])
+
+
+async def load_revoked_sessions() -> None:
+    """Adds sessions expired within the JWT lifetime to the revocation set"""
+    async with async_session() as session:
+        now = now_utc()
+        query = select(Session.id, Session.expired_at).filter(and_(
+            Session.expired_at <= now,
+            Session.expired_at > now - timedelta(seconds=JWT_EXPIRATION)
+        ))
+        find_sessions = await session.execute(query)
+        revoked_sessions.load(find_sessions.all())
+
+
+async def watch_revocations() -> None:
+    """Keeps the revocation set up to date: periodic reload and notifications of the processes revoking sessions"""
+    def on_notification(connection, pid, channel, payload):
+        revoked_sessions.add(*payload.split(','))
+
+    while True:
+        try:
+            async with engine.connect() as connection:
+                raw_connection = await connection.get_raw_connection()
+                listener = raw_connection.driver_connection
+                await listener.add_listener(REVOCATION_CHANNEL, on_notification)
+                while not listener.is_closed():
+                    await load_revoked_sessions()
+                    await asyncio.sleep(REVOCATION_REFRESH_INTERVAL)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc(limit=7)
+            await asyncio.sleep(REVOCATION_REFRESH_INTERVAL)
@@ -6,9 +6,10 @@ from sqlalchemy.orm import noload
 from config import REFRESH_EXPIRATION
 from models.models import User, SimpleEntry, Session, DemoUser
 from shared.project_loader import add_project, ProjectLoaderException
+from .access_checker import session_cache, revoke_sessions
 from .auth_shemas import RegisterDTO, LoginDTO, RefreshDTO, LogoutDTO, DemoDTO
 from shared.base_usecase import BaseUC
-from .key_tools import get_hash, check_password, get_jwt_token, get_refresh_token
+from .key_tools import hash_password, verify_password, get_jwt_token, get_refresh_token
 from shared.time_utils import now_utc
 
 
@@ -34,7 +35,7 @@ class DemoUC(BaseUC):
             self.add_error(error_type='system_error', message=exc, http_code=500)
             return
 
-        new_jwt = get_jwt_token({'session': new_session.id.hex, 'demo': True})
+        new_jwt = get_jwt_token({'session': new_session.id.hex, 'user': new_user.id, 'demo': True})
         expiration = str(new_demo_user.expiration.total_seconds()).split('.')[0]
         response = {
             'user_id': new_user.id,
@@ -65,7 +66,7 @@ class RegisterUC(BaseUC):
             self.add_error(error_type='business_error', message='Login is already exist', location='login', http_code=406)
             return
 
-        hashed_password = get_hash(req.password)
+        hashed_password = await hash_password(req.password)
         new_entry = SimpleEntry(login=req.login, hashed_password=hashed_password)
         new_user = User(name=req.name, email=req.email, simple_entry=new_entry)
         self.session.add(new_user)
@@ -86,9 +87,12 @@ class LoginUC(BaseUC):
             self.add_error(error_type='param_error', message='Incorrect login or password', http_code=401)
             return
 
-        if not check_password(req.password, existing_entry.hashed_password):
+        verified, new_hash = await verify_password(req.password, existing_entry.hashed_password)
+        if not verified:
             self.add_error(error_type='param_error', message='Incorrect login or password', http_code=401)
             return
+        if new_hash:
+            existing_entry.hashed_password = new_hash
 
         query = select(User).filter_by(id=existing_entry.user_id).options(noload('*'))
         find_user = await self.session.execute(query)
@@ -98,7 +102,7 @@ class LoginUC(BaseUC):
         new_session = Session(user=user, expired_at=refresh_expiration)
         self.session.add(new_session)
         await self.session.commit()
-        new_jwt = get_jwt_token({'session': new_session.id.hex})
+        new_jwt = get_jwt_token({'session': new_session.id.hex, 'user': user.id})
         new_refresh = new_session.refresh
         response = {'user_id': user.id, 'name': user.name, 'jwt': new_jwt, 'refresh': new_refresh}
         return response
@@ -130,13 +134,14 @@ class RefreshUC(BaseUC):
         username = find_username.scalar()
 
         if exist_demo_user:
-            new_jwt = get_jwt_token({'session': exist_session.id.hex, 'demo': True})
+            new_jwt = get_jwt_token({'session': exist_session.id.hex, 'user': exist_session.user_id, 'demo': True})
         else:
-            new_jwt = get_jwt_token({'session': exist_session.id.hex})
+            new_jwt = get_jwt_token({'session': exist_session.id.hex, 'user': exist_session.user_id})
 
         exist_session.refresh = get_refresh_token()
         exist_session.expired_at = now_utc() + timedelta(seconds=REFRESH_EXPIRATION)
         await self.session.commit()
+        session_cache.invalidate(exist_session.id.hex)
 
         response = {'user_id': exist_session.user_id, 'name': username, 'jwt': new_jwt, 'refresh': exist_session.refresh}
         return response
@@ -151,6 +156,7 @@ class LogoutUC(BaseUC):
         find_session = await self.session.execute(query)
         exist_session = find_session.scalar()
         exist_session.expired_at = now_utc()
+        await revoke_sessions(self.session, [req.session_id])
         await self.session.commit()
         return {}
 
@@ -169,7 +175,10 @@ class LogoutOthersUC(BaseUC):
         find_all_sessions = await self.session.execute(query)
         current_sessions = find_all_sessions.scalars()
 
+        expired_ids = []
         for user_session in current_sessions:
             user_session.expired_at = now_utc()
+            expired_ids.append(user_session.id.hex)
+        await revoke_sessions(self.session, expired_ids)
         await self.session.commit()
         return {}
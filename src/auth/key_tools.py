@@ -1,25 +1,112 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Callable
 from uuid import uuid4
 
 import jwt
 from passlib.context import CryptContext
-from config import JWT_EXPIRATION, JWT_ALGORITHM, JWT_SECRET, HASH_SALT
+from config import JWT_EXPIRATION, JWT_ALGORITHM, JWT_SECRET, HASH_SALT, PASSWORD_SCHEME, PASSWORD_ROUNDS, \
+    PASSWORD_HASH_WORKERS
 from shared.time_utils import now_utc
 
 
+def build_password_context(scheme: str, rounds: int | None = None) -> CryptContext:
+    """
+    Context of the main scheme, md5_crypt hashes of existing users are still verified
+    and replaced by the main scheme on login. Rounds are the cost of the main scheme only.
+    """
+    schemes = list(dict.fromkeys([scheme, 'md5_crypt']))
+    settings = {f'{scheme}__rounds': rounds} if rounds else {}
+    return CryptContext(schemes=schemes, deprecated='auto', **settings)
+
+
+password_context = build_password_context(PASSWORD_SCHEME, PASSWORD_ROUNDS)
+
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing and verification,
+    a burst of logins waits in the pool queue instead of blocking the event loop
+    """
+
+    def __init__(self, workers: int):
+        self.__workers = workers
+        self.__pool: ThreadPoolExecutor | None = None
+        self.__calls = 0
+        self.__time_total = 0.0
+        self.__time_max = 0.0
+        self.__queue_wait_total = 0.0
+        self.__queue_wait_max = 0.0
+
+    @staticmethod
+    def __measure(func: Callable, submitted_at: float, *args) -> tuple[object, float, float]:
+        """Runs in the pool thread, returns the result, the time in the queue and the hashing time"""
+        started_at = time.perf_counter()
+        result = func(*args)
+        return result, started_at - submitted_at, time.perf_counter() - started_at
+
+    async def run(self, func: Callable, *args):
+        if self.__pool is None:
+            self.__pool = ThreadPoolExecutor(max_workers=self.__workers, thread_name_prefix='password')
+        loop = asyncio.get_running_loop()
+        result, queue_wait, spent = await loop.run_in_executor(self.__pool, self.__measure, func, time.perf_counter(),
+                                                               *args)
+        self.__calls += 1
+        self.__time_total += spent
+        self.__time_max = max(self.__time_max, spent)
+        self.__queue_wait_total += queue_wait
+        self.__queue_wait_max = max(self.__queue_wait_max, queue_wait)
+        return result
+
+    def shutdown(self) -> None:
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False, cancel_futures=True)
+            self.__pool = None
+
+    @property
+    def stats(self) -> dict:
+        calls = self.__calls
+        return {
+            'scheme': PASSWORD_SCHEME,
+            'rounds': PASSWORD_ROUNDS,
+            'workers': self.__workers,
+            'calls': calls,
+            'time_avg_ms': self.__time_total / calls * 1000 if calls else 0.0,
+            'time_max_ms': self.__time_max * 1000,
+            'queue_wait_avg_ms': self.__queue_wait_total / calls * 1000 if calls else 0.0,
+            'queue_wait_max_ms': self.__queue_wait_max * 1000,
+        }
+
+
+hashing_pool = HashingPool(PASSWORD_HASH_WORKERS)
+
+
 def check_password(pwd: str, pwd_hash: str) -> bool:
     """Сопоставить пароль с хешем"""
     salted_pwd = ''.join([pwd, HASH_SALT])
-    encrypter = CryptContext(schemes=['md5_crypt'])
-    return encrypter.verify(salted_pwd, pwd_hash)
+    return password_context.verify(salted_pwd, pwd_hash)
 
 
 def get_hash(pwd: str) -> str:
     """Получить хеш соленого пароля"""
     salted_pwd = ''.join([pwd, HASH_SALT])
-    encrypter = CryptContext(schemes=['md5_crypt'])
-    hash_result = encrypter.hash(salted_pwd)
-    return hash_result
+    return password_context.hash(salted_pwd)
+
+
+def verify_and_update(pwd: str, pwd_hash: str) -> tuple[bool, str | None]:
+    """Сопоставить пароль с хешем, вернуть новый хеш, если схема или стоимость хеша устарели"""
+    salted_pwd = ''.join([pwd, HASH_SALT])
+    return password_context.verify_and_update(salted_pwd, pwd_hash)
+
+
+async def hash_password(pwd: str) -> str:
+    return await hashing_pool.run(get_hash, pwd)
+
+
+async def verify_password(pwd: str, pwd_hash: str) -> tuple[bool, str | None]:
+    return await hashing_pool.run(verify_and_update, pwd, pwd_hash)
 
 
 def get_jwt_token(data: dict) -> str:
@@ -0,0 +1,47 @@
+import time
+from datetime import datetime
+from uuid import UUID
+
+
+class RevocationSet:
+    """
+    Ids of revoked sessions whose JWT may still be unexpired, used by the stateless authorization.
+    Ids are kept as 16-byte keys until retention seconds (the JWT lifetime) have passed since the revocation.
+    """
+
+    def __init__(self, retention: float, clock=time.time):
+        self.__retention = retention
+        self.__clock = clock
+        self.__entries: dict[bytes, float] = {}
+        self.__loaded_at: float | None = None
+
+    @staticmethod
+    def __key(session_id: str | UUID) -> bytes:
+        return session_id.bytes if isinstance(session_id, UUID) else bytes.fromhex(session_id)
+
+    def add(self, *session_ids: str | UUID, revoked_at: float = None) -> None:
+        drop_at = (self.__clock() if revoked_at is None else revoked_at) + self.__retention
+        for session_id in session_ids:
+            key = self.__key(session_id)
+            self.__entries[key] = max(drop_at, self.__entries.get(key, drop_at))
+
+    def load(self, rows) -> None:
+        """Merges (session id, revocation date) rows read from the database and drops outdated ids"""
+        for session_id, revoked_at in rows:
+            self.add(session_id, revoked_at=revoked_at.timestamp() if isinstance(revoked_at, datetime) else revoked_at)
+        now = self.__clock()
+        self.__entries = {key: drop_at for key, drop_at in self.__entries.items() if drop_at > now}
+        self.__loaded_at = time.monotonic()
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether the set was loaded from the database less than max_age seconds ago"""
+        return self.__loaded_at is not None and time.monotonic() - self.__loaded_at < max_age
+
+    def __contains__(self, session_id: str | UUID) -> bool:
+        try:
+            return self.__key(session_id) in self.__entries
+        except ValueError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from shared.time_utils import now_utc
+
+
+class SessionCache:
+    """
+    LRU of valid user sessions by session id, an entry is trusted for ttl seconds after the Session row was read.
+    Sessions expired or refreshed by this process are invalidated explicitly,
+    changes made by other processes become visible after at most ttl seconds.
+    """
+
+    def __init__(self, ttl: float, max_size: int, clock=time.monotonic):
+        self.__ttl = ttl
+        self.__max_size = max_size
+        self.__clock = clock
+        self.__entries: OrderedDict[str, tuple[float, int, datetime]] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, session_id: str) -> int | None:
+        """Returns the user id of the cached session if the entry is fresh and the session is not expired"""
+        entry = self.__entries.get(session_id)
+        if entry is None:
+            self.__misses += 1
+            return
+        cached_at, user_id, expired_at = entry
+        if self.__clock() - cached_at >= self.__ttl or expired_at < now_utc():
+            del self.__entries[session_id]
+            self.__misses += 1
+            return
+        self.__entries.move_to_end(session_id)
+        self.__hits += 1
+        return user_id
+
+    def put(self, session_id: str, user_id: int, expired_at: datetime) -> None:
+        if self.__ttl <= 0 or self.__max_size <= 0:
+            return
+        self.__entries[session_id] = (self.__clock(), user_id, expired_at)
+        self.__entries.move_to_end(session_id)
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+
+    def invalidate(self, *session_ids: str) -> None:
+        for session_id in session_ids:
+            self.__entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': len(self.__entries),
+            'max_size': self.__max_size,
+            'ttl': self.__ttl,
+            'hits': self.__hits,
+            'misses': self.__misses,
+        }
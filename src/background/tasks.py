@@ -4,7 +4,9 @@ from datetime import timedelta
 from sqlalchemy import select
 
 from db_connect.connect import async_session
+from auth.access_checker import revoke_user_sessions
 from models.models import DemoUser, User
+from models.models_events import remove_project_folders
 from config import DEMO_USER_EXPIRATION, MEDIA_DIR, TEMP_FILES_EXPIRATION
 from shared.file_transporter import remove_files_older_than
 from shared.time_utils import now_utc
@@ -13,11 +15,14 @@ from shared.time_utils import now_utc
 async def clear_demo_users():
     """Removes expired demo accounts"""
     async with async_session() as session:
-        query = select(DemoUser.user_id).filter(DemoUser.created_at + timedelta(seconds=DEMO_USER_EXPIRATION) < now_utc())
+        expired_before = now_utc() - timedelta(seconds=DEMO_USER_EXPIRATION)
+        query = select(DemoUser.user_id).filter(DemoUser.created_at < expired_before)
         find_ids_to_delete = await session.execute(query)
         ids_to_delete = find_ids_to_delete.scalars().all()
 
         if ids_to_delete:
+            await revoke_user_sessions(session, ids_to_delete)
+            await session.run_sync(lambda sync_session: remove_project_folders(sync_session, ids_to_delete))
             query = User.__table__.delete().where(User.id.in_(ids_to_delete))
             await session.execute(query)
             await session.commit()
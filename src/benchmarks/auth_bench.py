@@ -0,0 +1,78 @@
+"""
+Benchmark of authenticated endpoint throughput with and without the session cache.
+Each request runs get_session_data and the project list endpoint in its own database session,
+requests are sent by several concurrent clients. A temporary session of the user is created and expired afterwards.
+
+Command:
+    python -m benchmarks.auth_bench <user_id> [<requests count> <clients count>]
+"""
+
+
+import asyncio
+import sys
+import time
+from datetime import timedelta
+
+from starlette.requests import Request
+
+from auth import access_checker
+from auth.key_tools import get_jwt_token
+from auth.session_cache import SessionCache
+from config import SESSION_CACHE_TTL, SESSION_CACHE_SIZE
+from db_connect.connect import async_session, engine
+from models.models import Session
+from routers.project_router import projects_list
+from shared.time_utils import now_utc
+
+
+async def authenticated_request(jwt: str) -> None:
+    request = Request({'type': 'http', 'method': 'GET', 'path': '/projects/', 'headers': [(b'jwt', jwt.encode())]})
+    async with async_session() as session:
+        session_data = await access_checker.get_session_data(request, session)
+        await projects_list(session_data)
+
+
+async def measure(jwt: str, requests: int, clients: int) -> float:
+    """Requests per second"""
+    async def client(count: int) -> None:
+        for _ in range(count):
+            await authenticated_request(jwt)
+
+    await authenticated_request(jwt)
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client(requests // clients) for _ in range(clients)))
+    return requests // clients * clients / (time.perf_counter() - started_at)
+
+
+async def run_benchmark(user_id: int, requests: int, clients: int) -> None:
+    engine.echo = False
+    async with async_session() as session:
+        user_session = Session(user_id=user_id, expired_at=now_utc() + timedelta(hours=1))
+        session.add(user_session)
+        await session.commit()
+    jwt = get_jwt_token({'session': user_session.id.hex, 'user': user_id})
+
+    try:
+        access_checker.session_cache = SessionCache(0, 0)
+        without_cache = await measure(jwt, requests, clients)
+        access_checker.session_cache = SessionCache(SESSION_CACHE_TTL or 10, SESSION_CACHE_SIZE)
+        with_cache = await measure(jwt, requests, clients)
+    finally:
+        async with async_session() as session:
+            user_session.expired_at = now_utc()
+            await session.merge(user_session)
+            await session.commit()
+        await engine.dispose()
+
+    print(f'Requests: {requests}, clients: {clients}')
+    print(f'{"":<16}{"req/s":>10}')
+    print(f'{"without cache":<16}{without_cache:>10.1f}')
+    print(f'{"with cache":<16}{with_cache:>10.1f}')
+    print(f'{"ratio":<16}{with_cache / without_cache:>10.2f}')
+
+
+args = sys.argv
+if len(args) < 2:
+    print('Error: specify the user id')
+    sys.exit(1)
+asyncio.run(run_benchmark(int(args[1]), int(args[2]) if len(args) > 2 else 2000, int(args[3]) if len(args) > 3 else 10))
@@ -0,0 +1,178 @@
+"""
+Micro-benchmark suite of the graph engine on synthetic projects (chain, wide, random shapes).
+Measures time and peak memory of the activation tree, the topological order, the incremental validation
+(NodesOverlay + GrafChangesDTO), the next version of the cached graph and GraphEncoder round-trips.
+Results are written to a JSON file, two result files can be compared.
+
+Commands:
+Run the suite and write results (sizes by default: 1000 10000 100000).
+    python -m benchmarks.graph_bench run <output.json> [<size> ...]
+
+Compare two result files.
+    python -m benchmarks.graph_bench compare <base.json> <new.json>
+"""
+
+
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.graph_generator import SHAPES, generate_project, generate_new_nodes, generate_changes, \
+    generate_contents, pick_leaves
+from graph_processing.activation import ActivationTree
+from graph_processing.graph_cache import CachedGraph
+from graph_processing.graph_encoder import GraphEncoder
+from graph_processing.graph_schemas import GrafChangesDTO, build_children_index
+from graph_processing.overlay import NodesOverlay
+from graph_processing.topology import TopologicalOrder
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+CHANGE_SIZE = 100
+
+
+def measure(func, setup=None, repeat: int = 3) -> dict:
+    """Best time of several runs and peak memory of one run, setup is not measured"""
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup() if setup else ()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time_ms': min(times) * 1000, 'peak_kb': peak / 1024}
+
+
+def validate(nodes: dict, children: dict, new_nodes: dict, changes: dict) -> list:
+    """Incremental validation of a write as done by the node use cases"""
+    candidate = NodesOverlay(nodes)
+    for node_id, fields in new_nodes.items():
+        candidate.add_node(node_id, fields)
+    for node_id, fields in changes.items():
+        candidate.change_node(node_id, fields)
+    return GrafChangesDTO(candidate, children).errors
+
+
+def make_cases(nodes: dict) -> dict:
+    """Benchmark cases of the project, each case is a pair (function, setup)"""
+    new_nodes = generate_new_nodes(nodes, CHANGE_SIZE)
+    changes = generate_changes(nodes, CHANGE_SIZE)
+    contents = generate_contents(nodes, CHANGE_SIZE)
+    removed = pick_leaves(nodes, CHANGE_SIZE)
+    # leaves have no descendants, so moving them never creates a cycle
+    rnd = random.Random(0)
+    node_ids = list(nodes)
+    moves = {node_id: {'parent_id': rnd.choice(node_ids)} for node_id in pick_leaves(nodes, CHANGE_SIZE, seed=1)}
+    moves = {node_id: fields for node_id, fields in moves.items() if fields['parent_id'] != node_id}
+
+    # serialize_nodes takes nodes in the request format, without the id field
+    request_nodes = {node_id: {key: value for key, value in fields.items() if key != 'id'}
+                     for node_id, fields in nodes.items()}
+    db_objects = GraphEncoder().serialize_nodes(request_nodes, project_id=1)
+    order = TopologicalOrder.from_nodes(nodes)
+    children = build_children_index(nodes)
+    entry = CachedGraph(1, nodes, {}, order, children)
+    content_nodes = {node_id: {**nodes[node_id], 'content': content} for node_id, content in contents.items()
+                     if node_id not in removed}
+    change_list = GraphEncoder().serialize_to_dict({**new_nodes, **content_nodes}, 1, nodes)
+    content_change_list = GraphEncoder().serialize_to_dict(content_nodes, 1, nodes)
+
+    def warm_tree():
+        tree = ActivationTree.from_nodes(nodes)
+        tree.evaluate(contents)
+        return (tree,)
+
+    def entry_with_tree():
+        fresh_entry = CachedGraph(1, nodes, {}, order, children)
+        fresh_entry.activation.evaluate({})
+        return (fresh_entry,)
+
+    return {
+        'encoder_serialize_nodes': (lambda: GraphEncoder().serialize_nodes(request_nodes, project_id=1), None),
+        'encoder_serialize_to_dict': (lambda: GraphEncoder().serialize_to_dict(nodes, project_id=1), None),
+        'encoder_deserialize_nodes': (lambda: GraphEncoder().deserialize_nodes(db_objects), None),
+        'activation_tree_init': (lambda: ActivationTree.from_nodes(nodes), None),
+        'activation_tree_change_contents': (
+            lambda tree: tree.change_contents(contents), lambda: (ActivationTree.from_nodes(nodes),)
+        ),
+        'activation_tree_evaluate': (
+            lambda tree: tree.evaluate(contents), lambda: (ActivationTree.from_nodes(nodes),)
+        ),
+        'activation_tree_evaluate_memo': (lambda tree: tree.evaluate(contents), warm_tree),
+        'topology_init': (lambda: TopologicalOrder.from_nodes(nodes), None),
+        'topology_apply_add': (lambda copy: copy.apply_changes(new_nodes), lambda: (order.copy(),)),
+        'topology_apply_move': (lambda copy: copy.apply_changes(moves), lambda: (order.copy(),)),
+        'topology_apply_remove': (lambda copy: copy.apply_changes({}, removed), lambda: (order.copy(),)),
+        'validation_add': (lambda: validate(nodes, children, new_nodes, {}), None),
+        'validation_change': (lambda: validate(nodes, children, {}, changes), None),
+        'validation_move': (lambda: validate(nodes, children, {}, moves), None),
+        'cached_graph_updated': (lambda: entry.updated(2, change_list, removed, order=order), None),
+        'cached_graph_updated_contents': (
+            lambda current: current.updated(2, content_change_list, order=order), entry_with_tree
+        ),
+    }
+
+
+def run_suite(sizes: list[int]) -> dict:
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+    for shape in SHAPES:
+        for size in sizes:
+            nodes = generate_project(shape, size)
+            repeat = max(1, 10000 // size)
+            for name, (func, setup) in make_cases(nodes).items():
+                key = f'{shape}/{size}/{name}'
+                try:
+                    results['results'][key] = measure(func, setup, repeat)
+                except Exception as error:
+                    results['results'][key] = {'error': repr(error)}
+                print(key, results['results'][key])
+    return results
+
+
+def compare(base: dict, new: dict) -> None:
+    print(f'{"case":<56}{"base, ms":>12}{"new, ms":>12}{"ratio":>8}{"base, KB":>12}{"new, KB":>12}')
+    for key, new_result in new['results'].items():
+        base_result = base['results'].get(key)
+        if not base_result or 'error' in base_result or 'error' in new_result:
+            print(f'{key:<56}{"-":>12}{"-":>12}')
+            continue
+        ratio = new_result['time_ms'] / base_result['time_ms'] if base_result['time_ms'] else 0
+        print(f'{key:<56}{base_result["time_ms"]:>12.3f}{new_result["time_ms"]:>12.3f}{ratio:>8.2f}'
+              f'{base_result["peak_kb"]:>12.1f}{new_result["peak_kb"]:>12.1f}')
+
+
+def run_cli(launch_args: list) -> None:
+    if len(launch_args) < 3 or launch_args[1] not in ['run', 'compare']:
+        print(__doc__)
+        sys.exit(1)
+
+    if launch_args[1] == 'run':
+        sizes = [int(size) for size in launch_args[3:]] or DEFAULT_SIZES
+        results = run_suite(sizes)
+        with open(launch_args[2], 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'Results are written to {launch_args[2]}')
+    else:
+        if len(launch_args) < 4:
+            print(__doc__)
+            sys.exit(1)
+        with open(launch_args[2]) as base_file, open(launch_args[3]) as new_file:
+            compare(json.load(base_file), json.load(new_file))
+
+
+args = sys.argv
+run_cli(args)
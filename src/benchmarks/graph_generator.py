@@ -0,0 +1,124 @@
+import random
+from uuid import uuid4
+
+
+SHAPES = ('chain', 'wide', 'random')
+
+OPTIONS = ['red', 'green', 'blue', 'yellow', 'black']
+
+
+def make_node(rnd: random.Random, node_id: str, parent: dict | None, number: int) -> dict:
+    """Node of the documented format with a condition compatible with the parent data type"""
+    node_type = rnd.choice(['text', 'entry', 'checkbox', 'select'])
+    if node_type == 'checkbox':
+        data_type, content = 'bool', rnd.random() > 0.5
+    elif node_type == 'select':
+        data_type, content = 'string', rnd.choice(OPTIONS)
+    elif rnd.random() > 0.5:
+        data_type, content = 'integer', rnd.randint(0, 100)
+    else:
+        data_type, content = 'string', rnd.choice(OPTIONS)
+
+    condition, trigger = None, None
+    if parent and rnd.random() > 0.2:
+        if parent['data_type'] == 'integer':
+            condition, trigger = rnd.choice(['gt', 'lt', 'gte', 'lte', 'equal', 'not_equal']), rnd.randint(0, 100)
+        elif parent['data_type'] == 'bool':
+            condition, trigger = rnd.choice(['equal', 'not_equal']), rnd.random() > 0.5
+        else:
+            condition, trigger = rnd.choice(['equal', 'not_equal']), rnd.choice(OPTIONS)
+
+    node = {
+        'id': node_id,
+        'parent_id': parent['id'] if parent else None,
+        'name': f'node {number}',
+        'description': 'description',
+        'data_type': data_type,
+        'node_type': node_type,
+        'content': content,
+        'condition': condition,
+        'trigger': trigger,
+        'x': rnd.randint(0, 1000),
+        'y': rnd.randint(0, 1000),
+        'active': False,
+    }
+    if node_type == 'select':
+        node['options'] = list(OPTIONS)
+        node['view_type'] = rnd.choice(['drop_list', 'radiobutton'])
+    return node
+
+
+def generate_project(shape: str, size: int, seed: int = 0) -> dict:
+    """
+    Synthetic project in the graph container format.
+    chain - one deep branch, wide - select parents with a large fan-out of 'equal' children,
+    random - random tree with several roots
+    """
+    if shape not in SHAPES:
+        raise ValueError(f'Unknown shape "{shape}", expected: {SHAPES}')
+
+    rnd = random.Random(seed)
+    nodes = {}
+    ids = []
+    for number in range(size):
+        if not ids:
+            parent = None
+        elif shape == 'chain':
+            parent = nodes[ids[-1]]
+        elif shape == 'wide':
+            parent = nodes[ids[(number - 1) // 1000 * 1000]]
+        else:
+            parent = nodes[rnd.choice(ids)] if rnd.random() > 0.01 else None
+
+        node_id = str(uuid4())
+        node = make_node(rnd, node_id, parent, number)
+        if shape == 'wide' and (number % 1000 == 0):
+            node.update({'node_type': 'select', 'data_type': 'string', 'content': rnd.choice(OPTIONS),
+                         'options': list(OPTIONS), 'view_type': 'drop_list'})
+        nodes[node_id] = node
+        ids.append(node_id)
+    return nodes
+
+
+def generate_new_nodes(nodes: dict, count: int, seed: int = 0) -> dict:
+    """Nodes to add, attached to random nodes of the project"""
+    rnd = random.Random(seed)
+    ids = list(nodes)
+    new_nodes = {}
+    for number in range(count):
+        node_id = str(uuid4())
+        new_node = make_node(rnd, node_id, nodes[rnd.choice(ids)], len(ids) + number)
+        new_node.pop('id')
+        new_nodes[node_id] = new_node
+    return new_nodes
+
+
+def generate_changes(nodes: dict, count: int, seed: int = 0) -> dict:
+    """Non-structural changes of random nodes: name and coordinates"""
+    rnd = random.Random(seed)
+    changes = {}
+    for node_id in rnd.sample(list(nodes), min(count, len(nodes))):
+        changes[node_id] = {'name': f'changed {node_id[:8]}', 'x': rnd.randint(0, 1000), 'y': rnd.randint(0, 1000)}
+    return changes
+
+
+def generate_contents(nodes: dict, count: int, seed: int = 0) -> dict:
+    """New contents of random nodes, compatible with their data types"""
+    rnd = random.Random(seed)
+    contents = {}
+    for node_id in rnd.sample(list(nodes), min(count, len(nodes))):
+        data_type = nodes[node_id]['data_type']
+        if data_type == 'integer':
+            contents[node_id] = rnd.randint(0, 100)
+        elif data_type == 'bool':
+            contents[node_id] = rnd.random() > 0.5
+        else:
+            contents[node_id] = rnd.choice(OPTIONS)
+    return contents
+
+
+def pick_leaves(nodes: dict, count: int, seed: int = 0) -> list[str]:
+    """Random leaf nodes, so removal cost does not depend on the branch size"""
+    parents = {fields['parent_id'] for fields in nodes.values()}
+    leaves = [node_id for node_id in nodes if node_id not in parents]
+    return random.Random(seed).sample(leaves, min(count, len(leaves)))
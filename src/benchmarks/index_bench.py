@@ -0,0 +1,140 @@
+"""
+EXPLAIN-based benchmark of the lookup indexes against a local Postgres (the database from the config).
+Creates the model tables in a separate schema, seeds them with reproducible data, runs EXPLAIN ANALYZE
+of the hot queries without the model indexes and with them, then drops the schema.
+
+Command:
+    python -m benchmarks.index_bench [<users count>]
+"""
+
+
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from db_connect.connect import engine
+from models.models import Base
+from shared.json_codec import loads
+
+SCHEMA = 'index_bench'
+REPEAT = 5
+
+# 5 projects and 10 sessions per user, 100 nodes, 5 documents and 5 templates per project,
+# every third user is a demo user
+SEED = (
+    "SELECT setseed(0.42)",
+    """INSERT INTO users (id, name, email, is_active, is_superuser, is_verified, created_at, updated_at)
+       SELECT i, 'user ' || i, 'user' || i || '@bench.com', true, false, false, now(), now()
+       FROM generate_series(1, :users) AS i""",
+    """INSERT INTO simple_entries (id, login, hashed_password, user_id, created_at, updated_at)
+       SELECT i, 'login' || i, 'hash', i, now(), now() FROM generate_series(1, :users) AS i""",
+    """INSERT INTO demo_users (id, user_id, created_at, updated_at)
+       SELECT i, i, now() - random() * interval '30 days', now() FROM generate_series(1, :users, 3) AS i""",
+    """INSERT INTO projects (id, name, user_id, nodes_version, created_at, updated_at)
+       SELECT i, 'project ' || i, (i - 1) / 5 + 1, 0, now(), now() FROM generate_series(1, :users * 5) AS i""",
+    """INSERT INTO documents (id, name, project_id, created_at, updated_at)
+       SELECT i, 'document ' || i, (i - 1) / 5 + 1, now(), now() FROM generate_series(1, :users * 25) AS i""",
+    """INSERT INTO templates (id, name, project_id, created_at, updated_at)
+       SELECT i, 'template ' || i, (i - 1) / 5 + 1, now(), now() FROM generate_series(1, :users * 25) AS i""",
+    """INSERT INTO nodes (id, name, data_type, node_type, active, depth, project_id, json, created_at, updated_at)
+       SELECT md5(i::text)::uuid, 'node ' || i, 'number', 'question', false, 0, (i - 1) / 100 + 1, '{}', now(), now()
+       FROM generate_series(1, :users * 500) AS i""",
+    """INSERT INTO sessions (id, refresh, user_id, expired_at, created_at, updated_at)
+       SELECT md5('s' || i)::uuid, md5('r' || i)::uuid, (i - 1) / 10 + 1,
+              now() + (random() - 0.8) * interval '30 days', now(), now()
+       FROM generate_series(1, :users * 10) AS i""",
+)
+
+# the statements of the use cases that filter on the indexed columns, ids of the middle user
+QUERIES = {
+    'project graph load': "SELECT * FROM nodes WHERE project_id = {project_id}",
+    'project list': "SELECT * FROM projects WHERE user_id = {user_id}",
+    'document list': """SELECT projects.id, documents.id, documents.name, documents.created_at
+                        FROM projects LEFT OUTER JOIN documents ON documents.project_id = projects.id
+                        WHERE projects.user_id = {user_id} AND projects.id = {project_id}""",
+    'template list': "SELECT * FROM templates WHERE project_id = {project_id}",
+    'refresh': "SELECT * FROM sessions WHERE refresh = md5('r{session}')::uuid",
+    'logout others': """SELECT * FROM sessions
+                        WHERE user_id = {user_id} AND id != md5('s{session}')::uuid AND expired_at > now()""",
+    'revocation reload': """SELECT id, expired_at FROM sessions
+                            WHERE expired_at <= now() AND expired_at > now() - interval '15 minutes'""",
+    'demo users cleanup': "SELECT user_id FROM demo_users WHERE created_at < now() - interval '29 days'",
+    'login user': "SELECT * FROM simple_entries WHERE user_id = {user_id}",
+}
+
+
+def plan_summary(plan: dict) -> str:
+    """Scan nodes of the plan: type and index"""
+    scans = []
+
+    def walk(node):
+        if 'Scan' in node['Node Type']:
+            index = f' ({node["Index Name"]})' if 'Index Name' in node else ''
+            scans.append(node['Node Type'] + index)
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan)
+    return ', '.join(scans)
+
+
+async def explain(connection, users: int) -> dict:
+    user_id = users // 2
+    params = {'user_id': user_id, 'project_id': user_id * 5, 'session': user_id * 10}
+    results = {}
+    for name, query in QUERIES.items():
+        best_time, summary = None, ''
+        for _ in range(REPEAT):
+            result = await connection.execute(text('EXPLAIN (ANALYZE, FORMAT JSON) ' + query.format(**params)))
+            plan = result.scalar()
+            plan = (loads(plan) if isinstance(plan, str) else plan)[0]
+            if best_time is None or plan['Execution Time'] < best_time:
+                best_time, summary = plan['Execution Time'], plan_summary(plan['Plan'])
+        results[name] = (best_time, summary)
+    return results
+
+
+async def analyze(connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        await connection.execute(text(f'ANALYZE {table.name}'))
+
+
+async def run_benchmark(users: int) -> None:
+    engine.echo = False
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+    async with engine.connect() as connection:
+        try:
+            await connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+            await connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+            await connection.execute(text(f'SET search_path TO {SCHEMA}'))
+            await connection.run_sync(Base.metadata.create_all)
+            for statement in SEED:
+                await connection.execute(text(statement), {'users': users} if ':users' in statement else {})
+
+            for index in indexes:
+                await connection.execute(text(f'DROP INDEX {index.name}'))
+            await analyze(connection)
+            without_indexes = await explain(connection, users)
+
+            for index in indexes:
+                await connection.run_sync(index.create)
+            await analyze(connection)
+            with_indexes = await explain(connection, users)
+        finally:
+            await connection.rollback()
+            await connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+            await connection.commit()
+    await engine.dispose()
+
+    print(f'Users: {users}, execution time is the best of {REPEAT}, ms')
+    for name in QUERIES:
+        time_without, plan_without = without_indexes[name]
+        time_with, plan_with = with_indexes[name]
+        print(f'{name}: {time_without:.3f} -> {time_with:.3f}')
+        print(f'    without: {plan_without}')
+        print(f'    with:    {plan_with}')
+
+
+args = sys.argv
+asyncio.run(run_benchmark(int(args[1]) if len(args) > 1 else 2000))
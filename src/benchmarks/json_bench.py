@@ -0,0 +1,61 @@
+"""
+Benchmark of the JSON encoding of graph payloads: the current FastAPI path (OutputDataDTO response model,
+jsonable_encoder and stdlib json) and the Node.json column path against the fast codec.
+
+Command:
+    python -m benchmarks.json_bench [<nodes count>]
+"""
+
+
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.graph_generator import generate_project
+from shared.common_schemas import OutputDataDTO
+from shared.json_codec import dumps, dumps_bytes, loads, orjson
+
+
+def fastapi_path(payload: dict) -> bytes:
+    """What FastAPI does with the response model and JSONResponse"""
+    content = jsonable_encoder(OutputDataDTO(data=payload))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')).encode()
+
+
+def run_benchmark(size: int) -> None:
+    nodes = generate_project('random', size)
+    created_at = datetime.now(timezone.utc)
+    active_nodes = {node_id: {**fields, 'created_at': created_at} for node_id, fields in nodes.items()}
+    payload = {'project_id': 1, 'project_name': 'project', 'active_nodes': active_nodes}
+    json_blobs = [{'content': fields['content'], 'condition': fields['condition'], 'trigger': fields['trigger']}
+                  for fields in nodes.values()]
+    encoded_blobs = [json.dumps(blob) for blob in json_blobs]
+    repeat = max(1, 20_000 // size)
+
+    results = {
+        'response, ms': (
+            timeit.timeit(lambda: fastapi_path(payload), number=repeat) / repeat * 1000,
+            timeit.timeit(lambda: dumps_bytes({'success': True, 'data': payload, 'details': None}),
+                          number=repeat) / repeat * 1000,
+        ),
+        'Node.json dumps, ms': (
+            timeit.timeit(lambda: [json.dumps(blob) for blob in json_blobs], number=repeat) / repeat * 1000,
+            timeit.timeit(lambda: [dumps(blob) for blob in json_blobs], number=repeat) / repeat * 1000,
+        ),
+        'Node.json loads, ms': (
+            timeit.timeit(lambda: [json.loads(blob) for blob in encoded_blobs], number=repeat) / repeat * 1000,
+            timeit.timeit(lambda: [loads(blob) for blob in encoded_blobs], number=repeat) / repeat * 1000,
+        ),
+    }
+
+    print(f'Nodes: {size}, codec: {"orjson" if orjson else "stdlib json"}')
+    print(f'{"":<24}{"current":>12}{"codec":>12}{"ratio":>8}')
+    for name, (current_result, codec_result) in results.items():
+        print(f'{name:<24}{current_result:>12.3f}{codec_result:>12.3f}{current_result / codec_result:>8.1f}')
+
+
+args = sys.argv
+run_benchmark(int(args[1]) if len(args) > 1 else 5000)
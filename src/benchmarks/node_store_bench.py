@@ -0,0 +1,57 @@
+"""
+Benchmark of the graph container representations: dict of dicts (GraphEncoder.deserialize_nodes output)
+against the compact NodeStore.
+Measures memory of the container, build time and copy time.
+
+Command:
+    python -m benchmarks.node_store_bench [<nodes count>]
+"""
+
+
+import sys
+import timeit
+import tracemalloc
+from copy import deepcopy
+
+from benchmarks.graph_generator import generate_project
+from graph_processing.node_store import NodeStore
+
+
+def measure_memory(factory) -> int:
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    container = factory()
+    size = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+    tracemalloc.stop()
+    del container
+    return size
+
+
+def run_benchmark(size: int) -> None:
+    nodes = generate_project('random', size)
+    store = NodeStore.from_nodes(nodes)
+    repeat = max(1, 100_000 // size)
+
+    results = {
+        'memory per node, bytes': (
+            measure_memory(lambda: deepcopy(nodes)) / size,
+            measure_memory(lambda: NodeStore.from_nodes(nodes)) / size,
+        ),
+        'build, ms': (
+            timeit.timeit(lambda: deepcopy(nodes), number=repeat) / repeat * 1000,
+            timeit.timeit(lambda: NodeStore.from_nodes(nodes), number=repeat) / repeat * 1000,
+        ),
+        'copy, ms': (
+            timeit.timeit(lambda: deepcopy(nodes), number=repeat) / repeat * 1000,
+            timeit.timeit(store.copy, number=repeat) / repeat * 1000,
+        ),
+    }
+
+    print(f'Nodes: {size}')
+    print(f'{"":<24}{"dict":>12}{"NodeStore":>12}{"ratio":>8}')
+    for name, (dict_result, store_result) in results.items():
+        print(f'{name:<24}{dict_result:>12.3f}{store_result:>12.3f}{dict_result / store_result:>8.1f}')
+
+
+args = sys.argv
+run_benchmark(int(args[1]) if len(args) > 1 else 5000)
@@ -0,0 +1,74 @@
+"""
+Benchmark of password hashing: cost of one verification for the legacy md5_crypt and the configured scheme,
+and the event loop stall during a burst of logins verified on the loop thread and in the hashing pool.
+
+Command:
+    python -m benchmarks.password_bench [<logins count>]
+"""
+
+
+import asyncio
+import sys
+import time
+import timeit
+
+from auth.key_tools import password_context, hashing_pool, check_password, get_hash, verify_password
+from config import HASH_SALT, PASSWORD_SCHEME, PASSWORD_ROUNDS
+
+PASSWORD = 'benchmark-password'
+
+
+async def max_loop_lag(burst) -> float:
+    """The longest delay of a 1 ms ticker while the burst runs, ms"""
+    lags = []
+
+    async def ticker():
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started_at - 0.001)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await burst()
+    ticker_task.cancel()
+    return max(lags) * 1000
+
+
+async def run_benchmark(logins: int) -> None:
+    legacy_hash = password_context.handler('md5_crypt').hash(PASSWORD + HASH_SALT)
+    new_hash = get_hash(PASSWORD)
+    repeat = 20
+
+    async def inline_burst():
+        for _ in range(logins):
+            check_password(PASSWORD, new_hash)
+            await asyncio.sleep(0)
+
+    async def pool_burst():
+        await asyncio.gather(*(verify_password(PASSWORD, new_hash) for _ in range(logins)))
+
+    legacy_time = timeit.timeit(lambda: check_password(PASSWORD, legacy_hash), number=repeat) / repeat * 1000
+    new_time = timeit.timeit(lambda: check_password(PASSWORD, new_hash), number=repeat) / repeat * 1000
+    print(f'Scheme: {PASSWORD_SCHEME}, rounds: {PASSWORD_ROUNDS}')
+    print(f'verify md5_crypt, ms: {legacy_time:.2f}')
+    print(f'verify {PASSWORD_SCHEME}, ms: {new_time:.2f}')
+    print(f'rehash on login: {(await verify_password(PASSWORD, legacy_hash))[1] is not None}')
+
+    started_at = time.perf_counter()
+    inline_lag = await max_loop_lag(inline_burst)
+    inline_time = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    pool_lag = await max_loop_lag(pool_burst)
+    pool_time = time.perf_counter() - started_at
+
+    print(f'Burst of {logins} logins')
+    print(f'{"":<10}{"logins/s":>10}{"max loop lag, ms":>18}')
+    print(f'{"inline":<10}{logins / inline_time:>10.1f}{inline_lag:>18.2f}')
+    print(f'{"pool":<10}{logins / pool_time:>10.1f}{pool_lag:>18.2f}')
+    print(hashing_pool.stats)
+    hashing_pool.shutdown()
+
+
+args = sys.argv
+asyncio.run(run_benchmark(int(args[1]) if len(args) > 1 else 50))
@@ -1,5 +1,5 @@
 """
-The CLI script updates the "active" state of all database nodes according to the current graph configuration.
+The CLI script updates the "active" state and depth of all database nodes according to the current graph configuration.
 
 Command:
     cli_actualize_db.py
@@ -11,11 +11,14 @@ from platform import system
 import sys
 
 from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from db_connect.connect import async_session
 from graph_processing.graph import Graph
+from graph_processing.graph_cache import load_project_graph, bump_project_version, write_nodes, PROJECT_GRAPH_COLUMNS
 from graph_processing.graph_encoder import GraphEncoder
-from models.models import Project
+from graph_processing.topology import TopologicalOrder
+from models.models import Project, Node
 
 
 async def actualize_database() -> None:
@@ -25,12 +28,16 @@ async def actualize_database() -> None:
         projects_id = get_projects_id.scalars().all()
 
         for project_id in projects_id:
-            project = await session.get(Project, project_id)
-            nodes = project.nodes
-            if not nodes:
+            query = select(Project).filter_by(id=project_id)
+            query = query.options(load_only(*PROJECT_GRAPH_COLUMNS))
+            find_project = await session.execute(query)
+            project = find_project.scalar()
+            deserialized_nodes = (await load_project_graph(session, project)).nodes
+            if not deserialized_nodes:
                 continue
+            find_depths = await session.execute(select(Node.id, Node.depth).where(Node.project_id == project_id))
+            stored_depths = {str(node_id): depth for node_id, depth in find_depths}
 
-            deserialized_nodes = GraphEncoder().deserialize_nodes(nodes)
             graph = Graph(deserialized_nodes)
             actualize_nodes = graph.unload
 
@@ -38,12 +45,13 @@ async def actualize_database() -> None:
                 print(f'ACTUALIZE ERROR: {graph.get_errors}')
                 sys.exit(1)
 
-            change_list = GraphEncoder().serialize_to_dict(actualize_nodes, project_id)
-
-            for node in nodes:
-                for field, value in change_list[str(node.id)].items():
-                    setattr(node, field, value)
-
+            change_list = GraphEncoder().serialize_to_dict(actualize_nodes, project_id, deserialized_nodes)
+            # the depths are recalculated and compared with the column, since the order of the graph container
+            # trusts stored depths if all of them are set
+            depths = TopologicalOrder.from_nodes(deserialized_nodes).depths
+            depths = {node_id: depth for node_id, depth in depths.items() if stored_depths.get(node_id) != depth}
+            await write_nodes(session, project, change_list, depths)
+            await bump_project_version(session, project)
             await session.flush()
 
         await session.commit()
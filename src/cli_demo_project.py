@@ -17,7 +17,7 @@ from platform import system
 import sys
 
 from sqlalchemy import select
-from sqlalchemy.orm import noload
+from sqlalchemy.orm import selectinload
 
 from config import DEMO_PROJECT_DIR
 from db_connect.connect import async_session
@@ -31,7 +31,8 @@ async def dump_project(project_id: int) -> None:
     """Saving the target project to the file system"""
     async with async_session() as session:
         query = select(Project).filter_by(id=project_id)
-        query = query.options(noload(Project.user))
+        query = query.options(selectinload(Project.templates), selectinload(Project.documents),
+                              selectinload(Project.nodes))
         find_project = await session.execute(query)
         project = find_project.scalar()
 
@@ -11,6 +11,8 @@ if ENVIRONMENT == 'dev':
     load_dotenv(find_dotenv(f'.env.{ENVIRONMENT}'))
 
 DEBUG = bool(os.getenv('DEBUG', None))
+# number of database statements of the request in the X-Query-Count response header
+QUERY_COUNTER = bool(os.getenv('QUERY_COUNTER', None)) or DEBUG
 
 PUBLIC_HOST = os.getenv('PUBLIC_HOST', 'http://localhost:8000')
 
@@ -31,10 +33,40 @@ JWT_EXPIRATION = int(os.getenv('JWT_EXPIRATION', None))
 REFRESH_EXPIRATION = int(os.getenv('REFRESH_EXPIRATION', None))
 HASH_SALT = os.getenv('HASH_SALT', None)
 
+# new password hashes use the scheme with the cost in rounds, older hashes are rehashed on login.
+# Rounds are in the units of the scheme (log2 for bcrypt), the passlib default is used if they are not set
+PASSWORD_SCHEME = os.getenv('PASSWORD_SCHEME', 'pbkdf2_sha256')
+PASSWORD_ROUNDS = int(os.getenv('PASSWORD_ROUNDS', 100000 if PASSWORD_SCHEME == 'pbkdf2_sha256' else 0)) or None
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+
+# seconds during which a validated session is trusted without a query, 0 disables the cache
+SESSION_CACHE_TTL = float(os.getenv('SESSION_CACHE_TTL', 10))
+SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 10000))
+
+# session - every request checks the Session row (or the session cache),
+# stateless - an unexpired JWT is enough unless its session is in the revocation set
+AUTH_MODE = os.getenv('AUTH_MODE', 'session')
+REVOCATION_REFRESH_INTERVAL = int(os.getenv('REVOCATION_REFRESH_INTERVAL', 30))
+
 PASSWORD_CHANGE_KEY = os.getenv('PASSWORD_CHANGE_KEY', None)
 
 DEMO_USER_EXPIRATION = int(os.getenv('DEMO_USER_EXPIRATION', None))
 TEMP_FILES_EXPIRATION = int(os.getenv('TEMP_FILES_EXPIRATION', None))
 
+GRAPH_CACHE_SIZE = int(os.getenv('GRAPH_CACHE_SIZE', 64))
+GRAPH_EXECUTOR = os.getenv('GRAPH_EXECUTOR', 'inline')
+GRAPH_EXECUTOR_THRESHOLD = int(os.getenv('GRAPH_EXECUTOR_THRESHOLD', 5000))
+GRAPH_EXECUTOR_WORKERS = int(os.getenv('GRAPH_EXECUTOR_WORKERS', 2))
+# memory limit of the active set snapshots of the form delta mode, bytes
+FORM_SNAPSHOTS_BYTES = int(os.getenv('FORM_SNAPSHOTS_BYTES', 16 * 1024 * 1024))
+# node ids stored in the scenario memo of the activation tree of every cached graph, about 60 bytes per id
+GRAPH_ACTIVATION_MEMO_IDS = int(os.getenv('GRAPH_ACTIVATION_MEMO_IDS', 100000))
+# form scenarios are evaluated level by level with NumPy (the vectorized extra), without the scenario memo
+GRAPH_VECTORIZED = bool(os.getenv('GRAPH_VECTORIZED', None))
+
+# raises on access to columns that a use case did not declare in its loading profile,
+# relationships outside of the profile always raise
+STRICT_LOADING = bool(os.getenv('STRICT_LOADING', None))
+
 
 API_V1 = '/api/v1'
@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from config import DB_URL
+from db_connect.query_counter import track_queries
+from shared.json_codec import dumps, loads
 
-engine = create_async_engine(DB_URL, echo=True)
+engine = create_async_engine(DB_URL, echo=True, json_serializer=dumps, json_deserializer=loads)
+track_queries(engine)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """Number of statements sent to the database, executemany is one statement"""
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+
+current_counter: ContextVar[QueryCounter | None] = ContextVar('current_counter', default=None)
+
+
+def track_queries(engine: AsyncEngine) -> None:
+    """Counts statements of the engine in the counter of the current context"""
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter = current_counter.get()
+        if counter is not None:
+            counter.count += 1
+
+
+@contextmanager
+def counting_queries():
+    counter = QueryCounter()
+    token = current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        current_counter.reset(token)
+
+
+class QueryCounterMiddleware:
+    """ASGI middleware, returns the number of statements executed by the request in the X-Query-Count header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with counting_queries() as counter:
+            async def send_with_count(message):
+                if message['type'] == 'http.response.start':
+                    headers = [*message.get('headers', []), (b'x-query-count', str(counter.count).encode())]
+                    message = {**message, 'headers': headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
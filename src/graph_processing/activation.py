@@ -0,0 +1,248 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator
+
+from graph_processing.children_index import build_children_indexes
+from graph_processing.conditions import compile_store, coerce_contents, coerce_value
+from graph_processing.node_store import NodeStore, ROOT, MISSING
+
+
+class ActivationTree:
+    """
+    Calculates the "active" state of nodes.
+    Works on the node storage and keeps the index of children by trigger values,
+    so a content change recalculates only the children whose condition result may change
+    and the branches below them.
+    Scenario results of top-level branches are memoized by the contents feeding the branch,
+    the memo is limited by the total number of node ids stored in its results.
+    """
+
+    def __init__(self, store: NodeStore, memo_ids: int = 100000):
+        self.__store = store
+        self.__children: dict[int, list[int]] = store.children()
+        self.__indexes = build_children_indexes(store, self.__children)
+        self.__predicates = compile_store(store)
+        self.__typed_contents = coerce_contents(store)
+        self.__active: set[int] = set()
+        self.__branch_roots = self.__find_branch_roots()
+        self.__branch_versions: dict[int, int] = {}
+        self.__memo: OrderedDict[tuple, frozenset[str]] = OrderedDict()
+        self.__memo_ids = 0
+        self.__max_memo_ids = memo_ids
+        self.__memo_hits = 0
+        self.__memo_misses = 0
+        self.recalculate()
+
+    @classmethod
+    def from_nodes(cls, nodes: dict, memo_ids: int = 100000) -> 'ActivationTree':
+        return cls(NodeStore.from_nodes(nodes), memo_ids)
+
+    @property
+    def store(self) -> NodeStore:
+        return self.__store
+
+    def __find_branch_roots(self) -> list[int]:
+        """Top-level root of every node"""
+        branch_roots = [ROOT] * len(self.__store.parents)
+        for root in self.__children.get(ROOT, []):
+            stack = [root]
+            while stack:
+                ordinal = stack.pop()
+                branch_roots[ordinal] = root
+                stack.extend(self.__children.get(ordinal, []))
+        return branch_roots
+
+    def __calculate_node(self, ordinal: int) -> bool:
+        parent = self.__store.parents[ordinal]
+        if parent == ROOT:
+            return True
+        if not self.__store.active[parent]:
+            return False
+
+        predicate = self.__predicates[ordinal]
+        if predicate is None:
+            return True
+
+        content = self.__typed_contents[parent]
+        return content is not None and predicate(content)
+
+    def recalculate(self) -> None:
+        """Full top-down calculation of all nodes"""
+        store = self.__store
+        store.active[:] = bytes(len(store.active))
+        self.__active = set()
+
+        indexes = self.__indexes
+        typed_contents = self.__typed_contents
+        stack = list(self.__children.get(ROOT, []))
+        while stack:
+            ordinal = stack.pop()
+            store.active[ordinal] = 1
+            self.__active.add(ordinal)
+            if ordinal in indexes:
+                stack.extend(indexes[ordinal].matching(typed_contents[ordinal]))
+
+    def change_contents(self, contents: dict) -> set[str]:
+        """
+        Sets new contents and recalculates descendants of the changed nodes only.
+        Returns the id set of nodes whose "active" state has changed.
+        """
+        store = self.__store
+        content_column = store.column('content')
+        data_types = store.column('data_type')
+
+        dirty = []
+        for node_id, content in contents.items():
+            ordinal = store.index[node_id]
+            if content_column[ordinal] is not MISSING and content_column[ordinal] == content:
+                continue
+            content_column[ordinal] = content
+            old_content = self.__typed_contents[ordinal]
+            new_content = coerce_value(content, data_types[ordinal])
+            self.__typed_contents[ordinal] = new_content
+            dirty.append((ordinal, old_content, new_content))
+            if ordinal in self.__indexes:
+                root = self.__branch_roots[ordinal]
+                self.__branch_versions[root] = self.__branch_versions.get(root, 0) + 1
+
+        indexes = self.__indexes
+        stack = []
+        for ordinal, old_content, new_content in dirty:
+            if store.active[ordinal] and ordinal in indexes:
+                stack.extend(indexes[ordinal].switched(old_content, new_content))
+
+        initial_state = {}
+        while stack:
+            ordinal = stack.pop()
+            active = self.__calculate_node(ordinal)
+            if active == bool(store.active[ordinal]):
+                continue
+            initial_state.setdefault(ordinal, not active)
+            store.active[ordinal] = active
+            if active:
+                self.__active.add(ordinal)
+            else:
+                self.__active.discard(ordinal)
+            if ordinal in indexes:
+                index = indexes[ordinal]
+                stack.extend(index.matching(self.__typed_contents[ordinal]) if active else index.all)
+
+        return {store.ids[ordinal] for ordinal, state in initial_state.items() if store.active[ordinal] != state}
+
+    def evaluate(self, contents: dict) -> set[str]:
+        """
+        Returns the id set of active nodes for the contents applied over the current ones.
+        The state of the tree is not changed, so one tree can evaluate any number of scenarios.
+        Branches whose feeding contents are the same as in a previous call are taken from the memo.
+        """
+        store = self.__store
+        data_types = store.column('data_type')
+        indexes = self.__indexes
+        overrides = {}
+        branch_overrides: dict[int, list] = {}
+        for node_id, content in contents.items():
+            ordinal = store.index[node_id]
+            typed_content = coerce_value(content, data_types[ordinal])
+            overrides[ordinal] = typed_content
+            if ordinal in indexes:
+                branch_overrides.setdefault(self.__branch_roots[ordinal], []).append((ordinal, typed_content))
+
+        memo = self.__memo
+        active = set()
+        for root in self.__children.get(ROOT, []):
+            root_overrides = branch_overrides.get(root, ())
+            key = (root, self.__branch_versions.get(root, 0), tuple(sorted(root_overrides, key=itemgetter(0))))
+            branch = memo.get(key)
+            if branch is None:
+                self.__memo_misses += 1
+                branch = self.__evaluate_branch(root, overrides)
+                self.__remember(key, branch)
+            else:
+                self.__memo_hits += 1
+                memo.move_to_end(key)
+            active |= branch
+        return active
+
+    def __remember(self, key: tuple, branch: frozenset[str]) -> None:
+        """Puts the branch result into the memo, the oldest results are dropped to keep the id limit"""
+        if len(branch) > self.__max_memo_ids:
+            return
+        memo = self.__memo
+        memo[key] = branch
+        self.__memo_ids += len(branch)
+        while self.__memo_ids > self.__max_memo_ids:
+            _, dropped = memo.popitem(last=False)
+            self.__memo_ids -= len(dropped)
+
+    def __evaluate_branch(self, root: int, overrides: dict) -> frozenset[str]:
+        indexes = self.__indexes
+        typed_contents = self.__typed_contents
+        ids = self.__store.ids
+
+        active = []
+        stack = [root]
+        while stack:
+            parent = stack.pop()
+            active.append(ids[parent])
+            if parent in indexes:
+                content = overrides[parent] if parent in overrides else typed_contents[parent]
+                stack.extend(indexes[parent].matching(content))
+        return frozenset(active)
+
+    @property
+    def memo_stats(self) -> dict:
+        calls = self.__memo_hits + self.__memo_misses
+        return {
+            'size': len(self.__memo),
+            'ids': self.__memo_ids,
+            'max_ids': self.__max_memo_ids,
+            'hits': self.__memo_hits,
+            'misses': self.__memo_misses,
+            'hit_rate': self.__memo_hits / calls if calls else 0.0,
+        }
+
+    def evaluate_many(self, scenarios: Iterable[dict]) -> Iterator[set[str]]:
+        """Evaluates each contents map of the iterable, see evaluate"""
+        for contents in scenarios:
+            yield self.evaluate(contents)
+
+    @property
+    def active_ids(self) -> set[str]:
+        ids = self.__store.ids
+        return {ids[ordinal] for ordinal in self.__active}
+
+    @property
+    def active_nodes(self) -> dict:
+        """Returns active nodes in the graph container format"""
+        store = self.__store
+        return {store.ids[ordinal]: store.node(ordinal) for ordinal in self.__active}
+
+
+worker_tree: ActivationTree | None = None
+
+
+def init_pool_worker(store: NodeStore) -> None:
+    """Builds the tree once per worker process, conditions are compiled in the worker"""
+    global worker_tree
+    worker_tree = ActivationTree(store)
+
+
+def evaluate_in_worker(contents: dict) -> set[str]:
+    return worker_tree.evaluate(contents)
+
+
+def evaluate_in_pool(store: NodeStore, scenarios: Iterable[dict], max_workers: int | None = None,
+                     chunksize: int = 64) -> Iterator[set[str]]:
+    """
+    Evaluates scenarios in a process pool, results are yielded in the order of scenarios.
+    The storage is sent to each worker once, scenarios are sent in chunks and consumed lazily.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    batch_size = chunksize * max_workers * 4
+    with ProcessPoolExecutor(max_workers, initializer=init_pool_worker, initargs=(store,)) as executor:
+        scenarios = iter(scenarios)
+        while batch := list(islice(scenarios, batch_size)):
+            yield from executor.map(evaluate_in_worker, batch, chunksize=chunksize)
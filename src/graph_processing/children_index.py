@@ -0,0 +1,121 @@
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Iterable
+
+from graph_processing.conditions import coerce_value
+from graph_processing.node_store import NodeStore, ROOT, MISSING
+
+
+RANGE_CONDITIONS = ('gt', 'gte', 'lt', 'lte')
+
+
+class ChildrenIndex:
+    """
+    Children of one parent indexed by their trigger values (coerced to the parent data type,
+    the same way as the parent content and select options).
+    'equal' and 'not_equal' children are grouped in hash buckets, 'gt', 'gte', 'lt', 'lte' children are kept
+    sorted by trigger, so matching children of a content value are found by lookup or bisect.
+    """
+    __slots__ = ('all', 'free', 'equal', 'not_equal', 'not_equal_all', 'ranges')
+
+    def __init__(self):
+        self.all: list[int] = []
+        self.free: list[int] = []
+        self.equal: dict[object, list[int]] = {}
+        self.not_equal: dict[object, list[int]] = {}
+        self.not_equal_all: list[int] = []
+        self.ranges: dict[str, tuple[list, list[int]]] = {}
+
+    def __bounds(self, condition: str, content) -> tuple[int, int]:
+        """Slice of the sorted children that satisfies the condition"""
+        triggers, children = self.ranges[condition]
+        if content is None:
+            return 0, 0
+        if condition == 'gt':
+            return 0, bisect_left(triggers, content)
+        if condition == 'gte':
+            return 0, bisect_right(triggers, content)
+        if condition == 'lt':
+            return bisect_right(triggers, content), len(children)
+        return bisect_left(triggers, content), len(children)
+
+    def matching(self, content) -> Iterable[int]:
+        """Children whose condition is satisfied by the typed parent content"""
+        if content is None:
+            return self.free
+
+        parts = [self.free, self.equal.get(content, ())]
+        excluded = self.not_equal.get(content)
+        if excluded:
+            excluded = set(excluded)
+            parts.append(child for child in self.not_equal_all if child not in excluded)
+        else:
+            parts.append(self.not_equal_all)
+
+        for condition, (_, children) in self.ranges.items():
+            start, end = self.__bounds(condition, content)
+            parts.append(children[start:end])
+        return chain.from_iterable(parts)
+
+    def switched(self, old_content, new_content) -> Iterable[int]:
+        """Children whose condition result may differ between two typed parent contents"""
+        if old_content is None and new_content is None:
+            return ()
+        if old_content is None or new_content is None:
+            return self.all
+
+        parts = [
+            self.equal.get(old_content, ()),
+            self.equal.get(new_content, ()),
+            self.not_equal.get(old_content, ()),
+            self.not_equal.get(new_content, ()),
+        ]
+        for condition, (_, children) in self.ranges.items():
+            old_start, old_end = self.__bounds(condition, old_content)
+            new_start, new_end = self.__bounds(condition, new_content)
+            if (old_start, old_end) == (new_start, new_end):
+                continue
+            if old_start == new_start:
+                parts.append(children[min(old_end, new_end):max(old_end, new_end)])
+            else:
+                parts.append(children[min(old_start, new_start):max(old_start, new_start)])
+        return chain.from_iterable(parts)
+
+
+def build_children_indexes(store: NodeStore, children: dict[int, list[int]]) -> dict[int, ChildrenIndex]:
+    """Builds the index for every parent, keys are parent ordinals"""
+    conditions = store.column('condition')
+    triggers = store.column('trigger')
+    data_types = store.column('data_type')
+
+    indexes = {}
+    for parent, parent_children in children.items():
+        if parent == ROOT:
+            continue
+        index = ChildrenIndex()
+        index.all = parent_children
+        ranges = {}
+        for child in parent_children:
+            condition = None if conditions[child] is MISSING else conditions[child]
+            trigger = None if triggers[child] is MISSING else triggers[child]
+            if condition is None or trigger is None:
+                index.free.append(child)
+                continue
+
+            typed_trigger = coerce_value(trigger, None if data_types[parent] is MISSING else data_types[parent])
+            if typed_trigger is None:
+                continue
+
+            if condition == 'equal':
+                index.equal.setdefault(typed_trigger, []).append(child)
+            elif condition == 'not_equal':
+                index.not_equal.setdefault(typed_trigger, []).append(child)
+                index.not_equal_all.append(child)
+            elif condition in RANGE_CONDITIONS:
+                ranges.setdefault(condition, []).append((typed_trigger, child))
+
+        for condition, items in ranges.items():
+            items.sort(key=lambda item: item[0])
+            index.ranges[condition] = ([trigger for trigger, _ in items], [child for _, child in items])
+        indexes[parent] = index
+    return indexes
@@ -0,0 +1,120 @@
+import math
+from typing import Callable
+
+from graph_processing.node_store import NodeStore, ROOT, MISSING
+
+
+CONVERTERS: dict[str, Callable] = {
+    'integer': float,
+    'string': str,
+    'bool': bool,
+}
+
+# JSON types of the content sent by the form, bool is not accepted as a number
+CONTENT_TYPES: dict[str, tuple[type, ...]] = {
+    'integer': (int, float),
+    'string': (str,),
+    'bool': (bool,),
+}
+
+# parent content <operator> trigger is evaluated as a method of the trigger with the reflected operator
+REFLECTED_OPERATORS: dict[str, str] = {
+    'gt': '__lt__',
+    'lt': '__gt__',
+    'gte': '__le__',
+    'lte': '__ge__',
+    'equal': '__eq__',
+    'not_equal': '__ne__',
+}
+
+Predicate = Callable[[object], bool]
+
+
+def never(content) -> bool:
+    return False
+
+
+def coerce_value(value, data_type: str):
+    """Converts the value to the python type of data_type, returns None if it is not possible (or NaN)"""
+    convert = CONVERTERS.get(data_type)
+    if value is None or convert is None:
+        return None
+    try:
+        value = convert(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value == value else None
+
+
+def is_valid_content(content, data_type: str) -> bool:
+    """Checks the content sent by the form: None or a value of the JSON type of data_type, numbers must be finite"""
+    if content is None:
+        return True
+    types = CONTENT_TYPES.get(data_type)
+    if types is None or not isinstance(content, types) or isinstance(content, bool) and bool not in types:
+        return False
+    return not isinstance(content, float) or math.isfinite(content)
+
+
+def compile_condition(condition: str | None, trigger, data_type: str) -> Predicate | None:
+    """
+    Turns the condition of the node into a predicate over the parent content coerced to data_type.
+    Returns None if the node does not depend on the parent content.
+    """
+    if condition is None or trigger is None:
+        return None
+
+    method = REFLECTED_OPERATORS.get(condition)
+    typed_trigger = coerce_value(trigger, data_type)
+    if method is None or typed_trigger is None:
+        return never
+    return getattr(typed_trigger, method)
+
+
+def check_condition(content, data_type: str, condition: str | None, trigger) -> bool:
+    """Compares the parent content with the trigger of the child node"""
+    predicate = compile_condition(condition, trigger, data_type)
+    if predicate is None:
+        return True
+
+    typed_content = coerce_value(content, data_type)
+    if typed_content is None:
+        return False
+    return predicate(typed_content)
+
+
+def compile_node(condition, trigger, data_type) -> Predicate | None:
+    return compile_condition(
+        None if condition is MISSING else condition,
+        None if trigger is MISSING else trigger,
+        None if data_type is MISSING else data_type,
+    )
+
+
+def compile_store(store: NodeStore) -> list[Predicate | None]:
+    """Compiles the conditions of all nodes, the result is indexed by node ordinals"""
+    parents = store.parents
+    conditions = store.column('condition')
+    triggers = store.column('trigger')
+    data_types = store.column('data_type')
+
+    predicates = [None] * len(parents)
+    for ordinal in store.ordinals():
+        parent = parents[ordinal]
+        if parent == ROOT:
+            continue
+        predicates[ordinal] = compile_node(conditions[ordinal], triggers[ordinal], data_types[parent])
+    return predicates
+
+
+def coerce_contents(store: NodeStore) -> list:
+    """Contents of all nodes coerced to their data types, indexed by node ordinals"""
+    contents = store.column('content')
+    data_types = store.column('data_type')
+
+    typed_contents = [None] * len(contents)
+    for ordinal in store.ordinals():
+        content = contents[ordinal]
+        if content is not MISSING:
+            typed_contents[ordinal] = coerce_value(content, data_types[ordinal])
+    return typed_contents
@@ -0,0 +1,284 @@
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import select, update, and_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import GRAPH_CACHE_SIZE, GRAPH_ACTIVATION_MEMO_IDS, GRAPH_VECTORIZED
+from graph_processing.activation import ActivationTree
+from graph_processing.graph_encoder import GraphEncoder
+from graph_processing.graph_schemas import build_children_index
+from graph_processing.node_store import NodeStore
+from graph_processing.topology import TopologicalOrder
+from graph_processing.vectorized import VectorizedActivation, create_evaluator
+from models.models import Project, Node
+
+
+class CachedGraph:
+    """
+    Deserialized nodes of the project version (graph container), creation dates, topological order of nodes
+    and the children index used by the incremental validation (GrafChangesDTO).
+    The activation tree of the version with its scenario memo is built on the first form request.
+    order_taken - the order was taken by a write to be changed in place, see take_order
+    """
+    __slots__ = ('version', 'nodes', 'created_at', 'order', 'children', 'order_taken', '__activation')
+
+    def __init__(self, version: int, nodes: dict, created_at: dict[str, datetime], order: TopologicalOrder = None,
+                 children: dict[str | None, list[str]] = None):
+        self.version = version
+        self.nodes = nodes
+        self.created_at = created_at
+        self.order = TopologicalOrder.from_nodes(nodes) if order is None else order
+        self.children = build_children_index(nodes) if children is None else children
+        self.order_taken = False
+        self.__activation: ActivationTree | VectorizedActivation | None = None
+
+    @property
+    def activation(self) -> ActivationTree | VectorizedActivation:
+        """
+        Activation tree of the version, it is not changed by evaluate, so the memo is shared by requests.
+        The NumPy evaluator is used in the GRAPH_VECTORIZED mode if NumPy is installed.
+        """
+        if self.__activation is None:
+            self.__activation = create_evaluator(NodeStore.from_nodes(self.nodes), GRAPH_VECTORIZED,
+                                                 GRAPH_ACTIVATION_MEMO_IDS)
+        return self.__activation
+
+    def updated(self, version: int, change_list: dict, removed: list = (), created_at: dict = None,
+                order: TopologicalOrder = None) -> 'CachedGraph':
+        """
+        Returns the next version of the graph container.
+        change_list - nodes in the GraphEncoder.serialize_to_dict format, as they were written to the database,
+        changed nodes may contain only the changed fields
+        order - the order with the changes already applied, it is updated from the cached one if not passed
+        """
+        if order is None:
+            order = self.order.copy()
+            order.apply_changes(change_list, removed)
+
+        nodes = dict(self.nodes)
+        for node_id in removed:
+            nodes.pop(node_id, None)
+
+        for node_id, fields in change_list.items():
+            fields = dict(fields)
+            fields.pop('project_id', None)
+            non_permanent_fields = fields.pop('json', None)
+            node = nodes.get(node_id)
+            if node is None:
+                nodes[node_id] = {'id': node_id, **fields, **(non_permanent_fields or {})}
+            elif non_permanent_fields is None:
+                nodes[node_id] = {**node, **fields}
+            else:
+                permanent_fields, _ = GraphEncoder.split_fields(node)
+                nodes[node_id] = {**permanent_fields, **fields, **non_permanent_fields}
+
+        created = {node_id: date for node_id, date in self.created_at.items() if node_id in nodes}
+        created.update(created_at or {})
+        entry = CachedGraph(version, nodes, created, order, self.__updated_children(nodes, change_list, removed))
+        entry.__activation = self.__updated_activation(nodes, change_list, removed)
+        return entry
+
+    def __updated_activation(self, nodes: dict, change_list: dict,
+                             removed: list) -> ActivationTree | VectorizedActivation | None:
+        """
+        Activation tree of the next version if only contents were changed: the built tree is handed over
+        and recalculated incrementally, so the next form request does not build it again.
+        The "active" field is not compared, the tree calculates it itself.
+        """
+        activation = self.__activation
+        if not isinstance(activation, ActivationTree) or removed:
+            return
+
+        def other_fields(fields: dict) -> dict:
+            # empty fields are dropped from the json blob, so they are the same as missing ones
+            return {
+                key: value for key, value in fields.items()
+                if key not in ('content', 'active') and value is not None
+            }
+
+        contents = {}
+        for node_id in change_list:
+            node = self.nodes.get(node_id)
+            if node is None or other_fields(node) != other_fields(nodes[node_id]):
+                return
+            contents[node_id] = nodes[node_id].get('content')
+
+        # the tree is changed in place, the entry of this version builds a new one if it is still requested
+        self.__activation = None
+        activation.change_contents(contents)
+        return activation
+
+    def __updated_children(self, nodes: dict, change_list: dict, removed: list) -> dict[str | None, list[str]]:
+        """
+        Children index of the next version, only the lists of the changed parents are copied,
+        the index of this version is not changed
+        """
+        children = dict(self.children)
+        copied = set()
+
+        def unlink(node_id: str, parent_id: str | None) -> None:
+            siblings = children.get(parent_id)
+            if siblings is None or node_id not in siblings:
+                return
+            if parent_id not in copied:
+                siblings = children[parent_id] = list(siblings)
+                copied.add(parent_id)
+            siblings.remove(node_id)
+            if not siblings:
+                del children[parent_id]
+
+        def link(node_id: str, parent_id: str | None) -> None:
+            if parent_id not in copied:
+                children[parent_id] = list(children.get(parent_id, []))
+                copied.add(parent_id)
+            # the list of the parent is deleted if its last child was unlinked before
+            children.setdefault(parent_id, []).append(node_id)
+
+        for node_id in removed:
+            if node_id in self.nodes:
+                unlink(node_id, self.nodes[node_id].get('parent_id'))
+            children.pop(node_id, None)
+
+        removed = set(removed)
+        for node_id in change_list:
+            fields = nodes.get(node_id)
+            if fields is None:
+                continue
+            old_node = None if node_id in removed else self.nodes.get(node_id)
+            if old_node is None:
+                link(node_id, fields.get('parent_id'))
+            elif old_node.get('parent_id') != fields.get('parent_id'):
+                unlink(node_id, old_node.get('parent_id'))
+                link(node_id, fields.get('parent_id'))
+        return children
+
+
+class GraphCache:
+    """LRU cache of project graph containers, the entry is valid only for its project version"""
+
+    def __init__(self, max_size: int):
+        self.__max_size = max_size
+        self.__entries: OrderedDict[int, CachedGraph] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, project_id: int, version: int) -> CachedGraph | None:
+        entry = self.__entries.get(project_id)
+        if entry is None or entry.version != version:
+            self.__misses += 1
+            return
+        self.__entries.move_to_end(project_id)
+        self.__hits += 1
+        return entry
+
+    def put(self, project_id: int, entry: CachedGraph) -> None:
+        if self.__max_size <= 0:
+            return
+        current = self.__entries.get(project_id)
+        if current is not None and current.version > entry.version:
+            return
+        self.__entries[project_id] = entry
+        self.__entries.move_to_end(project_id)
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+    def invalidate(self, project_id: int) -> None:
+        self.__entries.pop(project_id, None)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': len(self.__entries),
+            'max_size': self.__max_size,
+            'hits': self.__hits,
+            'misses': self.__misses,
+            'evictions': self.__evictions,
+        }
+
+
+graph_cache = GraphCache(GRAPH_CACHE_SIZE)
+
+# project columns read by the functions below, loading profiles of the graph use cases must include them
+PROJECT_GRAPH_COLUMNS = (Project.id, Project.nodes_version)
+
+
+async def load_project_graph(session: AsyncSession, project: Project) -> CachedGraph:
+    """Returns the graph container of the project, nodes are loaded from the database only on a cache miss"""
+    entry = graph_cache.get(project.id, project.nodes_version)
+    if entry:
+        return entry
+
+    query = select(*GraphEncoder.permanent_columns(), Node.created_at, Node.depth)
+    find_nodes = await session.execute(query.where(Node.project_id == project.id))
+    rows = find_nodes.all()
+    deserialized_nodes = GraphEncoder().deserialize_rows(rows)
+
+    created_at = {}
+    depths = {}
+    for row in rows:
+        node_id = str(row[0])
+        created_at[node_id] = row[-2]
+        depths[node_id] = row[-1]
+
+    entry = CachedGraph(
+        version=project.nodes_version,
+        nodes=deserialized_nodes,
+        created_at=created_at,
+        order=TopologicalOrder.from_nodes(deserialized_nodes, depths)
+    )
+    graph_cache.put(project.id, entry)
+    return entry
+
+
+async def bump_project_version(session: AsyncSession, project: Project) -> int:
+    """Increments the nodes version of the project, must be called in the transaction that changes nodes"""
+    query = update(Project).where(Project.id == project.id)
+    query = query.values(nodes_version=Project.nodes_version + 1).returning(Project.nodes_version)
+    new_version = await session.execute(query)
+    return new_version.scalar()
+
+
+async def write_nodes(session: AsyncSession, project: Project, change_list: dict, depths: dict[str, int] = None) -> None:
+    """
+    Writes changed fields of existing nodes and changed depths with bulk UPDATE statements,
+    one executemany round-trip per set of written fields
+    """
+    query = update(Node.__table__).where(and_(Node.id == bindparam('node_id'), Node.project_id == project.id))
+    for params in GraphEncoder.bulk_update_params(change_list, depths).values():
+        await session.execute(query, params)
+
+
+def take_order(project: Project, entry: CachedGraph, change_list: dict,
+               removed: list = ()) -> tuple[TopologicalOrder, dict[str, int] | None]:
+    """
+    Applies the changes to the order of the entry in place instead of copying it,
+    returns the order and the changed depths (None if the changes are rejected).
+    Rejected changes leave the order and the cache as they were. Once the changes are accepted, the order is taken:
+    the entry is dropped from the cache, so other requests load the version again instead of seeing
+    the changed order, the next version is put back by cache_next_version after the commit.
+    If another write has already taken the order, the changes are applied to an order rebuilt from the nodes.
+    """
+    order = TopologicalOrder.from_nodes(entry.nodes) if entry.order_taken else entry.order
+    depths = order.apply_changes(change_list, removed)
+    if depths is not None:
+        graph_cache.invalidate(project.id)
+        entry.order_taken = True
+    return order, depths
+
+
+def cache_next_version(project: Project, new_version: int, entry: CachedGraph, change_list: dict,
+                       removed: list = (), created_at: dict = None, order: TopologicalOrder = None) -> None:
+    """
+    Puts the written state into the cache.
+    Skipped if another write got in between, since the entry was built from an outdated version.
+    """
+    if new_version != entry.version + 1:
+        graph_cache.invalidate(project.id)
+        return
+    graph_cache.put(project.id, entry.updated(new_version, change_list, removed, created_at, order))
@@ -20,12 +20,35 @@ class GraphEncoder:
         """Converts a set of node fields for use in the graph"""
         graph = {}
         for node_obj in nodes:
-            non_permanent_fields = node_obj.json
+            non_permanent_fields = node_obj.json or {}
             permanent_fields = self.__get_permanent_fields(node_obj)
             node_id = str(node_obj.id)
             graph[node_id] = {**permanent_fields, **non_permanent_fields}
         return graph
 
+    @classmethod
+    def permanent_columns(cls) -> list:
+        """Node columns of the permanent fields and json, in the order expected by deserialize_rows"""
+        return [getattr(Node, field) for field in cls.__permanent_fields] + [Node.json]
+
+    def deserialize_rows(self, rows) -> dict:
+        """
+        Same as deserialize_nodes, but works on result rows of a Core select of permanent_columns,
+        so ORM objects are not created. Extra columns after json are ignored.
+        """
+        permanent_fields = self.__permanent_fields
+        json_position = len(permanent_fields)
+        graph = {}
+        for row in rows:
+            fields = dict(zip(permanent_fields, row))
+            node_id = str(fields['id'])
+            fields['id'] = node_id
+            parent_id = fields['parent_id']
+            if isinstance(parent_id, UUID):
+                fields['parent_id'] = str(parent_id)
+            graph[node_id] = {**fields, **(row[json_position] or {})}
+        return graph
+
     def __get_permanent_fields(self, node_obj: Node) -> dict:
         fields = {}
         for field in self.__permanent_fields:
@@ -33,35 +56,71 @@ class GraphEncoder:
             fields[field] = str(attr) if isinstance(attr, UUID) else attr
         return fields
 
+    @classmethod
+    def split_fields(cls, node_fields: dict) -> tuple[dict, dict]:
+        """Splits the node into permanent fields and the json blob, empty non-permanent fields are dropped"""
+        non_permanent_fields = {}
+        permanent_fields = {}
+        for key, value in node_fields.items():
+            if key in cls.__permanent_fields:
+                permanent_fields[key] = value
+            else:
+                if not value and not isinstance(value, bool):
+                    continue
+                non_permanent_fields[key] = value
+        return permanent_fields, non_permanent_fields
+
     def serialize_nodes(self, nodes: dict, project_id: int) -> list:
         """Converts a set of node fields for use in the database"""
         object_list = []
         for node_id, node_fields in nodes.items():
-            non_permanent_fields = {}
-            permanent_fields = {}
-            for key, value in node_fields.items():
-                if key in self.__permanent_fields:
-                    permanent_fields[key] = value
-                else:
-                    if not value and not isinstance(value, bool):
-                        continue
-                    non_permanent_fields[key] = value
+            permanent_fields, non_permanent_fields = self.split_fields(node_fields)
             obj = Node(id=node_id, json=non_permanent_fields, project_id=project_id, **permanent_fields)
             object_list.append(obj)
         return object_list
 
-    def serialize_to_dict(self, nodes: dict, project_id: int) -> dict:
-        """Sets the set of node fields to be used in models and server responses"""
+    @staticmethod
+    def bulk_update_params(change_list: dict, depths: dict[str, int] = None) -> dict[tuple, list[dict]]:
+        """
+        Parameter sets of the bulk UPDATE of existing nodes grouped by the set of written fields,
+        each group is written by one executemany statement. The node id is passed as "node_id".
+        change_list - nodes in the serialize_to_dict format, depths - changed depths of any nodes
+        """
+        depths = depths or {}
+        groups = {}
+        for node_id, fields in change_list.items():
+            params = {field: value for field, value in fields.items() if field not in ('id', 'project_id')}
+            if node_id in depths:
+                params['depth'] = depths[node_id]
+            if params:
+                groups.setdefault(tuple(sorted(params)), []).append({'node_id': node_id, **params})
+
+        for node_id, depth in depths.items():
+            if node_id not in change_list:
+                groups.setdefault(('depth',), []).append({'node_id': node_id, 'depth': depth})
+        return groups
+
+    def serialize_to_dict(self, nodes: dict, project_id: int, loaded: dict = None) -> dict:
+        """
+        Sets the set of node fields to be used in models and server responses.
+        loaded - the graph container the nodes were calculated from. If passed, only the fields that differ
+        from the loaded node are emitted (json as a whole) and unchanged nodes are skipped.
+        """
         object_list = {}
         for node_id, node_fields in nodes.items():
-            non_permanent_fields = {}
-            permanent_fields = {}
-            for key, value in node_fields.items():
-                if key in self.__permanent_fields:
-                    permanent_fields[key] = value
-                else:
-                    if not value and not isinstance(value, bool):
-                        continue
-                    non_permanent_fields[key] = value
-            object_list[node_id] = {'json': non_permanent_fields, 'project_id': project_id, **permanent_fields}
+            permanent_fields, non_permanent_fields = self.split_fields(node_fields)
+            loaded_fields = loaded.get(node_id) if loaded else None
+            if loaded_fields is None:
+                object_list[node_id] = {'json': non_permanent_fields, 'project_id': project_id, **permanent_fields}
+                continue
+
+            loaded_permanent_fields, loaded_non_permanent_fields = self.split_fields(loaded_fields)
+            changes = {
+                key: value for key, value in permanent_fields.items()
+                if key not in loaded_permanent_fields or loaded_permanent_fields[key] != value
+            }
+            if non_permanent_fields != loaded_non_permanent_fields:
+                changes['json'] = non_permanent_fields
+            if changes:
+                object_list[node_id] = changes
         return object_list
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable
+
+from config import GRAPH_EXECUTOR, GRAPH_EXECUTOR_THRESHOLD, GRAPH_EXECUTOR_WORKERS
+from graph_processing.node_store import NodeStore
+
+
+EXECUTOR_MODES = ('inline', 'thread', 'process')
+
+
+def run_task(task: Callable, payload: dict | NodeStore, submitted_at: float, *args) -> tuple[object, float]:
+    """Entry point of the pool worker, returns the task result and the time the task waited in the queue"""
+    queue_wait = time.time() - submitted_at
+    nodes = payload.to_nodes() if isinstance(payload, NodeStore) else payload
+    return task(nodes, *args), queue_wait
+
+
+class GraphExecutor:
+    """
+    Runs graph calculations of a request.
+    Small graphs are calculated inline, graphs from the node-count threshold are offloaded to a thread
+    or process pool so they do not block the event loop. The process pool receives the graph container
+    as a compact columnar NodeStore.
+    """
+
+    def __init__(self, mode: str = 'inline', threshold: int = 0, workers: int = 1):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f'Unknown graph executor mode "{mode}", expected: {EXECUTOR_MODES}')
+        self.__mode = mode
+        self.__threshold = threshold
+        self.__workers = workers
+        self.__pool: Executor | None = None
+        self.__inline = 0
+        self.__offloaded = 0
+        self.__queue_wait_total = 0.0
+        self.__queue_wait_max = 0.0
+
+    def __get_pool(self) -> Executor:
+        if self.__pool is None:
+            if self.__mode == 'process':
+                self.__pool = ProcessPoolExecutor(max_workers=self.__workers)
+            else:
+                self.__pool = ThreadPoolExecutor(max_workers=self.__workers, thread_name_prefix='graph')
+        return self.__pool
+
+    def is_offloaded(self, nodes: dict) -> bool:
+        """Whether run calculates the graph in the pool"""
+        return self.__mode != 'inline' and len(nodes) >= self.__threshold
+
+    async def run(self, task: Callable, nodes: dict, *args):
+        """Runs task(nodes, *args), task must be a module-level function to be passed to the process pool"""
+        if not self.is_offloaded(nodes):
+            self.__inline += 1
+            return task(nodes, *args)
+
+        payload = NodeStore.from_nodes(nodes) if self.__mode == 'process' else nodes
+        loop = asyncio.get_running_loop()
+        result, queue_wait = await loop.run_in_executor(self.__get_pool(), run_task, task, payload, time.time(), *args)
+        self.__offloaded += 1
+        self.__queue_wait_total += queue_wait
+        self.__queue_wait_max = max(self.__queue_wait_max, queue_wait)
+        return result
+
+    def shutdown(self) -> None:
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False, cancel_futures=True)
+            self.__pool = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'mode': self.__mode,
+            'threshold': self.__threshold,
+            'workers': self.__workers,
+            'inline': self.__inline,
+            'offloaded': self.__offloaded,
+            'queue_wait_avg_ms': self.__queue_wait_total / self.__offloaded * 1000 if self.__offloaded else 0.0,
+            'queue_wait_max_ms': self.__queue_wait_max * 1000,
+        }
+
+
+graph_executor = GraphExecutor(GRAPH_EXECUTOR, GRAPH_EXECUTOR_THRESHOLD, GRAPH_EXECUTOR_WORKERS)
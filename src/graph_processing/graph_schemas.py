@@ -1,7 +1,141 @@
 import uuid
+from collections.abc import Mapping
 
+from graph_processing.conditions import coerce_value
+from graph_processing.overlay import NodesOverlay
 from shared.error_structure import Error
 
 
+NODE_TYPES = {
+    'text': ('string', 'integer'),
+    'entry': ('string', 'integer'),
+    'checkbox': ('bool',),
+    'select': ('string', 'integer'),
+}
+
+CONDITIONS = {
+    'gt': ('integer',),
+    'lt': ('integer',),
+    'gte': ('integer',),
+    'lte': ('integer',),
+    'equal': ('integer', 'string', 'bool'),
+    'not_equal': ('integer', 'string', 'bool'),
+}
+
+
 class GrafInputDTO:
     """Graph validator (not presented in public version)"""
+
+
+def build_children_index(nodes: Mapping) -> dict[str | None, list[str]]:
+    """Children id lists by parent id, is built once for an already validated graph"""
+    children = {}
+    for node_id, fields in nodes.items():
+        children.setdefault(fields.get('parent_id'), []).append(node_id)
+    return children
+
+
+class GrafChangesDTO:
+    """
+    Incremental graph validator.
+    The base container of the overlay is trusted, only the changed nodes and their direct neighbours are checked:
+    parent existence, data_type / condition compatibility and cycles introduced by the changes.
+    """
+
+    def __init__(self, candidate: NodesOverlay, children: dict[str | None, list[str]]):
+        self.__candidate = candidate
+        self.__children = children
+        self.__errors: list[Error] = []
+        # nodes whose ancestors are already walked without a cycle
+        self.__acyclic: set[str] = set()
+        self.__main_validator()
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(len(self.__errors))
+
+    @property
+    def errors(self) -> list[Error]:
+        return self.__errors
+
+    def __bool__(self):
+        return not self.has_errors
+
+    def __add_error(self, message: str, location: str) -> None:
+        self.__errors.append(Error(error_type='param_error', message=message, location=location))
+
+    def __main_validator(self) -> None:
+        candidate = self.__candidate
+        changed = candidate.changed
+        checked_children = set()
+
+        for node_id, fields in changed.items():
+            self.__check_node(node_id, fields)
+
+        for node_id in candidate.touched:
+            for child_id in self.__children.get(node_id, []):
+                if child_id in changed or child_id in checked_children or child_id not in candidate:
+                    continue
+                checked_children.add(child_id)
+                self.__check_parent(child_id, candidate[child_id])
+
+        for node_id, fields in changed.items():
+            if node_id not in candidate.base or candidate.base[node_id].get('parent_id') != fields.get('parent_id'):
+                self.__check_cycle(node_id)
+
+    def __check_node(self, node_id: str, fields: dict) -> None:
+        try:
+            uuid.UUID(node_id)
+        except Exception:
+            self.__add_error('Incorrect uuid format', node_id)
+            return
+
+        if not isinstance(fields.get('name'), str):
+            self.__add_error('Field "name" is required and should be a string', node_id)
+
+        data_type = fields.get('data_type')
+        node_type = fields.get('node_type')
+        if node_type not in NODE_TYPES:
+            self.__add_error(f'Wrong "node_type", expected: {list(NODE_TYPES)}', node_id)
+        elif data_type not in NODE_TYPES[node_type]:
+            self.__add_error(f'Wrong "data_type" for "{node_type}", expected: {list(NODE_TYPES[node_type])}', node_id)
+
+        self.__check_parent(node_id, fields)
+
+    def __check_parent(self, node_id: str, fields: dict) -> None:
+        parent_id = fields.get('parent_id')
+        if parent_id is None:
+            return
+
+        if parent_id not in self.__candidate:
+            self.__add_error(f'Parent node "{parent_id}" does not exist', node_id)
+            return
+
+        condition = fields.get('condition')
+        if condition is None:
+            return
+        if condition not in CONDITIONS:
+            self.__add_error(f'Wrong "condition", expected: {list(CONDITIONS)}', node_id)
+            return
+
+        parent_data_type = self.__candidate[parent_id].get('data_type')
+        if parent_data_type not in CONDITIONS[condition]:
+            self.__add_error(f'Condition "{condition}" is not allowed for parent data type "{parent_data_type}"', node_id)
+            return
+
+        trigger = fields.get('trigger')
+        if trigger is not None and coerce_value(trigger, parent_data_type) is None:
+            self.__add_error(f'Trigger should have the parent data type "{parent_data_type}"', node_id)
+
+    def __check_cycle(self, node_id: str) -> None:
+        """Walks up from the node, a changed parent link can close a cycle only through the node itself"""
+        candidate = self.__candidate
+        visited = {node_id}
+        parent_id = candidate[node_id].get('parent_id')
+        while parent_id is not None and parent_id not in self.__acyclic and parent_id in candidate:
+            if parent_id in visited:
+                self.__add_error('The parent link creates a cycle', node_id)
+                return
+            visited.add(parent_id)
+            parent_id = candidate[parent_id].get('parent_id')
+        self.__acyclic |= visited
@@ -0,0 +1,26 @@
+from config import GRAPH_VECTORIZED
+from graph_processing.graph import Graph
+from graph_processing.node_store import NodeStore
+from graph_processing.vectorized import create_evaluator
+from shared.error_structure import Error
+
+
+def add_nodes(nodes: dict, new_nodes: dict) -> tuple[dict | None, list[Error]]:
+    graph = Graph(nodes)
+    return graph.add_nodes(new_nodes), graph.get_errors
+
+
+def change_nodes(nodes: dict, changes: dict) -> tuple[dict | None, list[Error]]:
+    graph = Graph(nodes)
+    return graph.change_nodes(changes), graph.get_errors
+
+
+def remove_nodes(nodes: dict, delete_list: list) -> tuple[tuple | None, list[Error]]:
+    graph = Graph(nodes)
+    return graph.remove_nodes(delete_list), graph.get_errors
+
+
+
+def evaluate_active(nodes: dict, contents: dict) -> set[str]:
+    """Id set of active nodes with the contents applied, the evaluator is built for the call without the memo"""
+    return create_evaluator(NodeStore.from_nodes(nodes), GRAPH_VECTORIZED, memo_ids=0).evaluate(contents)
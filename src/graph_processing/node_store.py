@@ -0,0 +1,207 @@
+from typing import Iterator
+
+
+ROOT = -1
+
+
+class Missing:
+    """Marker of a field that is absent in the node, pickled by reference to keep identity checks working"""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+    def __reduce__(self) -> str:
+        return 'MISSING'
+
+
+MISSING = Missing()
+
+
+class NodeStore:
+    """
+    Compact storage of graph nodes.
+    Nodes are addressed by integer ordinals and their fields are kept in parallel lists,
+    uuid strings are converted only at the boundary (from_nodes / to_nodes).
+    The round-trip is exact: parent ids that are not nodes of the storage (dangling) are kept as strings
+    and parent_id / active absent in the source node stay absent.
+    """
+    __columns = (
+        'id',
+        'name',
+        'description',
+        'data_type',
+        'node_type',
+        'content',
+        'condition',
+        'trigger',
+        'x',
+        'y',
+        'options',
+        'view_type',
+    )
+    __known_fields = frozenset((*__columns, 'parent_id', 'active'))
+
+    __slots__ = ('ids', 'index', 'parents', 'active', 'extra', 'dangling', 'absent',
+                 *(f'_{column}' for column in __columns))
+
+    def __init__(self):
+        self.ids: list[str | None] = []
+        self.index: dict[str, int] = {}
+        self.parents: list[int] = []
+        self.active = bytearray()
+        self.extra: dict[int, dict] = {}
+        self.dangling: dict[int, str] = {}
+        self.absent: dict[int, tuple[str, ...]] = {}
+        for column in self.__columns:
+            setattr(self, f'_{column}', [])
+
+    @classmethod
+    def from_nodes(cls, nodes: dict) -> 'NodeStore':
+        """Builds the storage from the graph container (dict of nodes)"""
+        store = cls()
+        index = store.index
+        for node_id in nodes:
+            index[node_id] = len(store.ids)
+            store.ids.append(node_id)
+
+        parents = store.parents
+        active = store.active
+        columns = [(column, getattr(store, f'_{column}')) for column in cls.__columns]
+        for ordinal, (node_id, fields) in enumerate(nodes.items()):
+            parent_id = fields.get('parent_id')
+            parents.append(index.get(parent_id, ROOT))
+            if parent_id is not None and parent_id not in index:
+                store.dangling[ordinal] = parent_id
+            active.append(1 if fields.get('active') else 0)
+            if 'parent_id' not in fields or 'active' not in fields:
+                store.absent[ordinal] = tuple(field for field in ('parent_id', 'active') if field not in fields)
+            for column, values in columns:
+                values.append(fields.get(column, MISSING))
+
+            if fields.get('id') == node_id:
+                store._id[ordinal] = node_id
+
+            if not cls.__known_fields.issuperset(fields):
+                extra = {key: value for key, value in fields.items() if key not in cls.__known_fields}
+                if extra:
+                    store.extra[ordinal] = extra
+        return store
+
+    def copy(self) -> 'NodeStore':
+        """Copies the storage, lists are copied shallowly since the stored values are not mutated in place"""
+        store = NodeStore.__new__(NodeStore)
+        store.ids = self.ids.copy()
+        store.index = self.index.copy()
+        store.parents = self.parents.copy()
+        store.active = self.active.copy()
+        store.extra = {ordinal: extra.copy() for ordinal, extra in self.extra.items()}
+        store.dangling = self.dangling.copy()
+        store.absent = self.absent.copy()
+        for column in self.__columns:
+            setattr(store, f'_{column}', getattr(self, f'_{column}').copy())
+        return store
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.index
+
+    def ordinals(self) -> Iterator[int]:
+        """Ordinals of existing (not removed) nodes"""
+        return iter(self.index.values())
+
+    def column(self, field: str) -> list:
+        """Direct access to the list of field values, absent values are stored as MISSING"""
+        return getattr(self, f'_{field}')
+
+    def get(self, ordinal: int, field: str):
+        if field == 'parent_id':
+            parent = self.parents[ordinal]
+            return self.dangling.get(ordinal) if parent == ROOT else self.ids[parent]
+        if field == 'active':
+            return bool(self.active[ordinal])
+        if field in self.__known_fields:
+            value = getattr(self, f'_{field}')[ordinal]
+            return None if value is MISSING else value
+        return self.extra.get(ordinal, {}).get(field)
+
+    def set(self, ordinal: int, field: str, value) -> None:
+        if field in ('parent_id', 'active') and ordinal in self.absent:
+            self.__mark_present(ordinal, field)
+        if field == 'parent_id':
+            self.parents[ordinal] = self.index.get(value, ROOT)
+            if value is not None and value not in self.index:
+                self.dangling[ordinal] = value
+            else:
+                self.dangling.pop(ordinal, None)
+        elif field == 'active':
+            self.active[ordinal] = 1 if value else 0
+        elif field in self.__known_fields:
+            getattr(self, f'_{field}')[ordinal] = value
+        else:
+            self.extra.setdefault(ordinal, {})[field] = value
+
+    def add(self, node_id: str, fields: dict) -> int:
+        """Appends a new node, returns its ordinal"""
+        ordinal = len(self.ids)
+        self.index[node_id] = ordinal
+        self.ids.append(node_id)
+        self.parents.append(ROOT)
+        self.active.append(0)
+        for column in self.__columns:
+            getattr(self, f'_{column}').append(MISSING)
+        for field, value in fields.items():
+            self.set(ordinal, field, value)
+
+        for child, parent_id in list(self.dangling.items()):
+            if parent_id == node_id:
+                self.parents[child] = ordinal
+                del self.dangling[child]
+        return ordinal
+
+    def __mark_present(self, ordinal: int, field: str) -> None:
+        absent = tuple(absent_field for absent_field in self.absent[ordinal] if absent_field != field)
+        if absent:
+            self.absent[ordinal] = absent
+        else:
+            del self.absent[ordinal]
+
+    def remove(self, ordinal: int) -> None:
+        """Removes the node, its ordinal is not reused"""
+        node_id = self.ids[ordinal]
+        if node_id is None:
+            return
+        del self.index[node_id]
+        self.ids[ordinal] = None
+        self.parents[ordinal] = ROOT
+        self.active[ordinal] = 0
+        self.extra.pop(ordinal, None)
+        self.dangling.pop(ordinal, None)
+        self.absent.pop(ordinal, None)
+
+    def children(self) -> dict[int, list[int]]:
+        """Index of children by the parent ordinal, root nodes are stored by the ROOT key"""
+        children = {}
+        parents = self.parents
+        for ordinal in self.index.values():
+            children.setdefault(parents[ordinal], []).append(ordinal)
+        return children
+
+    def node(self, ordinal: int) -> dict:
+        """Returns the node fields in the graph container format"""
+        absent = self.absent.get(ordinal, ())
+        fields = {} if 'parent_id' in absent else {'parent_id': self.get(ordinal, 'parent_id')}
+        for column in self.__columns:
+            value = getattr(self, f'_{column}')[ordinal]
+            if value is not MISSING:
+                fields[column] = value
+        if 'active' not in absent:
+            fields['active'] = bool(self.active[ordinal])
+        fields.update(self.extra.get(ordinal, {}))
+        return fields
+
+    def to_nodes(self) -> dict:
+        """Converts the storage back to the graph container (dict of nodes)"""
+        return {node_id: self.node(ordinal) for node_id, ordinal in self.index.items()}
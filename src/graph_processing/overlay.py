@@ -0,0 +1,101 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Iterator
+
+
+class NodesOverlay(Mapping):
+    """
+    Candidate state of the graph container.
+    Changes are layered over the base container without copying it: only changed nodes are copied,
+    unchanged nodes are shared with the base and must be treated as read-only.
+    After validation the overlay is merged into the base or simply discarded.
+    """
+
+    def __init__(self, base: Mapping):
+        self.__base = base
+        self.__changed: dict[str, dict] = {}
+        self.__removed: set[str] = set()
+
+    def __getitem__(self, node_id: str) -> dict:
+        if node_id in self.__changed:
+            return self.__changed[node_id]
+        if node_id in self.__removed:
+            raise KeyError(node_id)
+        return self.__base[node_id]
+
+    def __contains__(self, node_id) -> bool:
+        if node_id in self.__changed:
+            return True
+        return node_id not in self.__removed and node_id in self.__base
+
+    def __iter__(self) -> Iterator[str]:
+        for node_id in self.__base:
+            if node_id not in self.__removed:
+                yield node_id
+        for node_id in self.__changed:
+            if node_id not in self.__base or node_id in self.__removed:
+                yield node_id
+
+    def __len__(self) -> int:
+        added = sum(1 for node_id in self.__changed if node_id not in self.__base or node_id in self.__removed)
+        return len(self.__base) - len(self.__removed) + added
+
+    @property
+    def base(self) -> Mapping:
+        return self.__base
+
+    @property
+    def changed(self) -> dict[str, dict]:
+        """Added and changed nodes"""
+        return self.__changed
+
+    @property
+    def removed(self) -> set[str]:
+        """Removed nodes of the base container"""
+        return self.__removed - set(self.__changed)
+
+    @property
+    def touched(self) -> set[str]:
+        """Id set of all added, changed and removed nodes"""
+        return set(self.__changed) | self.__removed
+
+    def add_node(self, node_id: str, fields: dict) -> None:
+        self.__changed[node_id] = dict(fields)
+
+    def change_node(self, node_id: str, fields: dict) -> dict:
+        """Copies the node into the overlay (once) and updates its fields, returns the changed node"""
+        node = self.__changed.get(node_id)
+        if node is None:
+            node = dict(self[node_id])
+            self.__changed[node_id] = node
+        node.update(fields)
+        return node
+
+    def remove_node(self, node_id: str) -> None:
+        self.__changed.pop(node_id, None)
+        if node_id in self.__base:
+            self.__removed.add(node_id)
+
+    def merge(self) -> None:
+        """Applies the changes to the base container and clears the overlay"""
+        base = self.__base
+        if isinstance(base, NodesOverlay):
+            for node_id in self.removed:
+                base.remove_node(node_id)
+            for node_id, fields in self.__changed.items():
+                base.add_node(node_id, fields)
+        elif isinstance(base, MutableMapping):
+            for node_id in self.removed:
+                base.pop(node_id, None)
+            base.update(self.__changed)
+        else:
+            raise TypeError('The base container is read-only')
+        self.discard()
+
+    def discard(self) -> None:
+        """Drops all changes, the overlay becomes equal to the base container"""
+        self.__changed = {}
+        self.__removed = set()
+
+    def to_dict(self) -> dict:
+        """Materializes the candidate state as a new graph container (nodes are not copied)"""
+        return {node_id: self[node_id] for node_id in self}
@@ -0,0 +1,267 @@
+from collections import deque
+from itertools import chain
+
+from shared.error_structure import Error
+
+
+class TopologicalOrder:
+    """
+    Depth of every node of the graph forest, roots have depth 0.
+    Processing nodes by ascending depth is a topological order: parents always come before their children.
+    Depths are stored with nodes and updated incrementally, only added nodes and moved branches are recalculated,
+    and cycle checks walk up from the changed nodes only.
+    """
+
+    def __init__(self, parents: dict[str, str | None], depths: dict[str, int | None] | None = None):
+        self.__parents = dict(parents)
+        self.__children: dict[str, list[str]] = {}
+        for node_id, parent_id in self.__parents.items():
+            if parent_id is not None:
+                self.__children.setdefault(parent_id, []).append(node_id)
+        self.__errors: list[Error] = []
+
+        if depths and all(depths.get(node_id) is not None for node_id in self.__parents):
+            self.__depths = {node_id: depths[node_id] for node_id in self.__parents}
+        else:
+            self.__depths = {}
+            self.__calculate(self.__parents)
+
+    @classmethod
+    def from_nodes(cls, nodes: dict, depths: dict[str, int | None] | None = None) -> 'TopologicalOrder':
+        """Builds the order of the graph container, stored depths are trusted if every node has one"""
+        return cls({node_id: fields.get('parent_id') for node_id, fields in nodes.items()}, depths)
+
+    def copy(self) -> 'TopologicalOrder':
+        order = TopologicalOrder.__new__(TopologicalOrder)
+        order.__parents = dict(self.__parents)
+        order.__children = {parent_id: list(children) for parent_id, children in self.__children.items()}
+        order.__depths = dict(self.__depths)
+        order.__errors = []
+        return order
+
+    @property
+    def get_errors(self) -> list[Error]:
+        return self.__errors
+
+    @property
+    def parents(self) -> dict[str, str | None]:
+        return self.__parents
+
+    @property
+    def depths(self) -> dict[str, int]:
+        return self.__depths
+
+    def __len__(self) -> int:
+        return len(self.__parents)
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self.__parents
+
+    def levels(self) -> list[list[str]]:
+        """Node ids grouped by depth"""
+        levels = []
+        for node_id, depth in self.__depths.items():
+            while len(levels) <= depth:
+                levels.append([])
+            levels[depth].append(node_id)
+        return levels
+
+    def order(self) -> list[str]:
+        """Node ids in the topological order"""
+        return list(chain.from_iterable(self.levels()))
+
+    def __add_error(self, message: str, location: str | None = None) -> None:
+        self.__errors.append(Error(error_type='param_error', message=message, location=location))
+
+    def __calculate(self, node_ids) -> bool:
+        """Calculates depths of nodes by walking up to a node with a known depth, returns False on a cycle"""
+        parents = self.__parents
+        depths = self.__depths
+        for node_id in node_ids:
+            path = []
+            on_path = set()
+            current = node_id
+            while current not in depths:
+                if current in on_path:
+                    self.__add_error('The graph contains a cycle', current)
+                    return False
+                path.append(current)
+                on_path.add(current)
+                parent_id = parents[current]
+                if parent_id is None or parent_id not in parents:
+                    depths[current] = 0
+                    path.pop()
+                    break
+                current = parent_id
+
+            depth = depths[current]
+            for path_id in reversed(path):
+                depth += 1
+                depths[path_id] = depth
+        return True
+
+    def __is_ancestor(self, node_id: str, parent_id: str | None) -> bool:
+        while parent_id is not None:
+            if parent_id == node_id:
+                return True
+            parent_id = self.__parents.get(parent_id)
+        return False
+
+    def __update_branch(self, node_id: str, changed: dict[str, int]) -> None:
+        parent_id = self.__parents[node_id]
+        depth = 0 if parent_id is None else self.__depths[parent_id] + 1
+        queue = deque([(node_id, depth)])
+        while queue:
+            current, depth = queue.popleft()
+            if self.__depths.get(current) != depth:
+                self.__depths[current] = depth
+                changed[current] = depth
+            queue.extend((child_id, depth + 1) for child_id in self.__children.get(current, []))
+
+    def __link(self, node_id: str, parent_id: str | None) -> None:
+        self.__parents[node_id] = parent_id
+        if parent_id is not None:
+            self.__children.setdefault(parent_id, []).append(node_id)
+
+    def __unlink(self, node_id: str) -> None:
+        parent_id = self.__parents.get(node_id)
+        siblings = self.__children.get(parent_id)
+        if siblings:
+            siblings.remove(node_id)
+            if not siblings:
+                del self.__children[parent_id]
+
+    def add_nodes(self, nodes: dict) -> dict[str, int] | None:
+        """Adds nodes of the graph container format, returns depths of the added nodes"""
+        self.__errors = []
+        for node_id, fields in nodes.items():
+            if node_id in self.__parents:
+                self.__add_error('Node already exists', node_id)
+                continue
+            parent_id = fields.get('parent_id')
+            if parent_id is not None and parent_id not in self.__parents and parent_id not in nodes:
+                self.__add_error(f'Parent node "{parent_id}" does not exist', node_id)
+        if self.__errors:
+            return
+
+        for node_id, fields in nodes.items():
+            self.__link(node_id, fields.get('parent_id'))
+        if not self.__calculate(nodes):
+            self.remove_nodes(list(nodes))
+            return
+        return {node_id: self.__depths[node_id] for node_id in nodes}
+
+    def change_parents(self, parents: dict[str, str | None]) -> dict[str, int] | None:
+        """Moves nodes to new parents, returns the changed depths of the moved branches"""
+        self.__errors = []
+        moved = {}
+        for node_id, parent_id in parents.items():
+            if node_id not in self.__parents:
+                self.__add_error('Node does not exist', node_id)
+            elif parent_id is not None and parent_id not in self.__parents:
+                self.__add_error(f'Parent node "{parent_id}" does not exist', node_id)
+            elif self.__is_ancestor(node_id, parent_id):
+                self.__add_error('The parent link creates a cycle', node_id)
+            elif self.__parents[node_id] != parent_id:
+                moved[node_id] = self.__parents[node_id]
+                self.__unlink(node_id)
+                self.__link(node_id, parent_id)
+            if self.__errors:
+                break
+
+        if self.__errors:
+            for node_id, parent_id in reversed(list(moved.items())):
+                self.__unlink(node_id)
+                self.__link(node_id, parent_id)
+            return
+
+        changed = {}
+        for node_id in moved:
+            self.__update_branch(node_id, changed)
+        return changed
+
+    def remove_nodes(self, node_ids: list[str]) -> list[str]:
+        """Removes nodes with their branches, returns the removed ids"""
+        removed = []
+        stack = [node_id for node_id in node_ids if node_id in self.__parents]
+        for node_id in stack:
+            self.__unlink(node_id)
+        while stack:
+            node_id = stack.pop()
+            if node_id not in self.__parents:
+                continue
+            removed.append(node_id)
+            del self.__parents[node_id]
+            self.__depths.pop(node_id, None)
+            stack.extend(self.__children.pop(node_id, []))
+        return removed
+
+    def __branches(self, node_ids) -> set[str]:
+        """Ids of the nodes with their branches"""
+        branches = set()
+        stack = [node_id for node_id in node_ids if node_id in self.__parents]
+        while stack:
+            node_id = stack.pop()
+            if node_id not in branches:
+                branches.add(node_id)
+                stack.extend(self.__children.get(node_id, []))
+        return branches
+
+    def __check_changes(self, added: dict, moved: dict[str, str | None], removed: set[str]) -> bool:
+        """Checks parent links of the changes as if they were applied, the order is not changed"""
+        self.__errors = []
+
+        def exists(node_id: str) -> bool:
+            return node_id in added or node_id in self.__parents and node_id not in removed
+
+        def parent_of(node_id: str) -> str | None:
+            if node_id in moved:
+                return moved[node_id]
+            if node_id in added:
+                return added[node_id].get('parent_id')
+            return self.__parents[node_id]
+
+        for node_id in chain(added, moved):
+            parent_id = parent_of(node_id)
+            if parent_id is not None and not exists(parent_id):
+                self.__add_error(f'Parent node "{parent_id}" does not exist', node_id)
+        if self.__errors:
+            return False
+
+        # nodes whose ancestors are already walked without a cycle, so the walks do not repeat on deep branches
+        acyclic = set()
+        for node_id in chain(added, moved):
+            path = {node_id}
+            current = parent_of(node_id)
+            while current is not None and current not in acyclic and exists(current):
+                if current in path:
+                    message = 'The graph contains a cycle' if node_id in added else 'The parent link creates a cycle'
+                    self.__add_error(message, node_id)
+                    return False
+                path.add(current)
+                current = parent_of(current)
+            acyclic |= path
+        return True
+
+    def apply_changes(self, nodes: dict, removed: list[str] = ()) -> dict[str, int] | None:
+        """
+        Applies written changes of the graph container format: removed nodes, added nodes and parent changes.
+        Returns the changed depths of the remaining nodes.
+        The changes are checked before any of them is applied, so rejected changes (None) leave the order as it was.
+        """
+        removed_ids = self.__branches(removed)
+        added = {
+            node_id: fields for node_id, fields in nodes.items()
+            if node_id not in self.__parents or node_id in removed_ids
+        }
+        moved = {
+            node_id: fields['parent_id'] for node_id, fields in nodes.items()
+            if node_id not in added and 'parent_id' in fields
+        }
+        if not self.__check_changes(added, moved, removed_ids):
+            return
+
+        self.remove_nodes(list(removed))
+        changed = self.add_nodes(added)
+        changed.update(self.change_parents(moved))
+        return changed
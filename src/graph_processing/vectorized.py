@@ -0,0 +1,152 @@
+"""
+Level-synchronous calculation of the "active" state with NumPy (optional dependency).
+Nodes are processed one depth level at a time: numeric conditions of a level are grouped by operator
+and evaluated as array comparisons, string and bool conditions are evaluated by compiled predicates.
+"""
+from graph_processing.activation import ActivationTree
+from graph_processing.conditions import compile_store, coerce_contents, coerce_value
+from graph_processing.node_store import NodeStore, ROOT, MISSING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NUMERIC_OPERATORS = {
+    'gt': 'greater',
+    'lt': 'less',
+    'gte': 'greater_equal',
+    'lte': 'less_equal',
+    'equal': 'equal',
+    'not_equal': 'not_equal',
+}
+
+
+class Level:
+    """Nodes of one depth level split by the way of calculation"""
+    __slots__ = ('free_children', 'free_parents', 'numeric_groups', 'scalar_nodes')
+
+    def __init__(self):
+        self.free_children = []
+        self.free_parents = []
+        self.numeric_groups: dict[str, tuple[list, list, list]] = {}
+        self.scalar_nodes = []
+
+
+class VectorizedActivation:
+    """
+    NumPy-backed evaluation of scenarios, gives the same result as ActivationTree.evaluate.
+    Useful for large graphs with numeric conditions.
+    """
+
+    def __init__(self, store: NodeStore):
+        if np is None:
+            raise ImportError('numpy is required for the vectorized evaluation mode')
+
+        self.__store = store
+        self.__typed_contents = coerce_contents(store)
+        self.__roots = np.array(store.children().get(ROOT, []), dtype=np.intp)
+        self.__numeric = [data_type == 'integer' for data_type in store.column('data_type')]
+        self.__numbers = np.array(
+            [content if is_numeric and content is not None else np.nan
+             for content, is_numeric in zip(self.__typed_contents, self.__numeric)],
+            dtype=np.float64
+        )
+        self.__levels = self.__build_levels()
+
+    def __build_levels(self) -> list[tuple]:
+        store = self.__store
+        children = store.children()
+        predicates = compile_store(store)
+        conditions = store.column('condition')
+        triggers = store.column('trigger')
+
+        levels = []
+        current = list(children.get(ROOT, []))
+        while current:
+            level = Level()
+            next_level = []
+            for parent in current:
+                for child in children.get(parent, []):
+                    next_level.append(child)
+                    predicate = predicates[child]
+                    condition = conditions[child]
+                    trigger = None if triggers[child] is MISSING else triggers[child]
+                    if predicate is None:
+                        level.free_children.append(child)
+                        level.free_parents.append(parent)
+                    elif self.__numeric[parent] and condition in NUMERIC_OPERATORS \
+                            and coerce_value(trigger, 'integer') is not None:
+                        group = level.numeric_groups.setdefault(condition, ([], [], []))
+                        group[0].append(child)
+                        group[1].append(parent)
+                        group[2].append(coerce_value(trigger, 'integer'))
+                    else:
+                        level.scalar_nodes.append((child, parent, predicate))
+            if next_level:
+                levels.append(self.__pack_level(level))
+            current = next_level
+        return levels
+
+    @staticmethod
+    def __pack_level(level: Level) -> tuple:
+        numeric_groups = []
+        for condition, (group_children, group_parents, group_triggers) in level.numeric_groups.items():
+            numeric_groups.append((
+                getattr(np, NUMERIC_OPERATORS[condition]),
+                np.array(group_children, dtype=np.intp),
+                np.array(group_parents, dtype=np.intp),
+                np.array(group_triggers, dtype=np.float64),
+            ))
+        free = (np.array(level.free_children, dtype=np.intp), np.array(level.free_parents, dtype=np.intp))
+        return free, numeric_groups, level.scalar_nodes
+
+    def evaluate(self, contents: dict) -> set[str]:
+        """Returns the id set of active nodes for the contents applied over the current ones"""
+        store = self.__store
+        data_types = store.column('data_type')
+
+        numbers = self.__numbers
+        overrides = {}
+        if contents:
+            numbers = numbers.copy()
+            for node_id, content in contents.items():
+                ordinal = store.index[node_id]
+                typed_content = coerce_value(content, data_types[ordinal])
+                overrides[ordinal] = typed_content
+                if self.__numeric[ordinal]:
+                    numbers[ordinal] = np.nan if typed_content is None else typed_content
+
+        typed_contents = self.__typed_contents
+        active = np.zeros(len(store.ids), dtype=bool)
+        active[self.__roots] = True
+
+        for (free_children, free_parents), numeric_groups, scalar_nodes in self.__levels:
+            if len(free_children):
+                active[free_children] = active[free_parents]
+
+            for compare, group_children, group_parents, group_triggers in numeric_groups:
+                values = numbers[group_parents]
+                active[group_children] = active[group_parents] & ~np.isnan(values) & compare(values, group_triggers)
+
+            for child, parent, predicate in scalar_nodes:
+                if not active[parent]:
+                    continue
+                content = overrides[parent] if parent in overrides else typed_contents[parent]
+                active[child] = content is not None and predicate(content)
+
+        ids = store.ids
+        return {ids[ordinal] for ordinal in np.flatnonzero(active).tolist()}
+
+    def evaluate_many(self, scenarios):
+        for contents in scenarios:
+            yield self.evaluate(contents)
+
+
+def create_evaluator(store: NodeStore, vectorized: bool = False,
+                     memo_ids: int = 100000) -> ActivationTree | VectorizedActivation:
+    """Vectorized evaluator if requested and NumPy is installed, otherwise the scalar one"""
+    if vectorized and np is not None:
+        return VectorizedActivation(store)
+    return ActivationTree(store, memo_ids)
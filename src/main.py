@@ -8,6 +8,7 @@ from sqladmin import Admin
 from admin_panel.auth_admin import AdminAuth
 from admin_panel.interface import Users, DemoUsers, UserSessions, Projects, Documents, Templates, Nodes
 from db_connect.connect import engine
+from db_connect.query_counter import QueryCounterMiddleware
 from routers.doc_router import doc_router
 from routers.form_router import form_router
 from routers.project_router import project_router
@@ -16,8 +17,11 @@ from routers.template_router import template_router
 from shared.exception_handlers import validation_exception_handler, http_exception_handler, general_exception_handler
 from auth.auth_router import auth_router
 from models.models_events import events_initialize
-from config import API_V1
+from config import API_V1, AUTH_MODE, QUERY_COUNTER
 from background.tasks import run_background_task
+from graph_processing.graph_executor import graph_executor
+from auth.access_checker import watch_revocations
+from auth.key_tools import hashing_pool
 
 
 app = FastAPI()
@@ -43,6 +47,9 @@ app.include_router(form_router, prefix=API_V1)
 app.include_router(doc_router, prefix=API_V1)
 
 
+if QUERY_COUNTER:
+    app.add_middleware(QueryCounterMiddleware)
+
 # exception handlers used to reduce to a single form of response
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -52,7 +59,15 @@ app.add_exception_handler(Exception, general_exception_handler)
 events_initialize()
 
 
+@app.on_event('shutdown')
+def shutdown_executors() -> None:
+    graph_executor.shutdown()
+    hashing_pool.shutdown()
+
+
 # cyclic launch of background tasks
 evl = asyncio.get_running_loop()
 evl.create_task(run_background_task())
+if AUTH_MODE == 'stateless':
+    evl.create_task(watch_revocations())
 
@@ -0,0 +1,45 @@
+"""'add_lookup_indexes'
+
+Revision ID: 8d1e5b0c7a92
+Revises: 3f9c2d7a6e41
+Create Date: 2026-10-18 16:40:07.551309
+
+Indexes are built with CREATE INDEX CONCURRENTLY outside of the migration transaction, so the tables stay writable.
+If a build fails, the invalid index is dropped by the downgrade or must be dropped manually before a retry.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d1e5b0c7a92'
+down_revision = '3f9c2d7a6e41'
+branch_labels = None
+depends_on = None
+
+
+# sessions are not indexed by "expired_at > now()" with a partial index, since now() is not immutable:
+# unexpired sessions are found by the composite index (user_id, expired_at) and the expired_at range
+INDEXES = (
+    ('ix_nodes_project_id', 'nodes', ['project_id']),
+    ('ix_documents_project_id', 'documents', ['project_id']),
+    ('ix_templates_project_id', 'templates', ['project_id']),
+    ('ix_projects_user_id', 'projects', ['user_id']),
+    ('ix_simple_entries_user_id', 'simple_entries', ['user_id']),
+    ('ix_sessions_refresh', 'sessions', ['refresh']),
+    ('ix_sessions_user_id_expired_at', 'sessions', ['user_id', 'expired_at']),
+    ('ix_sessions_expired_at', 'sessions', ['expired_at']),
+    ('ix_demo_users_user_id', 'demo_users', ['user_id']),
+    ('ix_demo_users_created_at', 'demo_users', ['created_at']),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
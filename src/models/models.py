@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import String, ForeignKey, Column, Boolean, DateTime, Integer, JSON, UniqueConstraint
+from sqlalchemy import String, ForeignKey, Column, Boolean, DateTime, Integer, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, declarative_base, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -10,6 +10,10 @@ from shared.time_utils import now_utc
 
 Base = declarative_base()
 
+# relationships are loaded only by the loading profiles of the use cases,
+# access to a relationship that was not loaded raises instead of returning an empty collection
+RELATIONSHIP_LOADING = 'raise_on_sql'
+
 
 class User(Base):
     __tablename__ = 'users'
@@ -25,10 +29,14 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
 
-    simple_entry: Mapped['SimpleEntry'] = relationship(back_populates='user', cascade='all, delete', lazy='selectin')
-    demo_user: Mapped['DemoUser'] = relationship(back_populates='user', cascade='all, delete')
-    projects = relationship('Project', back_populates='user', cascade='all, delete')
-    sessions = relationship('Session', back_populates='user', cascade='all, delete')
+    simple_entry: Mapped['SimpleEntry'] = relationship(back_populates='user', cascade='all, delete', passive_deletes=True,
+                                                        lazy=RELATIONSHIP_LOADING)
+    demo_user: Mapped['DemoUser'] = relationship(back_populates='user', cascade='all, delete', passive_deletes=True,
+                                                  lazy=RELATIONSHIP_LOADING)
+    projects = relationship('Project', back_populates='user', cascade='all, delete', passive_deletes=True,
+                            lazy=RELATIONSHIP_LOADING)
+    sessions = relationship('Session', back_populates='user', cascade='all, delete', passive_deletes=True,
+                            lazy=RELATIONSHIP_LOADING)
 
     def __str__(self):
         return f'{self.name} (id: {self.id}, email: {self.email})'
@@ -43,11 +51,11 @@ class DemoUser(Base):
 
     id = Column(Integer, primary_key=True)
 
-    created_at = Column(DateTime(timezone=True), default=now_utc)
+    created_at = Column(DateTime(timezone=True), default=now_utc, index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
 
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
-    user: Mapped['User'] = relationship(back_populates='demo_user', lazy='selectin')
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    user: Mapped['User'] = relationship(back_populates='demo_user', lazy=RELATIONSHIP_LOADING)
 
     def __str__(self):
         return str(self.id)
@@ -66,8 +74,8 @@ class SimpleEntry(Base):
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
 
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
-    user: Mapped['User'] = relationship(back_populates='simple_entry', lazy='selectin')
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    user: Mapped['User'] = relationship(back_populates='simple_entry', lazy=RELATIONSHIP_LOADING)
 
     def __str__(self):
         return str(self.login)
@@ -75,15 +83,16 @@ class SimpleEntry(Base):
 
 class Session(Base):
     __tablename__ = 'sessions'
+    __table_args__ = (Index('ix_sessions_user_id_expired_at', 'user_id', 'expired_at'),)
 
     id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True)
-    refresh = Column(UUID(as_uuid=True), default=uuid.uuid4)
+    refresh = Column(UUID(as_uuid=True), default=uuid.uuid4, index=True)
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
-    expired_at = Column(DateTime(timezone=True), nullable=False)
+    expired_at = Column(DateTime(timezone=True), nullable=False, index=True)
 
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'))
-    user = relationship('User', back_populates='sessions', lazy='selectin')
+    user = relationship('User', back_populates='sessions', lazy=RELATIONSHIP_LOADING)
 
     def __str__(self):
         return str(self.id)
@@ -101,27 +110,36 @@ class Session(Base):
         return self.expired_at - now_utc()
 
 
+def project_folder_path(project_id: int):
+    """Media folder of the project, also used for projects that are not loaded"""
+    return MEDIA_DIR.joinpath(str(project_id))
+
+
 class Project(Base):
     __tablename__ = 'projects'
     __table_args__ = (UniqueConstraint('name', 'user_id'),)
 
     id = Column('id', Integer, primary_key=True)
     name = Column('name', String, nullable=False)
+    nodes_version = Column(Integer, default=0, server_default='0', nullable=False)
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
 
-    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'))
-    user = relationship('User', back_populates='projects', lazy='selectin')
-    documents = relationship('Document', back_populates='project', cascade='all, delete', lazy='selectin')
-    templates = relationship('Template', back_populates='project', cascade='all, delete', lazy='selectin')
-    nodes = relationship('Node', back_populates='project', cascade='all, delete', lazy='selectin')
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    user = relationship('User', back_populates='projects', lazy=RELATIONSHIP_LOADING)
+    documents = relationship('Document', back_populates='project', cascade='all, delete', passive_deletes=True,
+                             lazy=RELATIONSHIP_LOADING)
+    templates = relationship('Template', back_populates='project', cascade='all, delete', passive_deletes=True,
+                             lazy=RELATIONSHIP_LOADING)
+    nodes = relationship('Node', back_populates='project', cascade='all, delete', passive_deletes=True,
+                         lazy=RELATIONSHIP_LOADING)
 
     def __str__(self):
         return self.name
 
     @property
     def folder_path(self):
-        return MEDIA_DIR.joinpath(str(self.id))
+        return project_folder_path(self.id)
 
 
 class Document(Base):
@@ -133,8 +151,8 @@ class Document(Base):
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
 
-    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'))
-    project = relationship('Project', back_populates='documents')
+    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'), index=True)
+    project = relationship('Project', back_populates='documents', lazy=RELATIONSHIP_LOADING)
 
     @property
     def file_path(self):
@@ -153,8 +171,8 @@ class Template(Base):
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
 
-    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'))
-    project = relationship('Project', back_populates='templates')
+    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'), index=True)
+    project = relationship('Project', back_populates='templates', lazy=RELATIONSHIP_LOADING)
 
     @property
     def file_path(self):
@@ -176,12 +194,13 @@ class Node(Base):
     x = Column(Integer)
     y = Column(Integer)
     active = Column(Boolean, default=False, nullable=False)
+    depth = Column(Integer)
     created_at = Column(DateTime(timezone=True), default=now_utc)
     updated_at = Column(DateTime(timezone=True), onupdate=now_utc, default=now_utc)
     json = Column(JSON)
 
-    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'))
-    project = relationship('Project', back_populates='nodes')
+    project_id = Column(Integer, ForeignKey('projects.id', ondelete='CASCADE'), index=True)
+    project = relationship('Project', back_populates='nodes', lazy=RELATIONSHIP_LOADING)
 
     def __str__(self):
         return str(self.id)
@@ -1,7 +1,7 @@
-from sqlalchemy import event
+from sqlalchemy import event, select
 
 from shared.file_transporter import remove_file, remove_folder
-from models.models import Template, Document, Project
+from models.models import Template, Document, Project, User, project_folder_path
 
 
 def events_initialize():
@@ -16,3 +16,18 @@ def events_initialize():
     @event.listens_for(Project, 'after_delete')
     def intercept_deleted_to_detached(mapper, connection, target):
         remove_folder(target.folder_path)
+
+    # projects of the user are deleted by the database cascade without the listener above
+    @event.listens_for(User, 'before_delete')
+    def intercept_deleted_to_detached(mapper, connection, target):
+        remove_project_folders(connection, [target.id])
+
+
+def remove_project_folders(connection, user_ids: list[int]) -> None:
+    """
+    Removes media folders of the projects of the users, must be called before the users are deleted.
+    connection - synchronous connection or session
+    """
+    find_projects = connection.execute(select(Project.id).filter(Project.user_id.in_(user_ids)))
+    for project_id in find_projects.scalars():
+        remove_folder(project_folder_path(project_id))
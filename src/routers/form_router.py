@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
 
 from shared.common_schemas import OutputDataDTO
+from shared.fast_response import output_data
 from auth.access_checker import get_session_data
 from usecases.form_uc import GetFormUC, GetUpdatedFormUC
 
@@ -17,7 +18,7 @@ async def get_form(input_data: dict, session_data=Depends(get_session_data)):
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @form_router.patch('/', response_model=OutputDataDTO)
@@ -28,5 +29,5 @@ async def get_updated_form(input_data: dict, session_data=Depends(get_session_da
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
 
 from shared.common_schemas import OutputDataDTO
+from shared.fast_response import output_data
 from auth.access_checker import get_session_data
 from usecases.node_uc import CreateNodeUC, PutNodeUC, DeleteNodeUC
 
@@ -17,7 +18,7 @@ async def node_create(input_data: dict, session_data=Depends(get_session_data)):
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @node_router.put('/update/', response_model=OutputDataDTO)
@@ -28,7 +29,7 @@ async def node_update(input_data: dict, session_data=Depends(get_session_data)):
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @node_router.delete('/delete/', response_model=OutputDataDTO)
@@ -39,4 +40,4 @@ async def node_delete(input_data: dict, session_data=Depends(get_session_data)):
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
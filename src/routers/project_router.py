@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
 
 from shared.common_schemas import OutputDataDTO
+from shared.fast_response import output_data
 from auth.access_checker import get_session_data
 from usecases.project_uc import CreateProjectUC, UpdateProjectUC, DeleteProjectUC, ListProjectsUC, DetailProjectsUC
 
@@ -17,7 +18,7 @@ async def projects_list(session_data=Depends(get_session_data)):
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @project_router.post('/project/detail/', response_model=OutputDataDTO)
@@ -28,7 +29,7 @@ async def projects_detail(input_data: dict, session_data=Depends(get_session_dat
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @project_router.post('/project/create/', response_model=OutputDataDTO)
@@ -40,7 +41,7 @@ async def project_create(input_data: dict, session_data=Depends(get_session_data
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @project_router.patch('/project/update/', response_model=OutputDataDTO)
@@ -51,7 +52,7 @@ async def project_update(input_data: dict, session_data=Depends(get_session_data
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
 
 
 @project_router.delete('/project/delete/', response_model=OutputDataDTO)
@@ -62,4 +63,4 @@ async def project_delete(input_data: dict, session_data=Depends(get_session_data
     if not response:
         raise HTTPException(status_code=response.http_error, detail=response.errors)
     else:
-        return {'data': response.data}
+        return output_data(response.data)
@@ -20,3 +20,5 @@ class GetUpdatedFormDTO(BaseDTO):
     user_id = {'type': (int,)}
     project_id = {'type': (int,)}
     contents = {'type': (dict,)}
+    known_active = {'type': (list,), 'default': None, 'f_level_type': (str,)}
+    active_hash = {'type': (str,), 'default': None}
@@ -0,0 +1,15 @@
+from starlette.responses import JSONResponse
+
+from shared.json_codec import dumps_bytes
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by the fast codec, the content must be JSON-compatible or known to the codec"""
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
+
+
+def output_data(data) -> FastJSONResponse:
+    """Successful response in the OutputDataDTO format, bypasses the response model and jsonable_encoder"""
+    return FastJSONResponse({'success': True, 'data': data, 'details': None})
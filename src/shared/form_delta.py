@@ -0,0 +1,86 @@
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+
+
+def hash_active_set(version: int, active_nodes: dict) -> str:
+    """Fingerprint of the active set: ids and contents of active nodes for the project nodes version"""
+    items = sorted((node_id, fields.get('content')) for node_id, fields in active_nodes.items())
+    dump = json.dumps([version, items], default=str, separators=(',', ':'))
+    return hashlib.sha1(dump.encode()).hexdigest()
+
+
+def hash_content(content) -> int:
+    """64-bit fingerprint of a node content, stored in snapshots instead of the content itself"""
+    dump = json.dumps(content, default=str, separators=(',', ':'))
+    return int.from_bytes(hashlib.blake2b(dump.encode(), digest_size=8).digest(), 'big')
+
+
+class FormSnapshots:
+    """
+    LRU of active sets sent to clients (content hashes by node id), keyed by project id and active set hash.
+    Bounded by the approximate memory size of the stored snapshots in bytes.
+    A snapshot of another nodes version is not returned, since other fields of nodes may have changed.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes = max_bytes
+        self.__size = 0
+        self.__entries: OrderedDict[tuple[int, str], tuple[int, dict[str, int], int]] = OrderedDict()
+
+    @staticmethod
+    def __entry_size(hashes: dict) -> int:
+        return sys.getsizeof(hashes) + sum(sys.getsizeof(node_id) + sys.getsizeof(content_hash)
+                                           for node_id, content_hash in hashes.items())
+
+    def get(self, project_id: int, active_hash: str, version: int) -> dict[str, int] | None:
+        key = (project_id, active_hash)
+        snapshot = self.__entries.get(key)
+        if snapshot is None or snapshot[0] != version:
+            return
+        self.__entries.move_to_end(key)
+        return snapshot[1]
+
+    def put(self, project_id: int, active_hash: str, version: int, active_nodes: dict) -> None:
+        if self.__max_bytes <= 0:
+            return
+        key = (project_id, active_hash)
+        if key not in self.__entries:
+            hashes = {node_id: hash_content(fields.get('content')) for node_id, fields in active_nodes.items()}
+            size = self.__entry_size(hashes)
+            if size > self.__max_bytes:
+                return
+            self.__entries[key] = (version, hashes, size)
+            self.__size += size
+        self.__entries.move_to_end(key)
+        while self.__size > self.__max_bytes:
+            _, (_, _, size) = self.__entries.popitem(last=False)
+            self.__size -= size
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+
+def build_delta(known_hashes: dict[str, int | None], active_nodes: dict, sent_contents: dict) -> dict:
+    """
+    Difference between the active set known to the client and the new one.
+    known_hashes - content hashes of nodes active on the client, sent_contents are applied over them.
+    A None hash means the client content is unknown, the content of such a node is returned unless it was sent.
+    """
+    activated = {}
+    changed = {}
+    for node_id, fields in active_nodes.items():
+        if node_id not in known_hashes:
+            activated[node_id] = fields
+            continue
+        content = fields.get('content')
+        if node_id in sent_contents:
+            if content != sent_contents[node_id]:
+                changed[node_id] = content
+        elif known_hashes[node_id] is None or hash_content(content) != known_hashes[node_id]:
+            changed[node_id] = content
+
+    deactivated = [node_id for node_id in known_hashes if node_id not in active_nodes]
+    return {'activated': activated, 'deactivated': deactivated, 'changed': changed}
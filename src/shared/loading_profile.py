@@ -0,0 +1,24 @@
+from sqlalchemy.orm import load_only, selectinload
+
+from config import STRICT_LOADING
+
+
+class LoadingProfile:
+    """
+    Columns and relationships that a use case loads with an entity.
+    Access to relationships outside the profile raises, in the strict mode columns outside the profile raise too.
+    """
+
+    def __init__(self, entity, columns: tuple = (), relationships: tuple = ()):
+        self.entity = entity
+        self.columns = tuple(columns)
+        self.relationships = tuple(relationships)
+
+    @property
+    def options(self) -> list:
+        options = []
+        if self.columns:
+            options.append(load_only(*self.columns, raiseload=STRICT_LOADING))
+        for relationship in self.relationships:
+            options.append(selectinload(relationship))
+        return options
@@ -0,0 +1,40 @@
+from typing import NamedTuple
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from models.models import Project
+
+
+class ProjectAccess(NamedTuple):
+    project_id: int
+    target: object = None
+    name_taken: bool = False
+
+
+async def get_project_access(session: AsyncSession, user_id: int, project_id: int, model=None, target_id: int = None,
+                             name: str = None) -> ProjectAccess | None:
+    """
+    Ownership check of the project, fetch of the target object of the project (model, target_id)
+    and the check that the name is taken by another object of the model in the project, in one statement.
+    Returns None if the user has no such project, target is None if the project has no such object.
+    """
+    query = select(Project.id)
+    if target_id is not None:
+        query = query.add_columns(model)
+        query = query.outerjoin(model, and_(model.project_id == Project.id, model.id == target_id))
+    if name is not None:
+        other = aliased(model)
+        duplicate = select(other.id).filter(other.project_id == Project.id, other.name == name)
+        if target_id is not None:
+            duplicate = duplicate.filter(other.id != target_id)
+        query = query.add_columns(duplicate.exists())
+
+    find_project = await session.execute(query.filter(Project.user_id == user_id, Project.id == project_id))
+    row = find_project.first()
+    if row is None:
+        return
+    target = row[1] if target_id is not None else None
+    name_taken = bool(row[-1]) if name is not None else False
+    return ProjectAccess(row[0], target, name_taken)
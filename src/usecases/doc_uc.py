@@ -1,14 +1,14 @@
 import traceback
 from uuid import uuid4
 
-from sqlalchemy import select, and_
-from sqlalchemy.orm import noload
+from sqlalchemy import select
 
 from converter.html_docx_converter import Converter
 from schemas.doc_chemas import DocxFromTemplateSaveDTO, GetDocDTO, DeleteDocDTO, UpdateDocDTO, ListDocsDTO, \
     DocxFromTemplateDTO
 from models.models import Project, Document
 from shared.base_usecase import BaseUC
+from shared.project_access import get_project_access
 from config import MEDIA_DIR
 
 
@@ -17,20 +17,23 @@ class ListDocsUC(BaseUC):
     ReqDTO = ListDocsDTO
 
     async def process_request(self, req) -> list | None:
-        query = select(Project).filter_by(user_id=req.user_id, id=req.project_id)
-        query = query.options(noload(Project.nodes), noload(Project.templates), noload(Project.user))
-        find_project = await self.session.execute(query)
-        project = find_project.scalar()
-        if not project:
+        query = select(Project.id, Document.id, Document.name, Document.created_at)
+        query = query.outerjoin(Document, Document.project_id == Project.id)
+        query = query.filter(Project.user_id == req.user_id, Project.id == req.project_id).order_by(Document.id)
+        find_documents = await self.session.execute(query)
+        rows = find_documents.all()
+        if not rows:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
         documents = []
-        for doc in project.documents:
+        for _, doc_id, name, created_at in rows:
+            if doc_id is None:
+                continue
             values = {
-                'id': doc.id,
-                'name': doc.name,
-                'created_at': doc.created_at
+                'id': doc_id,
+                'name': name,
+                'created_at': created_at
             }
             documents.append(values)
 
@@ -60,17 +63,13 @@ class DocxFromTemplateSaveUC(BaseUC):
     ReqDTO = DocxFromTemplateSaveDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Document, name=req.name)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Document.name).filter_by(project_id=project_id, name=req.name)
-        find_duplicate_name = await self.session.execute(query)
-        duplicate_name = find_duplicate_name.scalar()
-        if duplicate_name:
+        project_id = access.project_id
+        if access.name_taken:
             self.add_error(error_type='business_error', message='Document name already exist', http_code=406)
             return
 
@@ -93,29 +92,18 @@ class UpdateDocUC(BaseUC):
     ReqDTO = UpdateDocDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Document, req.document_id,
+                                          req.name)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Document).filter_by(project_id=project_id, id=req.document_id)
-        query = query.options(noload('*'))
-        find_document = await self.session.execute(query)
-        document = find_document.scalar()
+        project_id, document = access.project_id, access.target
         if not document:
             self.add_error(error_type='param_error', message='Document does not exist', http_code=404)
             return
 
-        query = select(Document.name).filter(and_(
-            Document.project_id == project_id,
-            Document.name == req.name,
-            Document.id != req.document_id
-        ))
-        find_duplicate_name = await self.session.execute(query)
-        duplicate_name = find_duplicate_name.scalar()
-        if duplicate_name:
+        if access.name_taken:
             self.add_error(error_type='business_error', message='Document name already exist', http_code=406)
             return
 
@@ -139,17 +127,12 @@ class GetDocUC(BaseUC):
     ReqDTO = GetDocDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Document, req.document_id)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Document).filter_by(project_id=project_id, id=req.document_id)
-        query = query.options(noload('*'))
-        find_document = await self.session.execute(query)
-        document = find_document.scalar()
+        document = access.target
         if not document:
             self.add_error(error_type='param_error', message='Document does not exist', http_code=404)
             return
@@ -165,17 +148,12 @@ class DeleteDocUC(BaseUC):
     ReqDTO = DeleteDocDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Document, req.document_id)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Document).filter_by(project_id=project_id, id=req.document_id)
-        query = query.options(noload('*'))
-        find_document = await self.session.execute(query)
-        document = find_document.scalar()
+        document = access.target
         if not document:
             self.add_error(error_type='param_error', message='Document does not exist', http_code=404)
             return
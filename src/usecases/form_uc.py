@@ -1,33 +1,73 @@
 from sqlalchemy import select
-from sqlalchemy.orm import noload
 
-from graph_processing.graph import Graph
-from graph_processing.graph_encoder import GraphEncoder
+from graph_processing import graph_tasks
+from graph_processing.conditions import is_valid_content
+from graph_processing.graph_cache import load_project_graph, CachedGraph, PROJECT_GRAPH_COLUMNS
+from graph_processing.graph_executor import graph_executor
+from config import FORM_SNAPSHOTS_BYTES
 from schemas.form_schemas import GetFormDTO, GetUpdatedFormDTO
 from models.models import Project
 from shared.base_usecase import BaseUC
+from shared.error_structure import Error
 from shared.file_transporter import load_string_from_file
+from shared.form_delta import FormSnapshots, hash_active_set, build_delta
+from shared.loading_profile import LoadingProfile
+
+
+form_snapshots = FormSnapshots(FORM_SNAPSHOTS_BYTES)
+
+
+async def unload_active(project_graph: CachedGraph, contents: dict = None) -> tuple[dict | None, list[Error]]:
+    """
+    Active nodes of the graph with the contents applied, calculated by the activation tree of the cached version.
+    Scenarios of top-level branches are memoized, so repeated contents of a branch are not recalculated.
+    Graphs offloaded by the graph executor are calculated in its pool by a tree built for the request.
+    """
+    nodes = project_graph.nodes
+    contents = contents or {}
+    errors = []
+    for node_id, content in contents.items():
+        if node_id not in nodes:
+            errors.append(Error(error_type='param_error', message='Node does not exist', location=node_id))
+            continue
+        data_type = nodes[node_id].get('data_type')
+        if not is_valid_content(content, data_type):
+            errors.append(Error(error_type='param_error', message=f'Content should have the data type "{data_type}"',
+                                location=node_id))
+    if errors:
+        return None, errors
+
+    if graph_executor.is_offloaded(nodes):
+        active_ids = await graph_executor.run(graph_tasks.evaluate_active, nodes, contents)
+    else:
+        active_ids = project_graph.activation.evaluate(contents)
+
+    active_nodes = {}
+    for node_id in active_ids:
+        fields = {**nodes[node_id], 'active': True}
+        if node_id in contents:
+            fields['content'] = contents[node_id]
+        active_nodes[node_id] = fields
+    return active_nodes, errors
 
 
 class GetFormUC(BaseUC):
     """Get active nodes and templates from project"""
     ReqDTO = GetFormDTO
+    Loading = LoadingProfile(Project, columns=(*PROJECT_GRAPH_COLUMNS, Project.name),
+                             relationships=(Project.templates,))
 
     async def process_request(self, req) -> dict | None:
         query = select(Project).filter_by(user_id=req.user_id, id=req.project_id)
-        query = query.options(noload(Project.user), noload(Project.documents))
+        query = query.options(*self.Loading.options)
         find_project = await self.session.execute(query)
         project = find_project.scalar()
         if not project:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        nodes = GraphEncoder().deserialize_nodes(project.nodes)
-        graph = Graph(nodes)
-        active_nodes = graph.unload_active
-        if nodes and not active_nodes:
-            self.add_errors(graph.get_errors, http_code=500)
-            return
+        project_graph = await load_project_graph(self.session, project)
+        active_nodes, _ = await unload_active(project_graph)
 
         templates = []
         for template in project.templates:
@@ -38,38 +78,59 @@ class GetFormUC(BaseUC):
             }
             templates.append(fields)
 
-        for node in project.nodes:
-            node_id = str(node.id)
-            if node_id in active_nodes.keys():
-                active_nodes[node_id]['created_at'] = node.created_at
-        return {'project_id': project.id, 'project_name': project.name, 'active_nodes': active_nodes, 'templates': templates}
+        active_hash = hash_active_set(project_graph.version, active_nodes)
+        form_snapshots.put(project.id, active_hash, project_graph.version, active_nodes)
+
+        for node_id, fields in active_nodes.items():
+            fields['created_at'] = project_graph.created_at.get(node_id)
+        return {'project_id': project.id, 'project_name': project.name, 'active_nodes': active_nodes,
+                'templates': templates, 'active_hash': active_hash}
 
 
 class GetUpdatedFormUC(BaseUC):
-    """Get updated active nodes based on new contents"""
+    """
+    Get updated active nodes based on new contents.
+    Delta mode: if the client sends the hash of its active set (active_hash) or its id list (known_active),
+    only activated nodes, deactivated ids and changed contents are returned.
+    The id list does not tell the contents the client has, so contents of all nodes that stay active are returned
+    except the sent ones, while the hash resolves to a snapshot and only contents that differ from it are returned.
+    """
     ReqDTO = GetUpdatedFormDTO
+    Loading = LoadingProfile(Project, columns=(*PROJECT_GRAPH_COLUMNS, Project.name))
 
     async def process_request(self, req) -> dict | None:
         query = select(Project).filter_by(user_id=req.user_id, id=req.project_id)
-        query = query.options(noload(Project.user), noload(Project.documents), noload(Project.templates))
+        query = query.options(*self.Loading.options)
         find_project = await self.session.execute(query)
         project = find_project.scalar()
         if not project:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        nodes = GraphEncoder().deserialize_nodes(project.nodes)
-        graph = Graph(nodes)
-        graph.change_nodes_content(req.contents)
-        errors = graph.get_errors
+        project_graph = await load_project_graph(self.session, project)
+        active_nodes, errors = await unload_active(project_graph, req.contents)
         if errors:
             self.add_errors(errors, http_code=406)
             return
-        active_nodes = graph.unload_active
 
-        for node in project.nodes:
-            node_id = str(node.id)
-            if node_id in active_nodes.keys():
-                active_nodes[node_id]['created_at'] = node.created_at
+        active_hash = hash_active_set(project_graph.version, active_nodes)
+        form_snapshots.put(project.id, active_hash, project_graph.version, active_nodes)
+
+        known_hashes = None
+        if req.active_hash is not None:
+            known_hashes = form_snapshots.get(project.id, req.active_hash, project_graph.version)
+        elif req.known_active is not None:
+            known_hashes = dict.fromkeys(req.known_active)
+
+        if known_hashes is not None:
+            delta = build_delta(known_hashes, active_nodes, req.contents)
+            for node_id, fields in delta['activated'].items():
+                fields['created_at'] = project_graph.created_at.get(node_id)
+            return {'project_id': project.id, 'project_name': project.name, 'delta': True,
+                    'active_hash': active_hash, **delta}
+
+        for node_id, fields in active_nodes.items():
+            fields['created_at'] = project_graph.created_at.get(node_id)
 
-        return {'project_id': project.id, 'project_name': project.name, 'active_nodes': active_nodes}
+        return {'project_id': project.id, 'project_name': project.name, 'delta': False,
+                'active_nodes': active_nodes, 'active_hash': active_hash}
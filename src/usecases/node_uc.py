@@ -1,119 +1,172 @@
-from sqlalchemy import select, and_
-from sqlalchemy.orm import noload
+from uuid import UUID
+
+from sqlalchemy import select, and_, func
 
 from models.models import Project, Node
 from schemas.node_schemas import CreateNodeDTO, PutNodeDTO, DeleteNodeDTO
 from shared.base_usecase import BaseUC
-from graph_processing.graph import Graph
+from shared.error_structure import Error
+from shared.loading_profile import LoadingProfile
+from graph_processing import graph_tasks
+from graph_processing.graph_cache import load_project_graph, bump_project_version, cache_next_version, write_nodes, \
+    take_order, CachedGraph, PROJECT_GRAPH_COLUMNS
 from graph_processing.graph_encoder import GraphEncoder
+from graph_processing.graph_executor import graph_executor
+from graph_processing.graph_schemas import GrafChangesDTO
+from graph_processing.overlay import NodesOverlay
+
+
+def check_changes(project_graph: CachedGraph, nodes: dict, added: bool) -> list[Error]:
+    """
+    Incremental validation of the requested nodes against the cached graph container,
+    only the changed nodes and their neighbours are checked before the graph calculation
+    """
+    candidate = NodesOverlay(project_graph.nodes)
+    errors = []
+    for node_id, fields in nodes.items():
+        if not isinstance(fields, dict):
+            errors.append(Error(error_type='param_error', message='Incorrect node fields, expected a dict',
+                                location=node_id))
+        elif added:
+            candidate.add_node(node_id, fields)
+        elif node_id not in candidate:
+            errors.append(Error(error_type='param_error', message='Node does not exist', location=node_id))
+        else:
+            candidate.change_node(node_id, fields)
+    if errors:
+        return errors
+    return GrafChangesDTO(candidate, project_graph.children).errors
 
 
 class CreateNodeUC(BaseUC):
     """Create a new node"""
     ReqDTO = CreateNodeDTO
+    Loading = LoadingProfile(Project, columns=PROJECT_GRAPH_COLUMNS)
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project).filter_by(id=req.project_id, user_id=req.user_id)
-        query = query.options(noload(Project.user), noload(Project.documents), noload(Project.templates))
+        try:
+            node_ids = [UUID(node_id) for node_id in req.nodes]
+        except (TypeError, ValueError, AttributeError):
+            self.add_error(error_type='param_error', message='Incorrect nodes container, expected a dict', http_code=406)
+            return
+
+        # the ownership check and the duplicate id check in one statement
+        duplicate_ids = select(func.array_agg(Node.id)).filter(Node.id.in_(node_ids)).scalar_subquery()
+        query = select(Project, duplicate_ids).filter(Project.id == req.project_id, Project.user_id == req.user_id)
+        query = query.options(*self.Loading.options)
         find_project = await self.session.execute(query)
-        project = find_project.scalar()
-        if not project:
+        row = find_project.first()
+
+        if not row:
             self.add_error(error_type='business_error', message='Project does not exist', http_code=404)
             return
 
-        try:
-            query = select(Node.id).filter(Node.id.in_(req.nodes.keys()))
-            find_duplicate_id = await self.session.execute(query)
-            duplicate_id = find_duplicate_id.scalars().all()
-            if duplicate_id:
-                duplicate = []
-                for node_id in duplicate:
-                    duplicate.append(str(node_id))
-                self.add_error(error_type='param_error', message=f'Node id already exist:{duplicate_id}', http_code=406)
-                return
+        project, duplicate_ids = row
+        if duplicate_ids:
+            duplicate = [str(node_id) for node_id in duplicate_ids]
+            self.add_error(error_type='param_error', message=f'Node id already exist:{duplicate}', http_code=406)
+            return
 
-        except Exception:
-            self.add_error(error_type='param_error', message='Incorrect nodes container, expected a dict', http_code=406)
+        project_graph = await load_project_graph(self.session, project)
+        errors = check_changes(project_graph, req.nodes, added=True)
+        if errors:
+            self.add_errors(errors, http_code=406)
             return
 
-        nodes = GraphEncoder().deserialize_nodes(project.nodes)
-        graph = Graph(nodes)
-        new_nodes = graph.add_nodes(req.nodes)
+        new_nodes, errors = await graph_executor.run(graph_tasks.add_nodes, project_graph.nodes, req.nodes)
         if not new_nodes:
-            self.add_errors(graph.get_errors, http_code=406)
+            self.add_errors(errors, http_code=406)
             return
         else:
+            change_list = GraphEncoder().serialize_to_dict(new_nodes, project.id)
+            order, depths = take_order(project, project_graph, change_list)
+            if depths is None:
+                self.add_errors(order.get_errors, http_code=406)
+                return
+
             object_list = GraphEncoder().serialize_nodes(new_nodes, project.id)
+            for obj in object_list:
+                obj.depth = depths.pop(str(obj.id))
             self.session.add_all(object_list)
+            await write_nodes(self.session, project, {}, depths)
+            new_version = await bump_project_version(self.session, project)
             await self.session.commit()
+
+            created_at = {str(obj.id): obj.created_at for obj in object_list}
+            cache_next_version(project, new_version, project_graph, change_list, created_at=created_at, order=order)
             return {'project_id': project.id, 'nodes': new_nodes}
 
 
 class PutNodeUC(BaseUC):
     """Modifies an existing nodes"""
     ReqDTO = PutNodeDTO
+    Loading = LoadingProfile(Project, columns=PROJECT_GRAPH_COLUMNS)
 
     async def process_request(self, req) -> dict | None:
         query = select(Project).filter_by(id=req.project_id, user_id=req.user_id)
-        query = query.options(noload(Project.user), noload(Project.documents), noload(Project.templates))
+        query = query.options(*self.Loading.options)
         find_project = await self.session.execute(query)
         project = find_project.scalar()
         if not project:
             self.add_error(error_type='business_error', message='Project does not exist', http_code=404)
             return
 
-        nodes = GraphEncoder().deserialize_nodes(project.nodes)
-        graph = Graph(nodes)
-        changed_nodes = graph.change_nodes(req.nodes)
+        project_graph = await load_project_graph(self.session, project)
+        errors = check_changes(project_graph, req.nodes, added=False)
+        if errors:
+            self.add_errors(errors, http_code=406)
+            return
+
+        changed_nodes, errors = await graph_executor.run(graph_tasks.change_nodes, project_graph.nodes, req.nodes)
         if not changed_nodes:
-            self.add_errors(graph.get_errors, http_code=406)
+            self.add_errors(errors, http_code=406)
             return
         else:
-            change_list = GraphEncoder().serialize_to_dict(changed_nodes, project.id)
-            query = select(Node).filter(and_(Node.project_id == project.id, Node.id.in_(change_list.keys())))
-            find_nodes = await self.session.execute(query)
-            nodes_for_change = find_nodes.scalars()
-
-            for obj in nodes_for_change:
-                for field, value in change_list[str(obj.id)].items():
-                    setattr(obj, field, value)
+            change_list = GraphEncoder().serialize_to_dict(changed_nodes, project.id, project_graph.nodes)
+            order, depths = take_order(project, project_graph, change_list)
+            if depths is None:
+                self.add_errors(order.get_errors, http_code=406)
+                return
 
+            await write_nodes(self.session, project, change_list, depths)
+            new_version = await bump_project_version(self.session, project)
             await self.session.commit()
+            cache_next_version(project, new_version, project_graph, change_list, order=order)
             return {'project_id': project.id, 'nodes': changed_nodes}
 
 
 class DeleteNodeUC(BaseUC):
     """Removes nodes based on the incoming list of their id and project id"""
     ReqDTO = DeleteNodeDTO
+    Loading = LoadingProfile(Project, columns=PROJECT_GRAPH_COLUMNS)
 
     async def process_request(self, req) -> dict | None:
         query = select(Project).filter_by(id=req.project_id, user_id=req.user_id)
-        query = query.options(noload(Project.user), noload(Project.documents), noload(Project.templates))
+        query = query.options(*self.Loading.options)
         find_project = await self.session.execute(query)
         project = find_project.scalar()
         if not project:
             self.add_error(error_type='business_error', message='Project does not exist', http_code=404)
             return
 
-        nodes = GraphEncoder().deserialize_nodes(project.nodes)
-        graph = Graph(nodes)
-        node_changes = graph.remove_nodes(req.delete_list)
+        project_graph = await load_project_graph(self.session, project)
+        node_changes, errors = await graph_executor.run(graph_tasks.remove_nodes, project_graph.nodes, req.delete_list)
 
         if not node_changes:
-            self.add_errors(graph.get_errors, http_code=406)
+            self.add_errors(errors, http_code=406)
             return
         else:
+            change_list = GraphEncoder().serialize_to_dict(node_changes[1], project.id, project_graph.nodes)
+            order, depths = take_order(project, project_graph, change_list, removed=node_changes[0])
+            if depths is None:
+                self.add_errors(order.get_errors, http_code=406)
+                return
+
             query = Node.__table__.delete().where(and_(Node.project_id == project.id, Node.id.in_(node_changes[0])))
             await self.session.execute(query)
 
-            change_list = GraphEncoder().serialize_to_dict(node_changes[1], project.id)
-            query = select(Node).filter(and_(Node.project_id == project.id, Node.id.in_(change_list.keys())))
-            find_nodes = await self.session.execute(query)
-
-            nodes_for_change = find_nodes.scalars()
-            for obj in nodes_for_change:
-                for field, value in change_list[str(obj.id)].items():
-                    setattr(obj, field, value)
-
+            await write_nodes(self.session, project, change_list, depths)
+            new_version = await bump_project_version(self.session, project)
             await self.session.commit()
+            cache_next_version(project, new_version, project_graph, change_list, removed=node_changes[0], order=order)
             return {'project_id': project.id, 'removed_nodes': node_changes[0], 'changed_nodes': node_changes[1]}
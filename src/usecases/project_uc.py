@@ -1,12 +1,18 @@
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func, literal_column, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import noload
 
-from graph_processing.graph_encoder import GraphEncoder
+from graph_processing.graph_cache import load_project_graph, PROJECT_GRAPH_COLUMNS
 from shared.file_transporter import load_string_from_file
-from models.models import Project
+from models.models import Project, Document, Node
 from schemas.project_schemas import CreateProjectDTO, UpdateProjectDTO, DeleteProjectDTO, ListProjectsDTO, \
     DetailProjectsDTO
 from shared.base_usecase import BaseUC
+from shared.loading_profile import LoadingProfile
+
+
+# ISO 8601 in UTC, as datetimes of the driver are serialized, independent of the session time zone
+UTC_ISO_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'
 
 
 class CreateProjectUC(BaseUC):
@@ -81,30 +87,31 @@ class ListProjectsUC(BaseUC):
     ReqDTO = ListProjectsDTO
 
     async def process_request(self, req) -> list:
-        query = select(Project).filter_by(user_id=req.user_id)
-        query = query.options(noload(Project.user), noload(Project.templates))
+        nodes_count = select(func.count(Node.id)).where(Node.project_id == Project.id)
+        nodes_count = nodes_count.correlate(Project).scalar_subquery()
+
+        document_fields = func.json_build_object(
+            'id', Document.id,
+            'project_id', Document.project_id,
+            'name', Document.name,
+            'created_at', func.to_char(func.timezone('UTC', Document.created_at), UTC_ISO_FORMAT),
+        )
+        documents = select(func.coalesce(func.json_agg(aggregate_order_by(document_fields, Document.id)),
+                                         literal_column("'[]'::json"), type_=JSON))
+        documents = documents.where(Document.project_id == Project.id).correlate(Project).scalar_subquery()
+
+        query = select(Project.id, Project.name, Project.created_at, documents, nodes_count)
+        query = query.where(Project.user_id == req.user_id).order_by(Project.id)
         find_projects = await self.session.execute(query)
-        current_projects = find_projects.scalars()
-
-        def get_documents(user_project: Project) -> list:
-            documents = []
-            for doc in user_project.documents:
-                documents.append({
-                    'id': doc.id,
-                    'project_id': doc.project_id,
-                    'name': doc.name,
-                    'created_at': doc.created_at,
-                })
-            return documents
 
         projects = []
-        for project in current_projects:
+        for project_id, name, created_at, project_documents, project_nodes_count in find_projects:
             projects.append({
-                'id': project.id,
-                'name': project.name,
-                'created_at': project.created_at,
-                'documents': get_documents(project),
-                'nodes_count': len(project.nodes)
+                'id': project_id,
+                'name': name,
+                'created_at': created_at,
+                'documents': project_documents,
+                'nodes_count': project_nodes_count
             })
 
         return projects
@@ -113,15 +120,18 @@ class ListProjectsUC(BaseUC):
 class DetailProjectsUC(BaseUC):
     """Details of one user projects"""
     ReqDTO = DetailProjectsDTO
+    Loading = LoadingProfile(Project, columns=(*PROJECT_GRAPH_COLUMNS, Project.name, Project.created_at),
+                             relationships=(Project.templates, Project.documents))
 
     async def process_request(self, req) -> dict | None:
         query = select(Project).filter_by(user_id=req.user_id, id=req.project_id)
-        query = query.options(noload(Project.user))
+        query = query.options(*self.Loading.options)
         find_project = await self.session.execute(query)
         project = find_project.scalar()
         if not project:
             self.add_error(error_type='business_error', message='Project does not exist', http_code=404)
             return
+        project_graph = await load_project_graph(self.session, project)
 
         def get_templates(project_templates: list) -> list:
             templates = []
@@ -150,7 +160,7 @@ class DetailProjectsUC(BaseUC):
             'created_at': project.created_at,
             'templates': get_templates(project.templates),
             'documents': get_documents(project.documents),
-            'nodes': GraphEncoder().deserialize_nodes(project.nodes)
+            'nodes': project_graph.nodes
         }
 
         return response
@@ -1,11 +1,9 @@
-from sqlalchemy import select, and_
-from sqlalchemy.orm import noload
-
 from converter.html_docx_converter import Converter
 from schemas.template_schemas import CreateTemplateDTO, UpdateTemplateDTO, DeleteTemplateDTO, TemplateFromDocxDTO
-from models.models import Project, Template
+from models.models import Template
 from shared.base_usecase import BaseUC
 from shared.file_transporter import save_string_to_file
+from shared.project_access import get_project_access
 
 
 class CreateTemplateUC(BaseUC):
@@ -13,17 +11,12 @@ class CreateTemplateUC(BaseUC):
     ReqDTO = CreateTemplateDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Template, name=req.name)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Template.name).filter_by(project_id=project_id, name=req.name)
-        find_duplicate = await self.session.execute(query)
-        duplicate = find_duplicate.scalar()
-        if duplicate:
+        if access.name_taken:
             self.add_error(error_type='business_error', message='Template name already exist', http_code=406)
             return
 
@@ -40,29 +33,18 @@ class UpdateTemplateUC(BaseUC):
     ReqDTO = UpdateTemplateDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Template, req.template_id,
+                                          req.name)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Template).filter_by(project_id=project_id, id=req.template_id)
-        query = query.options(noload('*'))
-        find_template = await self.session.execute(query)
-        template = find_template.scalar()
+        template = access.target
         if not template:
             self.add_error(error_type='param_error', message='Template does not exist', http_code=404)
             return
 
-        query = select(Template.id).filter(and_(
-            Template.project_id == project_id,
-            Template.name == req.name,
-            Template.id != req.template_id
-        ))
-        find_duplicate_name = await self.session.execute(query)
-        duplicate_name = find_duplicate_name.scalar()
-        if duplicate_name:
+        if access.name_taken:
             self.add_error(error_type='business_error', message='Template name already exist', http_code=406)
             return
 
@@ -81,17 +63,12 @@ class DeleteTemplateUC(BaseUC):
     ReqDTO = DeleteTemplateDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Template, req.template_id)
+        if not access:
             self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
             return
 
-        query = select(Template).filter_by(project_id=project_id, id=req.template_id)
-        query = query.options(noload('*'))
-        find_template = await self.session.execute(query)
-        template = find_template.scalar()
+        template = access.target
         if not template:
             self.add_error(error_type='param_error', message='Template does not exist', http_code=404)
             return
@@ -106,20 +83,15 @@ class TemplateFromDocxUC(BaseUC):
     ReqDTO = TemplateFromDocxDTO
 
     async def process_request(self, req) -> dict | None:
-        query = select(Project.id).filter_by(user_id=req.user_id, id=req.project_id)
-        find_project_id = await self.session.execute(query)
-        project_id = find_project_id.scalar()
-        if not project_id:
-            self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
-            return
-
         raw_filename = req.file.filename.split('.')
         filename = raw_filename[0]
 
-        query = select(Template.id).filter_by(project_id=project_id, name=filename)
-        find_duplicate_name = await self.session.execute(query)
-        duplicate_name = find_duplicate_name.scalar()
-        if duplicate_name:
+        access = await get_project_access(self.session, req.user_id, req.project_id, Template, name=filename)
+        if not access:
+            self.add_error(error_type='param_error', message='Project does not exist', http_code=404)
+            return
+
+        if access.name_taken:
             self.add_error(error_type='business_error', message='Template name already exist', http_code=406)
             return
 
@@ -0,0 +1,9 @@
+import os
+
+
+# use cases that touch relationships or columns outside their loading profile fail the tests
+os.environ.setdefault('STRICT_LOADING', '1')
+
+# settings that have no default in the config
+for setting in ('JWT_EXPIRATION', 'REFRESH_EXPIRATION', 'DEMO_USER_EXPIRATION', 'TEMP_FILES_EXPIRATION'):
+    os.environ.setdefault(setting, '60')
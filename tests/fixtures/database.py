@@ -0,0 +1,71 @@
+"""
+In-memory SQLite database of the models for the use case tests.
+Use cases get an adapter of the synchronous session with the AsyncSession methods they call,
+so the loading strategies (raise_on_sql relationships, raiseload of load_only) work as with asyncpg.
+"""
+import sqlite3
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from models.models import Base
+from shared.json_codec import dumps, loads
+
+
+@compiles(UUID, 'sqlite')
+def compile_uuid(type_, compiler, **kwargs):
+    return 'CHAR(36)'
+
+
+class ArrayAgg:
+    """array_agg of PostgreSQL, only the empty result (NULL) is used by the tests"""
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        self.values.append(value)
+
+    def finalize(self):
+        return dumps(self.values) if self.values else None
+
+
+class AsyncSessionAdapter:
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.sync_session.execute(statement, *args, **kwargs)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def flush(self):
+        self.sync_session.flush()
+
+    async def delete(self, obj):
+        self.sync_session.delete(obj)
+
+    def add(self, obj):
+        self.sync_session.add(obj)
+
+    def add_all(self, objects):
+        self.sync_session.add_all(objects)
+
+
+def create_database():
+    # uuid columns are passed to SQLite as strings, as asyncpg accepts them
+    sqlite3.register_adapter(uuid.UUID, str)
+    engine = create_engine('sqlite://', poolclass=StaticPool, json_serializer=dumps, json_deserializer=loads)
+    engine.dialect.supports_native_uuid = True
+
+    @event.listens_for(engine, 'connect')
+    def register_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_aggregate('array_agg', 1, ArrayAgg)
+
+    Base.metadata.create_all(engine)
+    return engine
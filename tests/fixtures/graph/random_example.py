@@ -0,0 +1,53 @@
+import random
+from uuid import uuid4
+
+
+def make_node(parent_id: str | None, data_type: str, condition: str | None = None, trigger=None, content=None) -> dict:
+    return {
+        'parent_id': parent_id,
+        'name': 'node',
+        'description': None,
+        'data_type': data_type,
+        'node_type': 'checkbox' if data_type == 'bool' else 'entry',
+        'content': content,
+        'condition': condition,
+        'trigger': trigger,
+        'x': 0,
+        'y': 0,
+        'active': False,
+    }
+
+
+def make_random_graph(size: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    nodes = {}
+    ids = []
+    for _ in range(size):
+        node_id = str(uuid4())
+        parent_id = rnd.choice(ids) if ids and rnd.random() > 0.05 else None
+        data_type = rnd.choice(['integer', 'string', 'bool'])
+        condition, trigger = None, None
+        if parent_id and rnd.random() > 0.2:
+            parent_type = nodes[parent_id]['data_type']
+            if parent_type == 'integer':
+                condition = rnd.choice(['gt', 'lt', 'gte', 'lte', 'equal', 'not_equal'])
+                trigger = rnd.randint(0, 10)
+            elif parent_type == 'string':
+                condition = rnd.choice(['equal', 'not_equal'])
+                trigger = rnd.choice(['a', 'b', 'c'])
+            else:
+                condition = rnd.choice(['equal', 'not_equal'])
+                trigger = rnd.choice([True, False])
+        nodes[node_id] = make_node(parent_id, data_type, condition, trigger, random_content(rnd, data_type))
+        ids.append(node_id)
+    return nodes
+
+
+def random_content(rnd: random.Random, data_type: str):
+    if rnd.random() < 0.1:
+        return None
+    if data_type == 'integer':
+        return rnd.randint(0, 10)
+    if data_type == 'string':
+        return rnd.choice(['a', 'b', 'c'])
+    return rnd.choice([True, False])
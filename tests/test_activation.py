@@ -0,0 +1,102 @@
+import random
+from uuid import uuid4
+
+import pytest
+from fixtures.graph.random_example import make_node, make_random_graph, random_content
+from graph_processing.activation import ActivationTree, evaluate_in_pool
+from graph_processing.node_store import NodeStore
+
+
+@pytest.fixture
+def incremental_changes(request) -> dict:
+    rnd = random.Random(request.param)
+    nodes = make_random_graph(300, request.param)
+    tree = ActivationTree.from_nodes(nodes)
+
+    mismatches = []
+    wrong_switched = []
+    for _ in range(30):
+        before = tree.active_ids
+        changed_ids = rnd.sample(list(nodes.keys()), 5)
+        contents = {node_id: random_content(rnd, nodes[node_id]['data_type']) for node_id in changed_ids}
+        switched = tree.change_contents(contents)
+
+        reference_tree = ActivationTree.from_nodes(tree.store.to_nodes())
+        if reference_tree.active_ids != tree.active_ids:
+            mismatches.append(contents)
+        if switched != before.symmetric_difference(tree.active_ids):
+            wrong_switched.append(contents)
+
+    return {'mismatches': mismatches, 'wrong_switched': wrong_switched, 'active_nodes': tree.active_nodes}
+
+
+@pytest.mark.parametrize('incremental_changes', [1, 2, 3], indirect=True)
+def test_incremental_changes(incremental_changes):
+    assert not incremental_changes['mismatches'], 'incremental recalculation differs from the full calculation'
+    assert not incremental_changes['wrong_switched'], 'change_contents returns incorrect switched nodes'
+    for fields in incremental_changes['active_nodes'].values():
+        assert fields['active'] is True, 'active_nodes returns inactive nodes'
+
+
+def test_missing_parent_content():
+    root_id, child_id = str(uuid4()), str(uuid4())
+    nodes = {
+        root_id: make_node(None, 'string'),
+        child_id: make_node(root_id, 'string', 'equal', 'a'),
+    }
+    tree = ActivationTree.from_nodes(nodes)
+    assert tree.active_ids == {root_id}, 'dependent node is active without parent content'
+
+    tree.change_contents({root_id: 'a'})
+    assert tree.active_ids == {root_id, child_id}, 'dependent node was not activated by parent content'
+
+
+@pytest.fixture
+def scenarios() -> dict:
+    rnd = random.Random(10)
+    nodes = make_random_graph(200, 10)
+    contents_list = []
+    for _ in range(20):
+        changed_ids = rnd.sample(list(nodes.keys()), 10)
+        contents_list.append({node_id: random_content(rnd, nodes[node_id]['data_type']) for node_id in changed_ids})
+
+    expected = []
+    for contents in contents_list:
+        tree = ActivationTree.from_nodes(nodes)
+        tree.change_contents(contents)
+        expected.append(tree.active_ids)
+
+    return {'nodes': nodes, 'contents_list': contents_list, 'expected': expected}
+
+
+def test_evaluate_many(scenarios):
+    tree = ActivationTree.from_nodes(scenarios['nodes'])
+    initial_active = tree.active_ids
+    results = list(tree.evaluate_many(scenarios['contents_list']))
+    assert results == scenarios['expected'], 'scenario evaluation differs from the content change'
+    assert tree.active_ids == initial_active, 'scenario evaluation changes the state of the tree'
+
+
+def test_evaluate_in_pool(scenarios):
+    store = NodeStore.from_nodes(scenarios['nodes'])
+    results = list(evaluate_in_pool(store, scenarios['contents_list'], max_workers=2, chunksize=4))
+    assert results == scenarios['expected'], 'scenario evaluation in the process pool differs from the content change'
+
+
+def test_evaluate_memo(scenarios):
+    tree = ActivationTree.from_nodes(scenarios['nodes'])
+    bounded_tree = ActivationTree.from_nodes(scenarios['nodes'], memo_ids=50)
+    for _ in range(2):
+        results = list(tree.evaluate_many(scenarios['contents_list']))
+        assert results == scenarios['expected'], 'memoized scenario evaluation differs from the content change'
+        results = list(bounded_tree.evaluate_many(scenarios['contents_list']))
+        assert results == scenarios['expected'], 'scenario evaluation with a full memo differs from the content change'
+    assert tree.memo_stats['hit_rate'] > 0.5, 'unchanged branches are not taken from the memo'
+    assert bounded_tree.memo_stats['ids'] <= 50, 'the memo is not bounded by the number of stored ids'
+    assert bounded_tree.memo_stats['size'] < tree.memo_stats['size'], 'old results are not dropped from the memo'
+
+    contents = scenarios['contents_list'][0]
+    tree.change_contents(contents)
+    reference_tree = ActivationTree.from_nodes(tree.store.to_nodes(), memo_ids=0)
+    for contents in scenarios['contents_list']:
+        assert tree.evaluate(contents) == reference_tree.evaluate(contents), 'the memo is not invalidated by content change'
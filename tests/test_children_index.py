@@ -0,0 +1,52 @@
+import random
+from uuid import uuid4
+
+import pytest
+from fixtures.graph.random_example import make_node
+from graph_processing.activation import ActivationTree
+from graph_processing.children_index import build_children_indexes
+from graph_processing.conditions import check_condition
+from graph_processing.node_store import NodeStore
+
+
+@pytest.fixture
+def wide_select() -> dict:
+    rnd = random.Random(5)
+    options = [str(number) for number in range(100)]
+    select_id = str(uuid4())
+    select_node = make_node(None, 'integer', content='10')
+    select_node.update({'node_type': 'select', 'options': options, 'view_type': 'drop_list'})
+    nodes = {select_id: select_node}
+    for _ in range(300):
+        condition = rnd.choice(['gt', 'lt', 'gte', 'lte', 'equal', 'not_equal', None])
+        trigger = rnd.choice(options + ['text']) if condition else None
+        nodes[str(uuid4())] = make_node(select_id, 'string', condition, trigger)
+    return {'nodes': nodes, 'select_id': select_id, 'options': options}
+
+
+def test_matching_children(wide_select):
+    nodes = wide_select['nodes']
+    store = NodeStore.from_nodes(nodes)
+    index = build_children_indexes(store, store.children())[store.index[wide_select['select_id']]]
+
+    for content in wide_select['options'] + [None]:
+        expected = {
+            store.index[node_id] for node_id, fields in nodes.items()
+            if fields['parent_id'] and check_condition(content, 'integer', fields['condition'], fields['trigger'])
+        }
+        typed_content = None if content is None else float(content)
+        matching = list(index.matching(typed_content))
+        assert set(matching) == expected, f'incorrect matching children for content {content}'
+        assert len(matching) == len(expected), f'duplicated matching children for content {content}'
+
+
+def test_switched_children(wide_select):
+    nodes = wide_select['nodes']
+    select_id = wide_select['select_id']
+    tree = ActivationTree.from_nodes(nodes)
+    for content in ['50', '0', '99', None, '99', '42']:
+        before = tree.active_ids
+        switched = tree.change_contents({select_id: content})
+        expected = ActivationTree.from_nodes(tree.store.to_nodes()).active_ids
+        assert tree.active_ids == expected, f'incorrect active nodes after content {content}'
+        assert switched == before.symmetric_difference(expected), f'incorrect switched nodes for content {content}'
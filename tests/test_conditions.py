@@ -0,0 +1,39 @@
+import pytest
+from graph_processing.conditions import check_condition, compile_condition, coerce_value
+
+
+CONDITION_CASES = [
+    (5, 'integer', 'gt', 3, True),
+    (5, 'integer', 'lt', 3, False),
+    (5, 'integer', 'gte', 5, True),
+    (5, 'integer', 'lte', 4.5, False),
+    ('5', 'integer', 'equal', 5, True),
+    (5, 'integer', 'not_equal', '5.0', False),
+    ('a', 'string', 'not_equal', 'a', False),
+    ('a', 'string', 'equal', 'a', True),
+    (True, 'bool', 'equal', True, True),
+    (False, 'bool', 'not_equal', True, True),
+    (None, 'string', 'equal', 'a', False),
+    (None, 'string', None, None, True),
+    ('a', 'string', 'equal', None, True),
+    ('text', 'integer', 'equal', 5, False),
+    (5, 'integer', 'equal', 'text', False),
+    (5, 'integer', 'unknown', 5, False),
+]
+
+
+@pytest.mark.parametrize('content, data_type, condition, trigger, expected', CONDITION_CASES)
+def test_check_condition(content, data_type, condition, trigger, expected):
+    assert check_condition(content, data_type, condition, trigger) is expected, 'incorrect condition result'
+
+
+@pytest.mark.parametrize('content, data_type, condition, trigger, expected', CONDITION_CASES)
+def test_compiled_condition(content, data_type, condition, trigger, expected):
+    predicate = compile_condition(condition, trigger, data_type)
+    if predicate is None:
+        assert expected is True, 'the condition without dependency must be satisfied'
+        return
+
+    typed_content = coerce_value(content, data_type)
+    result = typed_content is not None and predicate(typed_content)
+    assert result is expected, 'incorrect compiled condition result'
@@ -0,0 +1,67 @@
+from shared.form_delta import FormSnapshots, hash_active_set, build_delta
+
+
+KNOWN_ACTIVE = {
+    '1': {'content': 5.0, 'name': 'root'},
+    '2': {'content': 'a', 'name': 'child'},
+    '3': {'content': None, 'name': 'second child'},
+}
+
+NEW_ACTIVE = {
+    '1': {'content': 7.0, 'name': 'root'},
+    '2': {'content': 'b', 'name': 'child'},
+    '4': {'content': True, 'name': 'new child'},
+}
+
+
+def test_delta():
+    snapshots = FormSnapshots(10 ** 6)
+    active_hash = hash_active_set(1, KNOWN_ACTIVE)
+    snapshots.put(1, active_hash, 1, KNOWN_ACTIVE)
+
+    known_hashes = snapshots.get(1, active_hash, 1)
+    delta = build_delta(known_hashes, NEW_ACTIVE, {'1': 7})
+    assert delta['activated'] == {'4': NEW_ACTIVE['4']}, 'incorrect activated nodes'
+    assert delta['deactivated'] == ['3'], 'incorrect deactivated nodes'
+    assert delta['changed'] == {'2': 'b'}, 'sent or unchanged contents are returned as changed'
+
+
+def test_snapshot_of_another_version():
+    snapshots = FormSnapshots(10 ** 6)
+    active_hash = hash_active_set(1, KNOWN_ACTIVE)
+    snapshots.put(1, active_hash, 1, KNOWN_ACTIVE)
+    assert snapshots.get(1, active_hash, 2) is None, 'the snapshot of the outdated version is returned'
+    assert hash_active_set(2, KNOWN_ACTIVE) != active_hash, 'the hash does not depend on the version'
+
+
+def test_snapshots_are_bounded_by_bytes():
+    snapshots = FormSnapshots(10 ** 6)
+    snapshots.put(1, '0', 0, KNOWN_ACTIVE)
+    entry_size = snapshots.size
+    assert entry_size > 0, 'the snapshot size is not counted'
+
+    snapshots = FormSnapshots(entry_size * 2)
+    for version in range(3):
+        snapshots.put(1, str(version), version, KNOWN_ACTIVE)
+    assert snapshots.get(1, '0', 0) is None, 'the oldest snapshot is not evicted'
+    assert snapshots.get(1, '2', 2) is not None, 'the newest snapshot is evicted'
+    assert snapshots.size == entry_size * 2, 'the size of evicted snapshots is not subtracted'
+
+    snapshots = FormSnapshots(entry_size - 1)
+    snapshots.put(1, '0', 0, KNOWN_ACTIVE)
+    assert snapshots.get(1, '0', 0) is None and snapshots.size == 0, 'the snapshot over the limit is stored'
+
+
+def test_snapshots_store_hashes():
+    snapshots = FormSnapshots(10 ** 6)
+    snapshots.put(1, '0', 0, KNOWN_ACTIVE)
+    hashes = snapshots.get(1, '0', 0)
+    assert set(hashes) == set(KNOWN_ACTIVE), 'the snapshot does not contain the active ids'
+    assert all(isinstance(content_hash, int) for content_hash in hashes.values()), 'contents are stored'
+
+
+def test_delta_of_known_ids():
+    delta = build_delta(dict.fromkeys(KNOWN_ACTIVE), NEW_ACTIVE, {'1': 7})
+    assert delta['activated'] == {'4': NEW_ACTIVE['4']}, 'incorrect activated nodes'
+    assert delta['deactivated'] == ['3'], 'incorrect deactivated nodes'
+    assert delta['changed'] == {'2': 'b'}, 'contents unknown to the server are not returned'
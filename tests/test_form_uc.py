@@ -0,0 +1,84 @@
+import asyncio
+import random
+from copy import deepcopy
+
+import pytest
+from fixtures.graph.random_example import make_random_graph, random_content
+from graph_processing.activation import ActivationTree
+from graph_processing.graph_cache import CachedGraph
+from graph_processing.graph_executor import GraphExecutor
+from usecases import form_uc
+from usecases.form_uc import unload_active
+
+
+@pytest.fixture
+def project_graph() -> CachedGraph:
+    return CachedGraph(1, make_random_graph(300, seed=12), {})
+
+
+def test_active_nodes_with_contents(project_graph):
+    rnd = random.Random(12)
+    nodes = project_graph.nodes
+    cached_nodes = deepcopy(nodes)
+    for _ in range(10):
+        changed_ids = rnd.sample(list(nodes), 10)
+        contents = {node_id: random_content(rnd, nodes[node_id]['data_type']) for node_id in changed_ids}
+        active_nodes, errors = asyncio.run(unload_active(project_graph, contents))
+
+        reference = ActivationTree.from_nodes({
+            node_id: {**fields, 'content': contents.get(node_id, fields.get('content'))}
+            for node_id, fields in nodes.items()
+        })
+        assert errors == [], 'valid contents are rejected'
+        assert set(active_nodes) == reference.active_ids, 'active nodes differ from the full calculation'
+        for node_id, content in contents.items():
+            if node_id in active_nodes:
+                assert active_nodes[node_id]['content'] == content, 'the sent content is not applied'
+    assert nodes == cached_nodes, 'nodes of the cached version are changed'
+
+
+def test_memo_is_shared_by_requests(project_graph):
+    node_id = next(iter(project_graph.nodes))
+    content = random_content(random.Random(1), project_graph.nodes[node_id]['data_type'])
+    asyncio.run(unload_active(project_graph, {node_id: content}))
+    misses = project_graph.activation.memo_stats['misses']
+    asyncio.run(unload_active(project_graph, {node_id: content}))
+    assert project_graph.activation.memo_stats['misses'] == misses, 'the repeated scenario is recalculated'
+
+
+def test_invalid_contents(project_graph):
+    integer_id = next(node_id for node_id, fields in project_graph.nodes.items() if fields['data_type'] == 'integer')
+    active_nodes, errors = asyncio.run(unload_active(project_graph, {'missing': 1, integer_id: 'not a number'}))
+    assert active_nodes is None, 'active nodes are calculated with invalid contents'
+    assert [error.location for error in errors] == ['missing', integer_id], 'invalid contents are not reported'
+
+
+@pytest.mark.parametrize('data_type, valid, invalid', [
+    ('integer', [0, -3, 2.5], ['1', True, float('nan'), float('inf'), [1]]),
+    ('string', ['', 'a'], [1, False, {'a': 1}]),
+    ('bool', [True, False], [0, 1, 'true']),
+])
+def test_content_data_types(project_graph, data_type, valid, invalid):
+    node_id = next(node_id for node_id, fields in project_graph.nodes.items() if fields['data_type'] == data_type)
+    for content in [*valid, None]:
+        _, errors = asyncio.run(unload_active(project_graph, {node_id: content}))
+        assert errors == [], f'the content {content!r} of the data type "{data_type}" is rejected'
+    for content in invalid:
+        _, errors = asyncio.run(unload_active(project_graph, {node_id: content}))
+        assert len(errors) == 1, f'the content {content!r} of the data type "{data_type}" is accepted'
+
+
+def test_offloaded_calculation(project_graph, monkeypatch):
+    rnd = random.Random(3)
+    contents = {node_id: random_content(rnd, project_graph.nodes[node_id]['data_type'])
+                for node_id in rnd.sample(list(project_graph.nodes), 10)}
+    inline_nodes, _ = asyncio.run(unload_active(project_graph, contents))
+
+    executor = GraphExecutor('thread', threshold=0, workers=1)
+    monkeypatch.setattr(form_uc, 'graph_executor', executor)
+    try:
+        offloaded_nodes, _ = asyncio.run(unload_active(project_graph, contents))
+    finally:
+        executor.shutdown()
+    assert executor.stats['offloaded'] == 1, 'the graph above the threshold is calculated inline'
+    assert offloaded_nodes == inline_nodes, 'the offloaded calculation gives other active nodes'
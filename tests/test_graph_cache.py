@@ -0,0 +1,201 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+from fixtures.graph.random_example import make_random_graph, random_content
+from graph_processing import graph_cache as graph_cache_module
+from graph_processing.activation import ActivationTree
+from graph_processing.graph_cache import CachedGraph, GraphCache, cache_next_version, take_order
+from graph_processing.graph_encoder import GraphEncoder
+from graph_processing.graph_schemas import build_children_index
+from graph_processing.topology import TopologicalOrder
+from models.models import Project
+
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def entry() -> CachedGraph:
+    nodes = make_random_graph(100, seed=4)
+    for node_id, fields in nodes.items():
+        fields['id'] = node_id
+    return CachedGraph(1, nodes, {node_id: CREATED_AT for node_id in nodes})
+
+
+@pytest.fixture
+def cache(monkeypatch) -> GraphCache:
+    cache = GraphCache(8)
+    monkeypatch.setattr(graph_cache_module, 'graph_cache', cache)
+    return cache
+
+
+def find_leaf(nodes: dict) -> str:
+    parents = {fields['parent_id'] for fields in nodes.values()}
+    return next(node_id for node_id in nodes if node_id not in parents)
+
+
+def test_sparse_merge(entry):
+    node_id, other_id = list(entry.nodes)[:2]
+    change_list = {
+        node_id: {'name': 'renamed'},
+        other_id: {'active': True, 'json': {'content': 42, 'condition': None}},
+    }
+    updated = entry.updated(2, change_list)
+
+    assert updated.version == 2, 'the version is not set'
+    assert updated.nodes[node_id] == {**entry.nodes[node_id], 'name': 'renamed'}, \
+        'permanent fields are not merged into the node'
+    permanent_fields, _ = GraphEncoder.split_fields(entry.nodes[other_id])
+    assert updated.nodes[other_id] == {**permanent_fields, 'active': True, 'content': 42, 'condition': None}, \
+        'the json blob does not replace non-permanent fields'
+    assert entry.nodes[node_id]['name'] != 'renamed', 'the previous version is changed'
+
+
+def test_added_node(entry):
+    parent_id = next(iter(entry.nodes))
+    fields = {**entry.nodes[parent_id], 'id': 'new', 'parent_id': parent_id}
+    permanent_fields, non_permanent_fields = GraphEncoder.split_fields(fields)
+    created_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    change_list = {'new': {'json': non_permanent_fields, 'project_id': 1, **permanent_fields}}
+    updated = entry.updated(2, change_list, created_at={'new': created_at})
+
+    assert updated.nodes['new'] == {**permanent_fields, **non_permanent_fields}, 'the added node is not stored'
+    assert 'project_id' not in updated.nodes['new'], 'project_id is stored in the node'
+    assert updated.created_at['new'] == created_at, 'the creation date is not stored'
+    assert updated.order.depths['new'] == entry.order.depths[parent_id] + 1, 'the order is not updated'
+    assert 'new' not in entry.order, 'the order of the previous version is changed'
+
+
+def test_removal(entry):
+    leaf_id = find_leaf(entry.nodes)
+    updated = entry.updated(2, {}, [leaf_id])
+
+    assert leaf_id not in updated.nodes, 'the removed node is kept'
+    assert leaf_id not in updated.created_at, 'the creation date of the removed node is kept'
+    assert leaf_id not in updated.order, 'the removed node is kept in the order'
+    assert leaf_id in entry.nodes, 'the previous version is changed'
+    assert len(updated.nodes) == len(entry.nodes) - 1, 'other nodes are removed'
+
+
+def test_passed_order_is_used(entry):
+    leaf_id = find_leaf(entry.nodes)
+    order = TopologicalOrder.from_nodes(entry.nodes)
+    order.apply_changes({}, [leaf_id])
+    updated = entry.updated(2, {}, [leaf_id], order=order)
+    assert updated.order is order, 'the order with applied changes is not used'
+
+
+def test_next_version_is_cached(entry, cache):
+    project = Project(id=1, nodes_version=1)
+    node_id = next(iter(entry.nodes))
+    cache.put(project.id, entry)
+    cache_next_version(project, 2, entry, {node_id: {'name': 'renamed'}})
+
+    cached = cache.get(project.id, 2)
+    assert cached is not None, 'the next version is not cached'
+    assert cached.nodes[node_id]['name'] == 'renamed', 'the cached version does not contain the changes'
+
+
+def test_skipped_version_invalidates(entry, cache):
+    project = Project(id=1, nodes_version=1)
+    node_id = next(iter(entry.nodes))
+    cache.put(project.id, entry)
+    cache_next_version(project, 3, entry, {node_id: {'name': 'renamed'}})
+
+    assert cache.get(project.id, 3) is None, 'the entry built from an outdated version is cached'
+    assert cache.get(project.id, 1) is None, 'the outdated entry is kept'
+    assert cache.stats['size'] == 0, 'the cache is not invalidated'
+
+
+def test_order_is_taken_without_copy(entry, cache):
+    project = Project(id=1, nodes_version=1)
+    cache.put(project.id, entry)
+    leaf_id = find_leaf(entry.nodes)
+    order, depths = take_order(project, entry, {}, [leaf_id])
+
+    assert depths is not None and order is entry.order, 'the order is copied'
+    assert cache.get(project.id, 1) is None, 'the entry with the order changed in place stays in the cache'
+
+    second_order, _ = take_order(project, entry, {})
+    assert second_order is not order and leaf_id in second_order, 'the changed order is taken by another write'
+    assert second_order.depths == TopologicalOrder.from_nodes(entry.nodes).depths, 'the order is not rebuilt'
+
+
+def test_rejected_changes_keep_order(entry, cache):
+    project = Project(id=1, nodes_version=1)
+    cache.put(project.id, entry)
+    depths_before = dict(entry.order.depths)
+    node_id, fields = next((node_id, fields) for node_id, fields in entry.nodes.items() if fields['parent_id'])
+    change_list = {'new': {'parent_id': node_id}, fields['parent_id']: {'parent_id': node_id}}
+    order, depths = take_order(project, entry, change_list)
+
+    assert depths is None and order.get_errors, 'the cycle is not rejected'
+    assert cache.get(project.id, 1) is entry and not entry.order_taken, 'the rejected write drops the cached entry'
+    assert entry.order.depths == depths_before and 'new' not in entry.order, 'the rejected write changes the order'
+
+
+def assert_same_children(children: dict, nodes: dict) -> None:
+    expected = build_children_index(nodes)
+    assert {parent_id: sorted(ids) for parent_id, ids in children.items()} == \
+           {parent_id: sorted(ids) for parent_id, ids in expected.items()}, \
+        'the incremental children index differs from the full build'
+
+
+def test_children_index_after_unlinking_last_child(entry):
+    leaf_id = find_leaf(entry.nodes)
+    parent_id = entry.nodes[leaf_id]['parent_id']
+    siblings = {node_id: {**fields, 'parent_id': None} for node_id, fields in entry.nodes.items()
+                  if fields['parent_id'] == parent_id and node_id != leaf_id}
+    change_list = {**siblings, 'new': {'json': {}, 'project_id': 1, 'parent_id': parent_id, 'name': 'new'}}
+    updated = entry.updated(2, change_list, [leaf_id])
+    assert_same_children(updated.children, updated.nodes)
+
+
+def test_children_index_is_updated(entry):
+    node_ids = list(entry.nodes)
+    children_before = {parent_id: list(ids) for parent_id, ids in entry.children.items()}
+    leaf_id = find_leaf(entry.nodes)
+    moved_id = next(node_id for node_id in node_ids if entry.nodes[node_id]['parent_id'] is not None
+                    and node_id != leaf_id)
+    change_list = {
+        moved_id: {'parent_id': None},
+        'new': {'json': {}, 'project_id': 1, 'parent_id': node_ids[0], 'name': 'new'},
+    }
+    updated = entry.updated(2, change_list, [leaf_id])
+
+    assert_same_children(updated.children, updated.nodes)
+    assert entry.children == children_before, 'the children index of the previous version is changed'
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_vectorized_activation(entry, monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip('numpy')
+    monkeypatch.setattr(graph_cache_module, 'GRAPH_VECTORIZED', vectorized)
+    reference = ActivationTree.from_nodes(entry.nodes)
+    evaluator = entry.activation
+    assert isinstance(evaluator, ActivationTree) != vectorized, 'the evaluator does not follow GRAPH_VECTORIZED'
+    assert evaluator.evaluate({}) == reference.active_ids, 'the evaluator of the entry gives other active nodes'
+
+
+def test_activation_is_handed_over_on_content_changes(entry):
+    rnd = random.Random(5)
+    parent_ids = [fields['parent_id'] for fields in entry.nodes.values() if fields['parent_id'] is not None]
+    changed_nodes = {}
+    for node_id in rnd.sample(parent_ids, 10):
+        content = random_content(rnd, entry.nodes[node_id]['data_type'])
+        if entry.nodes[node_id]['content'] is not None and content is not None:
+            changed_nodes[node_id] = {**entry.nodes[node_id], 'content': content}
+    change_list = GraphEncoder().serialize_to_dict(changed_nodes, 1, entry.nodes)
+    tree = entry.activation
+    active_before = tree.evaluate({})
+    updated = entry.updated(2, change_list)
+
+    assert updated.activation is tree, 'the activation tree is built again for content changes'
+    assert tree.evaluate({}) == ActivationTree.from_nodes(updated.nodes).active_ids, \
+        'the handed over tree is not recalculated'
+    assert entry.activation is not tree and entry.activation.evaluate({}) == active_before, \
+        'the previous version uses the changed tree'
+
+    leaf_id = find_leaf(updated.nodes)
+    assert updated.updated(3, {}, [leaf_id]).activation is not tree, 'the tree is handed over on structural changes'
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from graph_processing.graph_encoder import GraphEncoder
+from models.models import Node
+
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_node_objects() -> list[Node]:
+    root_id, child_id = uuid4(), uuid4()
+    return [
+        Node(id=root_id, parent_id=None, name='root', description=None, data_type='integer', node_type='entry',
+             x=0, y=0, active=True, depth=0, json={'content': 5, 'condition': None}),
+        Node(id=child_id, parent_id=root_id, name='child', description='text', data_type='bool',
+             node_type='checkbox', x=10, y=20, active=False, depth=1, json={'condition': 'gt', 'trigger': 3}),
+        Node(id=uuid4(), parent_id=child_id, name='no json', description=None, data_type='string',
+             node_type='entry', x=None, y=None, active=False, depth=None, json=None),
+    ]
+
+
+def as_row(node_obj: Node) -> tuple:
+    """Row of the select in load_project_graph: permanent columns, json, created_at and depth"""
+    return (*(getattr(node_obj, column.key) for column in GraphEncoder.permanent_columns()), CREATED_AT,
+            node_obj.depth)
+
+
+def test_rows_match_objects():
+    node_objects = make_node_objects()
+    from_objects = GraphEncoder().deserialize_nodes(node_objects)
+    from_rows = GraphEncoder().deserialize_rows([as_row(node_obj) for node_obj in node_objects])
+
+    assert from_rows == from_objects, 'rows and ORM objects are deserialized differently'
+    root_id, child_id, leaf_id = (str(node_obj.id) for node_obj in node_objects)
+    assert from_rows[root_id]['parent_id'] is None, 'the empty parent_id is changed'
+    assert from_rows[child_id]['parent_id'] == root_id, 'parent_id is not converted to a string'
+    assert from_rows[leaf_id]['name'] == 'no json', 'the node without json is not deserialized'
+    assert all('depth' not in fields and 'created_at' not in fields for fields in from_rows.values()), \
+        'extra columns after json are deserialized'
+
+
+def test_bulk_update_groups_by_field_set():
+    change_list = {
+        'a': {'name': 'renamed', 'project_id': 1},
+        'b': {'name': 'renamed too'},
+        'c': {'active': True, 'json': {'content': 1}},
+        'd': {'id': 'd', 'name': 'moved', 'parent_id': 'a'},
+        'e': {'project_id': 1},
+    }
+    groups = GraphEncoder.bulk_update_params(change_list, {'d': 2})
+
+    assert set(groups) == {('name',), ('active', 'json'), ('depth', 'name', 'parent_id')}, \
+        'nodes are not grouped by the set of written fields'
+    assert groups[('name',)] == [{'node_id': 'a', 'name': 'renamed'}, {'node_id': 'b', 'name': 'renamed too'}], \
+        'id or project_id are written'
+    assert groups[('depth', 'name', 'parent_id')] == [{'node_id': 'd', 'name': 'moved', 'parent_id': 'a', 'depth': 2}], \
+        'the depth of a changed node is not written with its fields'
+
+
+def test_bulk_update_of_depths_only():
+    groups = GraphEncoder.bulk_update_params({}, {'a': 1, 'b': 3})
+    assert groups == {('depth',): [{'node_id': 'a', 'depth': 1}, {'node_id': 'b', 'depth': 3}]}, \
+        'depths of unchanged nodes are not written in one group'
+
+    groups = GraphEncoder.bulk_update_params({'a': {'name': 'renamed'}}, {'a': 1, 'b': 3})
+    assert groups[('depth',)] == [{'node_id': 'b', 'depth': 3}], 'the depth of a changed node is written twice'
+    assert GraphEncoder.bulk_update_params({}) == {}, 'parameters are built without changes'
+
+
+def test_unchanged_nodes_are_skipped():
+    nodes = GraphEncoder().deserialize_nodes(make_node_objects())
+    loaded = {node_id: dict(fields) for node_id, fields in nodes.items()}
+    assert GraphEncoder().serialize_to_dict(nodes, 1, loaded) == {}, 'unchanged nodes are emitted'
+
+
+def test_active_flip_is_sparse():
+    nodes = GraphEncoder().deserialize_nodes(make_node_objects())
+    loaded = {node_id: dict(fields) for node_id, fields in nodes.items()}
+    node_id = next(iter(nodes))
+    nodes[node_id]['active'] = not nodes[node_id]['active']
+
+    changes = GraphEncoder().serialize_to_dict(nodes, 1, loaded)
+    assert changes == {node_id: {'active': nodes[node_id]['active']}}, 'not only the active flag is emitted'
+
+
+def test_json_change_emits_whole_blob():
+    nodes = GraphEncoder().deserialize_nodes(make_node_objects())
+    loaded = {node_id: dict(fields) for node_id, fields in nodes.items()}
+    node_id = next(iter(nodes))
+    nodes[node_id]['content'] = 7
+
+    changes = GraphEncoder().serialize_to_dict(nodes, 1, loaded)
+    assert changes == {node_id: {'json': {'content': 7}}}, 'the json blob is not emitted as a whole'
+
+
+def test_new_nodes_are_emitted_in_full():
+    nodes = GraphEncoder().deserialize_nodes(make_node_objects())
+    node_id = next(iter(nodes))
+    changes = GraphEncoder().serialize_to_dict(nodes, 1, {})
+    assert set(changes) == set(nodes), 'nodes missing from the loaded container are skipped'
+    assert changes[node_id]['project_id'] == 1 and changes[node_id]['json'] == {'content': 5}, \
+        'the new node is not emitted in full'
@@ -0,0 +1,43 @@
+import asyncio
+
+from fixtures.graph.random_example import make_random_graph
+from graph_processing.activation import ActivationTree
+from graph_processing.graph_executor import GraphExecutor
+
+
+def echo_nodes(nodes: dict) -> dict:
+    return nodes
+
+
+def active_nodes(nodes: dict) -> dict:
+    return ActivationTree.from_nodes(nodes).active_nodes
+
+
+def run_modes(task, nodes: dict) -> list:
+    results = []
+    for mode in ('inline', 'process'):
+        executor = GraphExecutor(mode, threshold=0, workers=1)
+        try:
+            results.append(asyncio.run(executor.run(task, nodes)))
+        finally:
+            executor.shutdown()
+    return results
+
+
+def test_process_payload_is_exact():
+    nodes = make_random_graph(200, seed=7)
+    node_ids = list(nodes)
+    for node_id in node_ids[:5]:
+        nodes[node_id]['id'] = node_id
+    nodes[node_ids[10]]['parent_id'] = 'dangling'
+    del nodes[node_ids[11]]['active']
+    del nodes[node_ids[12]]['parent_id']
+    nodes[node_ids[13]]['unknown_field'] = [1, 2]
+
+    inline, process = run_modes(echo_nodes, nodes)
+    assert process == inline == nodes, 'the process payload does not restore the graph container'
+
+
+def test_modes_give_same_result():
+    inline, process = run_modes(active_nodes, make_random_graph(300, seed=8))
+    assert inline == process, 'inline and process modes calculate different results'
@@ -0,0 +1,56 @@
+from uuid import uuid4
+
+import pytest
+from fixtures.graph.random_example import make_node, make_random_graph
+from graph_processing.graph_schemas import GrafChangesDTO, build_children_index
+from graph_processing.overlay import NodesOverlay
+
+
+@pytest.fixture
+def nodes() -> dict:
+    return make_random_graph(300, seed=9)
+
+
+def validate(nodes: dict, candidate: NodesOverlay) -> list[str]:
+    return [error.message for error in GrafChangesDTO(candidate, build_children_index(nodes)).errors]
+
+
+def test_valid_changes(nodes):
+    candidate = NodesOverlay(nodes)
+    parent_id = next(node_id for node_id, fields in nodes.items() if fields['data_type'] == 'integer')
+    candidate.add_node(str(uuid4()), make_node(parent_id, 'string', 'gte', 5))
+    candidate.change_node(parent_id, {'name': 'renamed'})
+    assert validate(nodes, candidate) == [], 'valid changes are rejected'
+
+
+def test_missing_parent(nodes):
+    candidate = NodesOverlay(nodes)
+    candidate.add_node(str(uuid4()), make_node(str(uuid4()), 'string'))
+    assert len(validate(nodes, candidate)) == 1, 'the missing parent is not found'
+
+
+def test_removed_parent(nodes):
+    candidate = NodesOverlay(nodes)
+    parent_id = next(iter(build_children_index(nodes)[None]))
+    candidate.remove_node(parent_id)
+    assert validate(nodes, candidate), 'orphaned children of the removed node are not found'
+
+
+def test_incompatible_condition(nodes):
+    candidate = NodesOverlay(nodes)
+    children = build_children_index(nodes)
+    parent_id = next(
+        node_id for node_id, fields in nodes.items()
+        if fields['data_type'] == 'integer' and any(nodes[child]['condition'] == 'gt' for child in children.get(node_id, []))
+    )
+    candidate.change_node(parent_id, {'data_type': 'bool', 'node_type': 'checkbox'})
+    assert validate(nodes, candidate), 'the "gt" child of the bool parent is not found'
+
+
+def test_cycle(nodes):
+    candidate = NodesOverlay(nodes)
+    children = build_children_index(nodes)
+    parent_id = next(node_id for node_id in children[None] if children.get(node_id))
+    child_id = children[parent_id][0]
+    candidate.change_node(parent_id, {'parent_id': child_id, 'condition': None, 'trigger': None})
+    assert 'The parent link creates a cycle' in validate(nodes, candidate), 'the cycle is not found'
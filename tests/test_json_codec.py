@@ -0,0 +1,34 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from shared import json_codec
+
+
+PAYLOAD = {
+    'id': uuid4(),
+    'created_at': datetime(2023, 9, 30, 9, 49, 12, 417203, tzinfo=timezone.utc),
+    'nodes': {'1': {'content': 5.5, 'active': True, 'options': ['красный', 'зелёный']}},
+    'empty': None,
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def codec(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(json_codec, 'orjson', None)
+    return json_codec
+
+
+def test_codec_round_trip(codec):
+    decoded = codec.loads(codec.dumps_bytes(PAYLOAD))
+    assert decoded == {
+        'id': str(PAYLOAD['id']),
+        'created_at': PAYLOAD['created_at'].isoformat(),
+        'nodes': PAYLOAD['nodes'],
+        'empty': None,
+    }, 'the codec changes the payload'
+    assert json.loads(codec.dumps(PAYLOAD)) == decoded, 'the output is not standard JSON'
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from auth import key_tools
+from auth.key_tools import HashingPool, build_password_context
+
+
+@pytest.fixture
+def context(monkeypatch):
+    context = build_password_context('pbkdf2_sha256', 1000)
+    monkeypatch.setattr(key_tools, 'password_context', context)
+    monkeypatch.setattr(key_tools, 'HASH_SALT', 'salt')
+    return context
+
+
+def test_context_schemes():
+    assert build_password_context('md5_crypt').schemes() == ('md5_crypt',), 'the scheme is listed twice'
+    context = build_password_context('bcrypt')
+    assert context.schemes() == ('bcrypt', 'md5_crypt'), 'the legacy scheme is not verified'
+    assert context.to_dict().get('bcrypt__rounds') is None, 'rounds are set without configuration'
+    assert build_password_context('sha256_crypt', 5000).to_dict()['sha256_crypt__rounds'] == 5000, \
+        'configured rounds are not set for the scheme'
+
+
+def test_legacy_hash_is_rehashed(context):
+    legacy_hash = context.handler('md5_crypt').hash('password' + 'salt')
+    verified, new_hash = key_tools.verify_and_update('password', legacy_hash)
+    assert verified, 'the legacy hash is not verified'
+    assert new_hash is not None and context.identify(new_hash) == 'pbkdf2_sha256', 'the legacy hash is not replaced'
+    assert key_tools.check_password('password', new_hash), 'the new hash does not verify the password'
+
+
+def test_weaker_rounds_are_rehashed(context):
+    weak_hash = build_password_context('pbkdf2_sha256', 500).hash('password' + 'salt')
+    assert key_tools.verify_and_update('password', weak_hash)[1] is not None, 'the hash with fewer rounds is kept'
+
+    current_hash = key_tools.get_hash('password')
+    assert key_tools.verify_and_update('password', current_hash) == (True, None), 'the current hash is replaced'
+    assert key_tools.verify_and_update('wrong', current_hash) == (False, None), 'a wrong password is verified'
+
+
+def test_hashing_pool(context, monkeypatch):
+    pool = HashingPool(2)
+    monkeypatch.setattr(key_tools, 'hashing_pool', pool)
+
+    async def run():
+        pwd_hash = await key_tools.hash_password('password')
+        results = await asyncio.gather(*(key_tools.verify_password(pwd, pwd_hash) for pwd in ('password', 'wrong')))
+        return pwd_hash, results
+
+    try:
+        pwd_hash, results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert context.identify(pwd_hash) == 'pbkdf2_sha256', 'the pool does not hash with the main scheme'
+    assert results == [(True, None), (False, None)], 'the pool does not return results in the order of calls'
+    stats = pool.stats
+    assert stats['calls'] == 3, 'pool calls are not counted'
+    assert stats['time_max_ms'] >= stats['time_avg_ms'] > 0, 'hashing time is not measured'
@@ -0,0 +1,82 @@
+from copy import deepcopy
+from uuid import uuid4
+
+import pytest
+from graph_processing.node_store import NodeStore, ROOT
+
+
+@pytest.fixture
+def nodes() -> dict:
+    root_id, child_id = str(uuid4()), str(uuid4())
+    return {
+        root_id: {
+            'id': root_id,
+            'parent_id': None,
+            'name': 'root',
+            'description': None,
+            'data_type': 'string',
+            'node_type': 'select',
+            'options': ['a', 'b'],
+            'content': 'a',
+            'condition': None,
+            'trigger': None,
+            'x': 100,
+            'y': 100,
+            'active': True,
+            'view_type': 'radiobutton',
+        },
+        child_id: {
+            'parent_id': root_id,
+            'name': 'child',
+            'data_type': 'integer',
+            'node_type': 'entry',
+            'condition': 'equal',
+            'trigger': 'a',
+            'active': False,
+            'unknown_field': 5,
+        },
+    }
+
+
+def test_round_trip(nodes):
+    store = NodeStore.from_nodes(deepcopy(nodes))
+    assert store.to_nodes() == nodes, 'the storage does not restore the graph container'
+
+
+def test_copy_is_independent(nodes):
+    store = NodeStore.from_nodes(nodes)
+    store_copy = store.copy()
+    child = store.index[list(nodes.keys())[1]]
+    store_copy.set(child, 'content', 7)
+    store_copy.set(child, 'unknown_field', 6)
+    store_copy.remove(0)
+
+    assert store.to_nodes() == nodes, 'changes of the copy affect the original storage'
+    assert len(store_copy) == 1, 'the node was not removed from the copy'
+    assert store_copy.get(child, 'parent_id') is None, 'the child of the removed node refers to it'
+
+
+def test_add_node(nodes):
+    store = NodeStore.from_nodes(nodes)
+    root_id = list(nodes.keys())[0]
+    new_id = str(uuid4())
+    ordinal = store.add(new_id, {'parent_id': root_id, 'name': 'new', 'data_type': 'bool', 'node_type': 'checkbox'})
+
+    assert store.index[new_id] == ordinal, 'the new node is not indexed'
+    assert store.to_nodes()[new_id]['parent_id'] == root_id, 'the parent of the new node is lost'
+    assert ordinal in store.children()[store.index[root_id]], 'the new node is not in the children index'
+
+
+def test_round_trip_is_exact(nodes):
+    root_id, child_id = nodes
+    nodes[child_id]['parent_id'] = 'dangling'
+    del nodes[root_id]['active']
+    del nodes[root_id]['parent_id']
+    store = NodeStore.from_nodes(deepcopy(nodes))
+
+    assert store.to_nodes() == nodes, 'dangling parents or absent fields are not restored'
+    assert store.children()[ROOT] == [0, 1], 'the node with a dangling parent is not a root'
+
+    ordinal = store.add('dangling', {'parent_id': None, 'name': 'late parent'})
+    assert store.children()[ordinal] == [store.index[child_id]], 'the dangling parent is not linked when added'
+    assert store.to_nodes()[child_id]['parent_id'] == 'dangling', 'the parent id is changed'
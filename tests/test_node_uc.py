@@ -0,0 +1,31 @@
+from uuid import uuid4
+
+import pytest
+from fixtures.graph.random_example import make_node, make_random_graph
+from graph_processing.graph_cache import CachedGraph
+from usecases.node_uc import check_changes
+
+
+@pytest.fixture
+def project_graph() -> CachedGraph:
+    nodes = make_random_graph(200, seed=11)
+    return CachedGraph(1, nodes, {})
+
+
+def test_valid_changes_pass(project_graph):
+    parent_id = next(node_id for node_id, fields in project_graph.nodes.items() if fields['data_type'] == 'integer')
+    assert check_changes(project_graph, {str(uuid4()): make_node(parent_id, 'string', 'gt', 3)}, added=True) == [], \
+        'a valid added node is rejected'
+    assert check_changes(project_graph, {parent_id: {'name': 'renamed'}}, added=False) == [], \
+        'a valid change is rejected'
+
+
+def test_invalid_changes_are_rejected(project_graph):
+    errors = check_changes(project_graph, {str(uuid4()): make_node(str(uuid4()), 'string')}, added=True)
+    assert len(errors) == 1 and 'does not exist' in errors[0].message, 'the missing parent is not found'
+
+    node_id = next(iter(project_graph.nodes))
+    assert check_changes(project_graph, {node_id: 'fields'}, added=False), 'fields that are not a dict are accepted'
+    assert check_changes(project_graph, {str(uuid4()): {'name': 'x'}}, added=False), 'a missing node is changed'
+    assert check_changes(project_graph, {node_id: {'node_type': 'unknown'}}, added=False), \
+        'a wrong node type is accepted'
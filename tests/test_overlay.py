@@ -0,0 +1,65 @@
+from copy import deepcopy
+from types import MappingProxyType
+
+import pytest
+from graph_processing.overlay import NodesOverlay
+
+
+BASE_NODES = {
+    '1': {'parent_id': None, 'name': 'root', 'x': 0},
+    '2': {'parent_id': '1', 'name': 'child', 'x': 10},
+    '3': {'parent_id': '1', 'name': 'second child', 'x': 20},
+}
+
+
+@pytest.fixture
+def base() -> dict:
+    return deepcopy(BASE_NODES)
+
+
+@pytest.fixture
+def overlay(base) -> NodesOverlay:
+    candidate = NodesOverlay(base)
+    candidate.change_node('2', {'x': 15})
+    candidate.remove_node('3')
+    candidate.add_node('4', {'parent_id': '2', 'name': 'new'})
+    return candidate
+
+
+def test_overlay_does_not_touch_base(base, overlay):
+    assert base == BASE_NODES, 'the overlay changes the base container'
+    assert overlay['1'] is base['1'], 'unchanged nodes are copied'
+    assert overlay['2']['x'] == 15, 'the changed field is not visible through the overlay'
+    assert '3' not in overlay, 'the removed node is visible through the overlay'
+    assert set(overlay) == {'1', '2', '4'}, 'incorrect node set of the overlay'
+    assert len(overlay) == 3, 'incorrect length of the overlay'
+    assert overlay.touched == {'2', '3', '4'}, 'incorrect touched nodes'
+
+
+def test_overlay_merge(base, overlay):
+    expected = overlay.to_dict()
+    overlay.merge()
+    assert base == expected, 'the merged base differs from the candidate state'
+    assert not overlay.touched, 'the overlay is not cleared after merge'
+
+
+def test_overlay_discard(base, overlay):
+    overlay.discard()
+    assert overlay.to_dict() == BASE_NODES, 'the discarded overlay differs from the base container'
+
+
+def test_stacked_overlay(base, overlay):
+    top = NodesOverlay(overlay)
+    top.remove_node('4')
+    top.add_node('3', {'parent_id': '1', 'name': 'restored'})
+    top.merge()
+    overlay.merge()
+    assert set(base) == {'1', '2', '3'}, 'stacked overlays are merged incorrectly'
+    assert base['3']['name'] == 'restored', 'the re-added node is lost'
+
+
+def test_read_only_base():
+    overlay = NodesOverlay(MappingProxyType(BASE_NODES))
+    overlay.remove_node('1')
+    with pytest.raises(TypeError):
+        overlay.merge()
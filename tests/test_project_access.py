@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from models.models import Document, Template
+from shared.project_access import get_project_access
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class CountingSession:
+    """Counts statements executed by the function under test, every statement returns the same row"""
+
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, statement, *args):
+        self.statements.append(statement)
+        return FakeResult(self.row)
+
+
+@pytest.mark.parametrize('kwargs, row, expected', [
+    ({}, (1,), (1, None, False)),
+    ({'model': Document, 'target_id': 5}, (1, 'document'), (1, 'document', False)),
+    ({'model': Template, 'name': 'taken'}, (1, True), (1, None, True)),
+    ({'model': Document, 'target_id': 5, 'name': 'taken'}, (1, 'document', False), (1, 'document', False)),
+])
+def test_access_is_one_statement(kwargs, row, expected):
+    session = CountingSession(row)
+    access = asyncio.run(get_project_access(session, 2, 1, **kwargs))
+    assert len(session.statements) == 1, 'the access check takes more than one statement'
+    assert tuple(access) == expected, 'the row is not mapped to the access fields'
+
+
+def test_missing_project():
+    session = CountingSession(None)
+    assert asyncio.run(get_project_access(session, 2, 1, Document, 5, 'name')) is None, 'access to a missing project'
+    assert len(session.statements) == 1, 'the access check takes more than one statement'
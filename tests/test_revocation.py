@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from auth.revocation import RevocationSet
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def test_revoked_sessions():
+    revoked = RevocationSet(60, FakeClock())
+    session_id, other_id = uuid4(), uuid4()
+    revoked.add(session_id.hex)
+    assert session_id.hex in revoked and session_id in revoked, 'the revoked session is not found'
+    assert other_id.hex not in revoked, 'an active session is revoked'
+    assert 'not a session id' not in revoked, 'the invalid id is revoked'
+
+
+def test_ids_are_dropped_after_retention():
+    clock = FakeClock()
+    revoked = RevocationSet(60, clock)
+    session_id = uuid4()
+    revoked.add(session_id.hex)
+    loaded_id = uuid4()
+    revoked.load([(loaded_id, datetime.fromtimestamp(clock.time - 30, timezone.utc))])
+    assert len(revoked) == 2 and loaded_id in revoked, 'the loaded session is not merged'
+
+    clock.time += 40
+    revoked.load([])
+    assert session_id in revoked, 'the session is dropped before the retention'
+    assert loaded_id not in revoked, 'the session is kept after the retention'
+
+
+def test_freshness():
+    revoked = RevocationSet(60, FakeClock())
+    assert not revoked.is_fresh(10), 'the set that was never loaded is fresh'
+    revoked.load([])
+    assert revoked.is_fresh(10), 'the loaded set is not fresh'
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from auth.session_cache import SessionCache
+from shared.time_utils import now_utc
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def test_entry_is_trusted_for_ttl():
+    clock = FakeClock()
+    cache = SessionCache(10, 100, clock)
+    cache.put('a', 1, now_utc() + timedelta(hours=1))
+    clock.time = 9.9
+    assert cache.get('a') == 1, 'the fresh entry is not returned'
+    clock.time = 10
+    assert cache.get('a') is None, 'the stale entry is returned'
+
+
+def test_expired_session_is_not_returned():
+    cache = SessionCache(10, 100, FakeClock())
+    cache.put('a', 1, now_utc() - timedelta(seconds=1))
+    assert cache.get('a') is None, 'the expired session is returned'
+
+
+def test_invalidate():
+    cache = SessionCache(10, 100, FakeClock())
+    expired_at = now_utc() + timedelta(hours=1)
+    for session_id in 'abc':
+        cache.put(session_id, 1, expired_at)
+    cache.invalidate('a', 'b')
+    assert cache.get('a') is None and cache.get('b') is None, 'invalidated sessions are returned'
+    assert cache.get('c') == 1, 'another session is invalidated'
+
+
+def test_cache_is_bounded_and_can_be_disabled():
+    expired_at = now_utc() + timedelta(hours=1)
+    cache = SessionCache(10, 2, FakeClock())
+    for session_id in 'abc':
+        cache.put(session_id, 1, expired_at)
+    assert cache.get('a') is None, 'the oldest session is not evicted'
+
+    disabled = SessionCache(0, 2, FakeClock())
+    disabled.put('a', 1, expired_at)
+    assert disabled.get('a') is None, 'the cache with zero ttl stores sessions'
@@ -0,0 +1,96 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fixtures.database import AsyncSessionAdapter, create_database
+from fixtures.graph.random_example import make_random_graph
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+import config
+from graph_processing import graph_tasks
+from graph_processing.graph_cache import graph_cache
+from graph_processing.graph_encoder import GraphEncoder
+from models import models
+from models.models import User, Project, Template, Node
+from models.models_events import events_initialize
+from usecases.form_uc import GetFormUC, GetUpdatedFormUC
+from usecases.node_uc import CreateNodeUC, PutNodeUC, DeleteNodeUC
+
+
+@pytest.fixture
+def nodes() -> dict:
+    return make_random_graph(30, seed=13)
+
+
+@pytest.fixture
+def session(nodes):
+    graph_cache.clear()
+    engine = create_database()
+    with Session(engine, expire_on_commit=False) as sync_session:
+        sync_session.add(User(id=1, name='user', email='user@test.com'))
+        sync_session.add(Project(id=1, name='project', user_id=1, nodes_version=0))
+        sync_session.add(Template(id=1, name='template', project_id=1))
+        sync_session.add_all(GraphEncoder().serialize_nodes(nodes, 1))
+        sync_session.commit()
+        yield sync_session
+    graph_cache.clear()
+    engine.dispose()
+
+
+def run(use_case, input_data: dict, session: Session):
+    response = asyncio.run(use_case(input_data, AsyncSessionAdapter(session)).exec())
+    assert response, f'{use_case.__name__} failed: {response.errors}'
+    return response.data
+
+
+def test_strict_loading_raises(session):
+    assert config.STRICT_LOADING, 'the tests run without strict loading'
+    session.expunge_all()
+    project = session.execute(select(Project).options(*GetFormUC.Loading.options)).scalar()
+    with pytest.raises(InvalidRequestError):
+        project.nodes
+    with pytest.raises(InvalidRequestError):
+        project.user_id
+
+
+def test_form_use_cases(session, nodes):
+    form = run(GetFormUC, {'user_id': 1, 'project_id': 1}, session)
+    assert [template['template_id'] for template in form['templates']] == [1], 'templates are not loaded'
+    assert form['active_nodes'], 'active nodes are not calculated'
+
+    node_id = next(iter(form['active_nodes']))
+    updated_form = run(GetUpdatedFormUC, {'user_id': 1, 'project_id': 1, 'contents': {node_id: None},
+                                          'active_hash': form['active_hash']}, session)
+    assert updated_form['delta'], 'the snapshot of the form is not found'
+
+
+def test_node_use_cases(session, nodes, monkeypatch):
+    monkeypatch.setattr(graph_tasks, 'add_nodes', lambda graph_nodes, new_nodes: (new_nodes, []))
+    monkeypatch.setattr(graph_tasks, 'change_nodes', lambda graph_nodes, changes: (
+        {node_id: {**graph_nodes[node_id], **fields} for node_id, fields in changes.items()}, []
+    ))
+    monkeypatch.setattr(graph_tasks, 'remove_nodes', lambda graph_nodes, delete_list: ((delete_list, {}), []))
+
+    root_id = next(node_id for node_id, fields in nodes.items() if fields['parent_id'] is None)
+    new_id = str(uuid4())
+    new_node = {**nodes[root_id], 'parent_id': root_id, 'condition': None, 'trigger': None}
+    run(CreateNodeUC, {'user_id': 1, 'project_id': 1, 'nodes': {new_id: new_node}}, session)
+    run(PutNodeUC, {'user_id': 1, 'project_id': 1, 'nodes': {new_id: {'name': 'renamed'}}}, session)
+    run(DeleteNodeUC, {'user_id': 1, 'project_id': 1, 'delete_list': [new_id]}, session)
+
+    project = session.execute(select(Project.nodes_version)).scalar()
+    assert project == 3, 'the nodes version is not bumped by every write'
+    assert session.execute(select(Node.id).filter(Node.id == new_id)).first() is None, 'the node is not removed'
+
+
+def test_user_delete_removes_project_folders(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(models, 'MEDIA_DIR', tmp_path)
+    folder = models.project_folder_path(1)
+    folder.joinpath('templates').mkdir(parents=True)
+    events_initialize()
+
+    session.delete(session.get(User, 1))
+    session.commit()
+    assert not folder.exists(), 'the folder of the project deleted by the database cascade is kept'
@@ -0,0 +1,82 @@
+import pytest
+from fixtures.graph.random_example import make_random_graph
+from graph_processing.topology import TopologicalOrder
+
+
+@pytest.fixture
+def nodes() -> dict:
+    return make_random_graph(500, seed=10)
+
+
+def assert_valid_order(order: TopologicalOrder) -> None:
+    full = TopologicalOrder(order.parents)
+    assert order.depths == full.depths, 'incremental depths differ from the full calculation'
+
+
+def test_order_puts_parents_first(nodes):
+    order = TopologicalOrder.from_nodes(nodes)
+    position = {node_id: index for index, node_id in enumerate(order.order())}
+    for node_id, fields in nodes.items():
+        if fields['parent_id'] is not None:
+            assert position[fields['parent_id']] < position[node_id], 'the child comes before its parent'
+
+
+def test_stored_depths_are_trusted(nodes):
+    depths = TopologicalOrder.from_nodes(nodes).depths
+    stored = TopologicalOrder.from_nodes(nodes, depths)
+    assert stored.depths == depths, 'stored depths are not used'
+
+
+def find_root(nodes: dict, node_id: str) -> str:
+    while nodes[node_id]['parent_id'] is not None:
+        node_id = nodes[node_id]['parent_id']
+    return node_id
+
+
+def test_incremental_changes(nodes):
+    order = TopologicalOrder.from_nodes(nodes)
+    node_ids = list(nodes)
+
+    added = {'new-1': {'parent_id': node_ids[10]}, 'new-2': {'parent_id': 'new-1'}}
+    assert order.add_nodes(added) == {'new-1': order.depths[node_ids[10]] + 1, 'new-2': order.depths[node_ids[10]] + 2}, \
+        'incorrect depths of the added nodes'
+    assert_valid_order(order)
+
+    moved_id = node_ids[0]
+    target_id = next(node_id for node_id in reversed(node_ids) if find_root(nodes, node_id) != find_root(nodes, moved_id))
+    assert order.change_parents({moved_id: target_id, 'new-1': None}) is not None, order.get_errors
+    assert order.depths[moved_id] == order.depths[target_id] + 1, 'the moved branch is not recalculated'
+    assert_valid_order(order)
+
+    removed = order.remove_nodes([node_ids[5]])
+    assert node_ids[5] in removed and all(node_id not in order for node_id in removed), 'the branch is not removed'
+    assert_valid_order(order)
+
+
+def test_cycle_is_rejected(nodes):
+    order = TopologicalOrder.from_nodes(nodes)
+    child_id, fields = next((node_id, fields) for node_id, fields in nodes.items() if fields['parent_id'] is not None)
+    depths = dict(order.depths)
+    assert order.change_parents({fields['parent_id']: child_id}) is None, 'the cycle is not found'
+    assert order.depths == depths, 'the rejected change modifies the order'
+    assert_valid_order(order)
+
+
+def test_rejected_changes_are_not_applied(nodes):
+    order = TopologicalOrder.from_nodes(nodes)
+    child_id, fields = next((node_id, fields) for node_id, fields in nodes.items() if fields['parent_id'] is not None)
+    parent_ids = {fields['parent_id'] for fields in nodes.values()}
+    leaf_id, moved_id = [node_id for node_id in nodes if node_id not in parent_ids and node_id != child_id][:2]
+    parents = dict(order.parents)
+    depths = dict(order.depths)
+
+    changes = {
+        'new': {'parent_id': child_id},
+        moved_id: {'parent_id': None},
+        fields['parent_id']: {'parent_id': child_id},
+    }
+    assert order.apply_changes(changes, [leaf_id]) is None, 'the cycle is not found'
+    assert order.apply_changes({'other': {'parent_id': leaf_id}}, [leaf_id]) is None, \
+        'the parent removed in the same change is not found'
+    assert order.parents == parents and order.depths == depths, 'the rejected changes modify the order'
+    assert_valid_order(order)
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from fixtures.graph.random_example import make_random_graph, random_content
+from graph_processing.activation import ActivationTree
+from graph_processing.node_store import NodeStore
+
+np = pytest.importorskip('numpy')
+
+from graph_processing.vectorized import VectorizedActivation, create_evaluator
+
+
+@pytest.fixture
+def evaluation_results(request) -> dict:
+    rnd = random.Random(request.param)
+    nodes = make_random_graph(500, request.param)
+    scalar = ActivationTree.from_nodes(nodes)
+    vectorized = VectorizedActivation(NodeStore.from_nodes(nodes))
+
+    mismatches = []
+    for _ in range(20):
+        changed_ids = rnd.sample(list(nodes.keys()), 20)
+        contents = {node_id: random_content(rnd, nodes[node_id]['data_type']) for node_id in changed_ids}
+        if scalar.evaluate(contents) != vectorized.evaluate(contents):
+            mismatches.append(contents)
+
+    return {
+        'mismatches': mismatches,
+        'initial_state_equal': scalar.evaluate({}) == vectorized.evaluate({}) == scalar.active_ids,
+    }
+
+
+@pytest.mark.parametrize('evaluation_results', [1, 2, 3], indirect=True)
+def test_vectorized_evaluation(evaluation_results):
+    assert evaluation_results['initial_state_equal'], 'vectorized calculation of the initial state is incorrect'
+    assert not evaluation_results['mismatches'], 'vectorized evaluation differs from the scalar one'
+
+
+def test_create_evaluator():
+    store = NodeStore.from_nodes(make_random_graph(10, 1))
+    assert isinstance(create_evaluator(store, vectorized=True), VectorizedActivation), 'vectorized mode is not used'
+    assert isinstance(create_evaluator(store), ActivationTree), 'scalar mode is not used by default'